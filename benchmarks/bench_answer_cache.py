@@ -0,0 +1,130 @@
+"""
+Benchmark the LLM answer cache on a class of students asking questions
+about the same chapter, with a fake chat model that takes --llm-latency-ms
+per answer.
+
+Each question is about one of a few topics, whose retrieved context (the
+system message) is fixed, and is asked with one of several phrasings. A
+share of the turns are follow-ups ("why is that?") after an earlier answer,
+which must bypass the cache. "restart" reopens the SQLite cache filled by
+"cache" with an empty in-memory LRU. With --similarity (and
+sentence-transformers installed) paraphrases are matched as well.
+
+Usage:
+    python -m benchmarks.bench_answer_cache --questions 1000 --llm-latency-ms 800
+    python -m benchmarks.bench_answer_cache --similarity 0.9
+"""
+import os
+import time
+import random
+import logging
+import argparse
+import tempfile
+from typing import Any, List, Optional
+
+import numpy as np
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.langgraph.llm.answer_cache import AnswerCache
+from src.langgraph.nodes.doubts_node import ChatbotWithToolNode
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+TOPICS = [
+    "photosynthesis", "osmosis", "the cell membrane", "chlorophyll", "diffusion",
+    "respiration", "the nucleus", "enzymes", "mitosis", "the water cycle",
+]
+PHRASINGS = [
+    "what is {}", "What is {}?", "explain {}", "Explain {} please", "define {}",
+    "what does {} mean", "can you explain {}", "tell me about {}",
+]
+FOLLOW_UPS = ["why is that?", "can you explain it again more simply?", "what about plants?"]
+
+class SlowTutorModel(BaseChatModel):
+    """
+    A chat model that sleeps for a fixed latency and echoes the question.
+    """
+    
+    latency: float = 0.8
+    calls: int = 0
+    model_name: str = "fake-tutor"
+    
+    @property
+    def _llm_type(self) -> str:
+        return "slow-tutor"
+        
+    def bind_tools(self, tools, **kwargs):
+        return self
+        
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[Any] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        time.sleep(self.latency)
+        self.calls += 1
+        answer = f"Here is an explanation of: {messages[-1].content}"
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=answer))])
+
+def make_turns(rng, questions, follow_up_share):
+    """
+    Generate (state, topic) turns; follow-ups carry the earlier turn in their messages.
+    """
+    turns = []
+    for _ in range(questions):
+        topic = rng.choice(TOPICS)
+        question = rng.choice(PHRASINGS).format(topic)
+        system_message = f"You are a helpful AI tutor.\n\nContext:\n{topic} " + f"is explained on this page of the chapter. " * 40
+        messages = [HumanMessage(content=question)]
+        if rng.random() < follow_up_share:
+            messages += [AIMessage(content=f"Here is an explanation of: {question}"), HumanMessage(content=rng.choice(FOLLOW_UPS))]
+        turns.append({"messages": messages, "system_message": system_message, "context": [], "sources": []})
+    return turns
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the LLM answer cache')
+    parser.add_argument('--questions', type=int, default=1000, help='Turns asked by the class')
+    parser.add_argument('--llm-latency-ms', type=float, default=800.0, help='Simulated latency per LLM call')
+    parser.add_argument('--follow-ups', type=float, default=0.1, help='Share of turns that are follow-ups')
+    parser.add_argument('--similarity', type=float, default=0.0, help='Threshold of the semantic tier (0 disables)')
+    args = parser.parse_args()
+    
+    logging.getLogger("src.langgraph").setLevel(logging.WARNING)
+    turns = make_turns(random.Random(5), args.questions, args.follow_ups)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "answers.db")
+        modes = {
+            "no cache": None,
+            "cache": AnswerCache(db_path=db_path, similarity_threshold=args.similarity),
+            "restart": lambda: AnswerCache(db_path=db_path, similarity_threshold=args.similarity),
+        }
+        for name, cache in modes.items():
+            if callable(cache):
+                cache = cache()
+            model = SlowTutorModel(latency=args.llm_latency_ms / 1000)
+            node = ChatbotWithToolNode(model, cache_answers=cache is not None, answer_cache=cache).create_chatbot([])
+            
+            latencies = []
+            for state in turns:
+                start = time.perf_counter()
+                node.invoke(state)
+                latencies.append(time.perf_counter() - start)
+                
+            stats = cache.stats() if cache else {"memory_hits": 0, "disk_hits": 0, "semantic_hits": 0, "hit_rate": 0.0}
+            logger.info(
+                f"{name:<9} {model.calls:5} LLM calls, hit rate {stats['hit_rate']:6.1%} "
+                f"({stats['memory_hits']} memory, {stats['disk_hits']} SQLite, {stats['semantic_hits']} similar), "
+                f"p50 {np.percentile(latencies, 50) * 1000:7.2f} ms, mean {np.mean(latencies) * 1000:7.2f} ms"
+            )
+            if cache:
+                cache.close()
+
+if __name__ == "__main__":
+    main()
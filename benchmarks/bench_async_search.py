@@ -0,0 +1,69 @@
+"""
+Benchmark concurrent retrieval with threads versus the async path, against a
+fake Weaviate server.
+
+"sync" answers the questions with search() on a thread pool, one blocked
+thread per in-flight request; "async" awaits asearch() for all of them on
+the single shared event loop, where requests in flight are capped by the
+client pool's WEAVIATE_POOL_SIZE connections rather than by threads.
+
+Usage:
+    python -m benchmarks.bench_async_search --concurrency 10 100 500 --threads 16
+"""
+import time
+import asyncio
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_weaviate import start_server
+from benchmarks.bench_batch_insert import make_documents
+from src.langgraph.utils.async_runner import run_async
+from src.langgraph.document_processing.vector_store import WeaviateVectorStore
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark async retrieval')
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[10, 100, 500], help='Questions in flight')
+    parser.add_argument('--threads', type=int, default=16, help='Thread pool size for the sync path')
+    parser.add_argument('--request-latency-ms', type=float, default=50.0, help='Simulated latency per request')
+    args = parser.parse_args()
+    
+    server, state = start_server(base_latency_ms=0.0, per_object_latency_ms=0.0, request_latency_ms=args.request_latency_ms)
+    port = str(server.server_address[1])
+    logging.getLogger("src.langgraph").setLevel(logging.WARNING)
+    logging.getLogger("urllib3").setLevel(logging.ERROR)
+    
+    store = WeaviateVectorStore(host="127.0.0.1", port=port, index_name="BenchAsyncDocuments")
+    store.add_documents(make_documents(100))
+    store.search("warm up")
+    run_async(store.asearch("warm up"))
+    
+    async def ask_all(questions):
+        return await asyncio.gather(*(store.asearch(question) for question in questions))
+        
+    try:
+        for concurrency in args.concurrency:
+            questions = [f"question {i} about osmosis" for i in range(concurrency)]
+            
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.threads) as executor:
+                list(executor.map(store.search, questions))
+            sync_elapsed = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            run_async(ask_all(questions))
+            async_elapsed = time.perf_counter() - start
+            
+            logger.info(
+                f"{concurrency:>5} in flight: sync ({args.threads} threads) {concurrency / sync_elapsed:8.1f} questions/sec, "
+                f"async (1 loop) {concurrency / async_elapsed:8.1f} questions/sec"
+            )
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark the SQLite checkpointer and history trimming on long tutoring
+conversations: prompt tokens sent to the LLM, checkpoint storage and
+per-turn overhead.
+
+Each student has a conversation of --turns turns with a fake chat model
+that answers with --answer-chars characters. The graph is the tutor's
+history -> retriever -> chatbot flow, with a retriever that returns a fixed
+context. "full history" never trims; "window" keeps the last turns once
+the conversation has HISTORY_MAX_TURNS. Storage is measured before and
+after pruning every thread to its last checkpoints.
+
+Usage:
+    python -m benchmarks.bench_checkpointer --students 20 --turns 30
+"""
+import os
+import time
+import random
+import logging
+import argparse
+import tempfile
+
+import numpy as np
+from langgraph.graph import START, END, StateGraph
+from langchain_core.runnables import RunnableLambda
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from benchmarks.bench_answer_cache import SlowTutorModel, TOPICS, PHRASINGS
+from src.langgraph.state.state import State
+from src.langgraph.graph.checkpointer import SQLiteCheckpointer
+from src.langgraph.nodes.history_node import HistoryNode
+from src.langgraph.nodes.doubts_node import ChatbotWithToolNode
+from src.langgraph.document_processing.context_packer import estimate_tokens
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+VOCABULARY = (
+    "the a of and to in is that it for as with are on by this be from at or an which light energy water "
+    "plant plants leaf leaves cell cells sugar glucose oxygen carbon dioxide membrane root roots stem "
+    "chlorophyll process reaction enzyme enzymes molecule molecules nucleus division growth food make makes "
+    "uses through into during when because so example for instance means called also can will each other "
+    "sun air soil move moves pass passes inside outside higher lower concentration diffusion osmosis"
+).split()
+CONTEXT = "You are a helpful AI tutor.\n\nContext:\n" + "Plants make their food by photosynthesis in the leaves. " * 60
+
+class VerboseTutorModel(SlowTutorModel):
+    """
+    A fake tutor that records the prompt tokens of every call and gives long answers.
+    """
+    
+    answer_chars: int = 1500
+    prompt_tokens: list = []
+    
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.prompt_tokens.append(sum(estimate_tokens(str(message.content)) for message in messages))
+        # Random words, so that answers compress like prose rather than like a repeated phrase
+        rng = random.Random(len(self.prompt_tokens))
+        words = []
+        while sum(len(word) + 1 for word in words) < self.answer_chars:
+            words.append(rng.choice(VOCABULARY))
+        answer = " ".join(words)[:self.answer_chars]
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=answer))])
+
+def build_graph(model, history_node, checkpointer):
+    graph = StateGraph(State)
+    graph.add_node("history", RunnableLambda(history_node, afunc=history_node.ainvoke, name="history"))
+    graph.add_node("retriever", lambda state: {"system_message": CONTEXT, "context": [], "sources": []})
+    graph.add_node("chatbot", ChatbotWithToolNode(model, cache_answers=False).create_chatbot([]))
+    graph.add_edge(START, "history")
+    graph.add_edge("history", "retriever")
+    graph.add_edge("retriever", "chatbot")
+    graph.add_edge("chatbot", END)
+    return graph.compile(checkpointer=checkpointer)
+
+def stored_bytes(checkpointer):
+    return checkpointer._conn.execute(
+        "SELECT (SELECT COALESCE(SUM(LENGTH(checkpoint) + LENGTH(metadata)), 0) FROM checkpoints) + "
+        "(SELECT COALESCE(SUM(LENGTH(value)), 0) FROM writes)"
+    ).fetchone()[0]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the conversation checkpointer')
+    parser.add_argument('--students', type=int, default=20, help='Conversations')
+    parser.add_argument('--turns', type=int, default=30, help='Turns per conversation')
+    parser.add_argument('--answer-chars', type=int, default=1500, help='Length of each answer')
+    parser.add_argument('--window-turns', type=int, default=4, help='Turns kept after trimming')
+    parser.add_argument('--max-turns', type=int, default=8, help='Turns at which the conversation is trimmed')
+    args = parser.parse_args()
+    
+    logging.getLogger("src.langgraph").setLevel(logging.WARNING)
+    rng = random.Random(11)
+    conversations = [
+        [rng.choice(PHRASINGS).format(rng.choice(TOPICS)) for _ in range(args.turns)]
+        for _ in range(args.students)
+    ]
+    modes = {
+        "full history, raw": (10 ** 9, 0),
+        "full history, zlib": (10 ** 9, 6),
+        "window, zlib": (args.max_turns, 6),
+    }
+    
+    with tempfile.TemporaryDirectory() as directory:
+        for name, (max_turns, level) in modes.items():
+            checkpointer = SQLiteCheckpointer(
+                db_path=os.path.join(directory, f"{level}-{max_turns}.db"),
+                keep_last=2,
+                prune_interval=0,
+                compression_level=level
+            )
+            model = VerboseTutorModel(latency=0.0, answer_chars=args.answer_chars, prompt_tokens=[])
+            history_node = HistoryNode(window_turns=args.window_turns, max_turns=max_turns)
+            graph = build_graph(model, history_node, checkpointer)
+            
+            latencies = []
+            for student, questions in enumerate(conversations):
+                config = {"configurable": {"thread_id": f"student-{student}"}}
+                for question in questions:
+                    start = time.perf_counter()
+                    graph.invoke({"messages": [HumanMessage(content=question)]}, config)
+                    latencies.append(time.perf_counter() - start)
+                    
+            stored = stored_bytes(checkpointer)
+            checkpointer.prune_old_checkpoints()
+            pruned = stored_bytes(checkpointer)
+            last_turns = np.array(model.prompt_tokens).reshape(args.students, args.turns)[:, -1]
+            logger.info(
+                f"{name:<19} last-turn prompt {np.mean(last_turns):7.0f} tokens, "
+                f"turn p50 {np.percentile(latencies, 50) * 1000:6.2f} ms, "
+                f"stored {stored / 1e6:7.2f} MB, after pruning {pruned / 1e6:6.2f} MB "
+                f"({pruned / args.students / 1e3:6.1f} kB per student)"
+            )
+            checkpointer.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark TCP connections and latency as concurrent students grow, against
+a fake Weaviate server.
+
+Each student is a thread that builds its own WeaviateVectorStore, like a
+Streamlit session does, and asks a few questions. "per-session" gives every
+store a new client, as before the client pool; "pooled" shares the
+process-wide client.
+
+Usage:
+    python -m benchmarks.bench_client_pool --students 10 50 200 --questions 5
+"""
+import time
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks.fake_weaviate import start_server
+from benchmarks.bench_batch_insert import make_documents
+from src.langgraph.document_processing.client_pool import WeaviateClientPool
+from src.langgraph.document_processing.vector_store import WeaviateVectorStore
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the shared Weaviate client pool')
+    parser.add_argument('--students', nargs='+', type=int, default=[10, 50, 200], help='Concurrent students')
+    parser.add_argument('--questions', type=int, default=5, help='Questions per student')
+    parser.add_argument('--request-latency-ms', type=float, default=2.0, help='Simulated latency per request')
+    args = parser.parse_args()
+    
+    server, state = start_server(base_latency_ms=0.0, per_object_latency_ms=0.0, request_latency_ms=args.request_latency_ms)
+    port = str(server.server_address[1])
+    logging.getLogger("src.langgraph.document_processing").setLevel(logging.WARNING)
+    logging.getLogger("urllib3").setLevel(logging.ERROR)
+    WeaviateVectorStore(host="127.0.0.1", port=port, index_name="BenchPoolDocuments").add_documents(make_documents(100))
+    
+    def student(index, per_session):
+        store = WeaviateVectorStore(host="127.0.0.1", port=port, index_name="BenchPoolDocuments")
+        if per_session:
+            # A private pool gives the store its own client and connections
+            store.pooled_client = WeaviateClientPool(health_check_interval=0).acquire("127.0.0.1", port)
+        latencies = []
+        for question in range(args.questions):
+            start = time.perf_counter()
+            store.search(f"student {index} question {question} about osmosis", limit=5)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+        
+    try:
+        for students in args.students:
+            for name, per_session in (("per-session", True), ("pooled", False)):
+                state.reset_counts()
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=students) as executor:
+                    results = list(executor.map(lambda index: student(index, per_session), range(students)))
+                elapsed = time.perf_counter() - start
+                latencies = [latency for result in results for latency in result]
+                
+                logger.info(
+                    f"{students:>4} students, {name:<11}: {state.connections:5} connections, "
+                    f"{students * args.questions / elapsed:7.1f} questions/sec, "
+                    f"p50 {np.percentile(latencies, 50) * 1000:7.2f} ms, p99 {np.percentile(latencies, 99) * 1000:7.2f} ms"
+                )
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark query-focused compression of the packed context: prompt tokens,
+answer coverage, compression time and, optionally, Groq latency per turn.
+
+Questions and hits are generated as in bench_context_packing; each question
+is built from words of its answer sentence. Coverage is the fraction of
+questions whose answer sentence is still in the compressed context. With
+--groq-model (and GROQ_API_KEY set) the same question is also sent to Groq
+with the packed and with the compressed context, to measure the latency
+saved per turn.
+
+Usage:
+    python -m benchmarks.bench_context_compression --questions 200 --ratio 0.35
+    python -m benchmarks.bench_context_compression --groq-model llama3-8b-8192 --groq-questions 20
+"""
+import os
+import time
+import random
+import logging
+import argparse
+
+import numpy as np
+
+from benchmarks.bench_context_packing import ChunkStore, textbook_chunks, make_question
+from src.langgraph.document_processing.embedding import EmbeddingModel
+from src.langgraph.document_processing.context_packer import ContextPacker, estimate_tokens
+from src.langgraph.document_processing.context_compressor import ContextCompressor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def ask_groq(llm, context, question):
+    """
+    Send one tutor prompt to Groq and return the latency in seconds.
+    """
+    from langchain_core.messages import SystemMessage, HumanMessage
+    
+    start = time.perf_counter()
+    llm.invoke([
+        SystemMessage(content="You are a helpful AI tutor. Answer the user's question based only on the following context.\n\nContext:\n" + context),
+        HumanMessage(content=question)
+    ])
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark extractive context compression')
+    parser.add_argument('--pages', type=int, default=200, help='Synthetic pages to chunk')
+    parser.add_argument('--questions', type=int, default=200, help='Number of questions')
+    parser.add_argument('--ratio', type=float, default=0.35, help='Share of sentences kept')
+    parser.add_argument('--model', default='all-MiniLM-L6-v2', help='sentence-transformers model name')
+    parser.add_argument('--backend', default='torch', help='Embedding backend (torch, onnx, onnx-int8)')
+    parser.add_argument('--groq-model', default=None, help='Also measure Groq latency with this model')
+    parser.add_argument('--groq-questions', type=int, default=20, help='Questions sent to Groq per mode')
+    args = parser.parse_args()
+    
+    pages, chunks = textbook_chunks(args.pages)
+    store = ChunkStore(chunks)
+    rng = random.Random(7)
+    questions = []
+    for _ in range(args.questions):
+        answer, hits = make_question(rng, chunks, store.chunks, pages, 5, 0.3)
+        words = answer.rstrip(".").split()
+        question = "What does it mean that " + " ".join(rng.sample(words, min(len(words), 8))).lower() + "?"
+        questions.append((question, " ".join(answer.split()), hits))
+        
+    logging.getLogger("src.langgraph").setLevel(logging.WARNING)
+    packer = ContextPacker(store)
+    compressor = ContextCompressor(EmbeddingModel(model_name=args.model, backend=args.backend), ratio=args.ratio)
+    compressor.compress("warm up", packer.pack(questions[0][2]))
+    
+    results = {"packed": ([], 0, []), "compressed": ([], 0, [])}
+    contexts = []
+    for question, answer, hits in questions:
+        passages = packer.pack(hits)
+        start = time.perf_counter()
+        compressed = compressor.compress(question, passages)
+        elapsed = time.perf_counter() - start
+        
+        packed_context = "\n\n".join(passage["content"] for passage in passages)
+        compressed_context = "\n\n".join(passage["content"] for passage in compressed)
+        contexts.append((question, packed_context, compressed_context))
+        for name, context, seconds in (("packed", packed_context, 0.0), ("compressed", compressed_context, elapsed)):
+            tokens, covered, timings = results[name]
+            tokens.append(estimate_tokens(context))
+            timings.append(seconds)
+            results[name] = (tokens, covered + (answer in " ".join(context.split())), timings)
+            
+    for name, (tokens, covered, timings) in results.items():
+        logger.info(
+            f"{name:<11} {np.mean(tokens):7.1f} tokens/answer, coverage {covered / len(questions):6.1%}, "
+            f"compression p50 {np.percentile(timings, 50) * 1000:6.2f} ms"
+        )
+    logger.info(f"prompt reduction {np.mean(results['packed'][0]) / np.mean(results['compressed'][0]):.2f}x")
+    
+    if args.groq_model:
+        from langchain_groq import ChatGroq
+        
+        llm = ChatGroq(api_key=os.getenv("GROQ_API_KEY"), model=args.groq_model)
+        latencies = {"packed": [], "compressed": []}
+        for question, packed_context, compressed_context in contexts[:args.groq_questions]:
+            latencies["packed"].append(ask_groq(llm, packed_context, question))
+            latencies["compressed"].append(ask_groq(llm, compressed_context, question))
+        compression_p50 = np.percentile(results["compressed"][2], 50)
+        saved = np.percentile(latencies["packed"], 50) - np.percentile(latencies["compressed"], 50) - compression_p50
+        logger.info(
+            f"Groq {args.groq_model}: packed p50 {np.percentile(latencies['packed'], 50) * 1000:7.1f} ms, "
+            f"compressed p50 {np.percentile(latencies['compressed'], 50) * 1000:7.1f} ms, "
+            f"saved per turn {saved * 1000:7.1f} ms after compression"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark prompt tokens and answer coverage of the retrieved context, joined
+as-is versus packed by ContextPacker.
+
+Pages are wrapped into lines, as PDF text extraction returns them, and
+chunked with the ingestion chunk size and overlap. Each question
+has an answer sentence inside one chunk, or cut by its end in --boundary
+of the questions; the retriever returns that chunk, sometimes the next
+one, and distractors with lower scores to make up --limit hits. Coverage is
+the fraction of questions whose whole answer sentence is in the context.
+
+Usage:
+    python -m benchmarks.bench_context_packing --questions 500 --token-budget 1500
+"""
+import re
+import time
+import random
+import logging
+import textwrap
+import argparse
+
+import numpy as np
+
+from benchmarks.bench_chunker import synthetic_pages
+from src.langgraph.document_processing.text_chunker import OffsetTextChunker
+from src.langgraph.document_processing.context_packer import ContextPacker, estimate_tokens
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class ChunkStore:
+    """
+    Minimal store answering fetch_chunks from memory and counting requests.
+    """
+    
+    def __init__(self, chunks):
+        self.chunks = {(chunk["metadata"]["source"], chunk["metadata"]["chunk"]): chunk for chunk in chunks}
+        self.requests = 0
+        
+    def fetch_chunks(self, keys):
+        self.requests += 1
+        return [self.chunks[key] for key in keys if key in self.chunks]
+
+def textbook_chunks(pages):
+    """
+    Generate pages with wrapped lines and chunk them like ingestion does.
+    
+    Returns:
+        (pages, chunks) with plain dictionaries as chunk metadata
+    """
+    pages = synthetic_pages(pages)
+    for page in pages:
+        page["text"] = "\n\n".join("\n".join(textwrap.wrap(paragraph, 90)) for paragraph in page["text"].split("\n\n"))
+    chunks = [
+        {"text": chunk["text"], "metadata": dict(chunk["metadata"])}
+        for chunk in OffsetTextChunker(chunk_size=1000, chunk_overlap=200).iter_chunks(pages)
+    ]
+    return pages, chunks
+
+def make_question(rng, chunks, by_key, pages, limit, boundary):
+    """
+    Pick an answer sentence and the hits a retriever would return for it.
+    """
+    cut = rng.random() < boundary
+    while True:
+        target = rng.choice(chunks)
+        metadata = target["metadata"]
+        page_text = pages[metadata["page"] - 1]["text"]
+        sentences = [(m.start(), m.end()) for m in re.finditer(r"[^.]+\.", page_text)]
+        if cut:
+            candidates = [s for s in sentences if s[0] < metadata["end_index"] < s[1] and s[0] >= metadata["start_index"]]
+        else:
+            candidates = [s for s in sentences if metadata["start_index"] <= s[0] and s[1] <= metadata["end_index"]]
+        if candidates:
+            start, end = rng.choice(candidates)
+            break
+            
+    hits = [dict(target, _distance=1.0 - rng.uniform(0.6, 0.9))]
+    after = by_key.get((metadata["source"], metadata["chunk"] + 1))
+    if after is not None and rng.random() < 0.5:
+        hits.append(dict(after, _distance=1.0 - rng.uniform(0.4, 0.6)))
+    while len(hits) < limit:
+        hits.append(dict(rng.choice(chunks), _distance=1.0 - rng.uniform(0.0, 0.45)))
+    return page_text[start:end].strip(), hits
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark token-budgeted context packing')
+    parser.add_argument('--pages', type=int, default=200, help='Synthetic pages to chunk')
+    parser.add_argument('--questions', type=int, default=500, help='Number of questions')
+    parser.add_argument('--limit', type=int, default=5, help='Hits retrieved per question')
+    parser.add_argument('--boundary', type=float, default=0.3, help='Share of answers cut by a chunk boundary')
+    parser.add_argument('--token-budget', type=int, default=1500, help='Context token budget')
+    parser.add_argument('--min-relevance', type=float, default=0.2, help='Relevance cutoff')
+    args = parser.parse_args()
+    
+    pages, chunks = textbook_chunks(args.pages)
+    store = ChunkStore(chunks)
+    rng = random.Random(7)
+    questions = [
+        make_question(rng, chunks, store.chunks, pages, args.limit, args.boundary)
+        for _ in range(args.questions)
+    ]
+    
+    packers = {
+        "joined (previous)": None,
+        "packed": ContextPacker(store, token_budget=args.token_budget, min_relevance=args.min_relevance, fetch_neighbours=False),
+        "packed+neighbours": ContextPacker(store, token_budget=args.token_budget, min_relevance=args.min_relevance),
+    }
+    for name, packer in packers.items():
+        store.requests = 0
+        tokens, covered, elapsed = [], 0, 0.0
+        for answer, hits in questions:
+            start = time.perf_counter()
+            if packer is None:
+                context = "\n\n".join(hit["text"] for hit in hits)
+            else:
+                context = "\n\n".join(passage["content"] for passage in packer.pack(hits))
+            elapsed += time.perf_counter() - start
+            tokens.append(estimate_tokens(context))
+            covered += answer in context
+            
+        logger.info(
+            f"{name:<18} {np.mean(tokens):7.1f} tokens/answer (p95 {np.percentile(tokens, 95):6.0f}), "
+            f"coverage {covered / len(questions):6.1%}, {store.requests / len(questions):4.2f} fetches/answer, "
+            f"{elapsed / len(questions) * 1e6:6.1f} us/answer"
+        )
+
+if __name__ == "__main__":
+    main()
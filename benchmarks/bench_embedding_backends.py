@@ -0,0 +1,70 @@
+"""
+Benchmark EmbeddingModel inference backends on CPU.
+
+Runs the ONNX parity check, then reports throughput and per-batch latency
+of the PyTorch, ONNX and int8-quantized ONNX backends across batch sizes.
+
+Usage:
+    python -m benchmarks.bench_embedding_backends --batch-sizes 1 8 32 128 --threads 4
+"""
+import time
+import logging
+import argparse
+
+import numpy as np
+
+from benchmarks.bench_chunker import synthetic_pages
+from src.langgraph.document_processing.embedding import EmbeddingModel
+from src.langgraph.document_processing.onnx_backend import check_parity
+from src.langgraph.document_processing.text_chunker import OffsetTextChunker
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark embedding backends')
+    parser.add_argument('--model', default='all-MiniLM-L6-v2', help='sentence-transformers model name')
+    parser.add_argument('--backends', nargs='+', default=['torch', 'onnx', 'onnx-int8'], help='Backends to compare')
+    parser.add_argument('--batch-sizes', nargs='+', type=int, default=[1, 8, 32, 128], help='Batch sizes')
+    parser.add_argument('--texts', type=int, default=512, help='Chunks embedded per batch size')
+    parser.add_argument('--threads', type=int, default=0, help='Intra-op threads (0 keeps the default)')
+    args = parser.parse_args()
+    
+    chunker = OffsetTextChunker(1000, 200)
+    texts = [chunk["text"] for chunk in chunker.chunk_text(synthetic_pages(200))][:args.texts]
+    logger.info(f"Embedding {len(texts)} chunks of about {np.mean([len(t) for t in texts]):.0f} characters")
+    logging.getLogger("src.langgraph.document_processing.embedding").setLevel(logging.WARNING)
+    
+    for backend in args.backends:
+        start = time.perf_counter()
+        model = EmbeddingModel(args.model, backend=backend, intra_op_threads=args.threads)
+        model.load_model()
+        logger.info(f"{backend}: loaded in {time.perf_counter() - start:.2f}s")
+        
+        if backend != "torch":
+            parity = check_parity(model.model, texts[:64])
+            logger.info(
+                f"{backend}: parity min cosine {parity['min_cosine']:.5f}, "
+                f"max abs diff {parity['max_abs_diff']:.5f} ({'ok' if parity['passed'] else 'FAILED'})"
+            )
+            
+        # Warm up the session / kernels once
+        model.model.encode(texts[:8], batch_size=8)
+        
+        for batch_size in args.batch_sizes:
+            latencies = []
+            start = time.perf_counter()
+            for offset in range(0, len(texts), batch_size):
+                batch_start = time.perf_counter()
+                model.model.encode(texts[offset:offset + batch_size], batch_size=batch_size)
+                latencies.append(time.perf_counter() - batch_start)
+            elapsed = time.perf_counter() - start
+            
+            logger.info(
+                f"{backend:<10} batch {batch_size:>4}: {len(texts) / elapsed:8.1f} texts/sec, "
+                f"p50 {np.percentile(latencies, 50) * 1000:8.1f} ms, p95 {np.percentile(latencies, 95) * 1000:8.1f} ms"
+            )
+
+if __name__ == "__main__":
+    main()
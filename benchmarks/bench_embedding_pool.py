@@ -0,0 +1,53 @@
+"""
+Benchmark EmbeddingModel throughput as the worker pool grows.
+
+Usage:
+    python -m benchmarks.bench_embedding_pool --texts 20000 --workers 1 2 4 8
+"""
+import time
+import logging
+import argparse
+
+from benchmarks.bench_chunker import synthetic_pages
+from src.langgraph.document_processing.embedding import EmbeddingModel
+from src.langgraph.document_processing.text_chunker import OffsetTextChunker
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the embedding worker pool')
+    parser.add_argument('--model', default='all-MiniLM-L6-v2', help='sentence-transformers model name')
+    parser.add_argument('--backend', default='torch', help='Embedding backend (torch, onnx, onnx-int8)')
+    parser.add_argument('--texts', type=int, default=20000, help='Number of chunks to embed')
+    parser.add_argument('--batch-size', type=int, default=64, help='Texts per shard')
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, 2, 4, 8], help='Pool sizes to compare')
+    args = parser.parse_args()
+    
+    chunker = OffsetTextChunker(1000, 200)
+    texts = []
+    while len(texts) < args.texts:
+        texts.extend(chunk["text"] for chunk in chunker.chunk_text(synthetic_pages(500, seed=len(texts))))
+    texts = texts[:args.texts]
+    logger.info(f"Embedding {len(texts)} chunks")
+    
+    baseline = None
+    for workers in args.workers:
+        with EmbeddingModel(args.model, batch_size=args.batch_size, backend=args.backend, num_workers=workers) as model:
+            # Load the model (or start the workers) outside the timing
+            model.embed(texts[:args.batch_size * max(workers, 2)])
+            
+            start = time.perf_counter()
+            embeddings = model.embed(texts)
+            elapsed = time.perf_counter() - start
+            
+        rate = len(texts) / elapsed
+        baseline = baseline or rate
+        logger.info(
+            f"{workers:>3} workers: {rate:8.1f} texts/sec ({rate / baseline:4.2f}x), "
+            f"output {embeddings.shape} {embeddings.dtype}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark HNSW recall@k and latency against exact search.
+
+Vectors are synthetic, L2-normalized and clustered like chunk embeddings.
+They are generated into a memory-mapped file, so the 5M-vector run needs
+about 4 bytes * dim * 5M of free disk (7.7 GB at dim 384) plus the graph
+in RAM.
+
+Usage:
+    python -m benchmarks.bench_hnsw --sizes 100000 1000000 5000000 --ef 32 64 128
+"""
+import os
+import time
+import logging
+import argparse
+import tempfile
+
+import numpy as np
+
+from src.langgraph.document_processing.hnsw_index import HnswIndex
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def make_vectors(path, count, dim, clusters=1000, seed=42, chunk=100000):
+    """
+    Write count clustered, normalized vectors to a memory-mapped file.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = np.memmap(path, dtype=np.float32, mode="w+", shape=(count, dim))
+    for start in range(0, count, chunk):
+        size = min(chunk, count - start)
+        block = centers[rng.integers(0, clusters, size)] + 0.6 * rng.standard_normal((size, dim)).astype(np.float32)
+        vectors[start:start + size] = block / np.linalg.norm(block, axis=1, keepdims=True)
+    vectors.flush()
+    return vectors
+
+def exact_top_k(vectors, queries, k, chunk=250000):
+    """
+    Exact top-k by inner product, scanning the vectors in chunks.
+    Returns (ids, seconds per query).
+    """
+    best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    best_ids = np.zeros((len(queries), k), dtype=np.int64)
+    start_time = time.perf_counter()
+    for start in range(0, len(vectors), chunk):
+        scores = queries @ np.asarray(vectors[start:start + chunk]).T
+        ids = np.argpartition(-scores, min(k, scores.shape[1] - 1), axis=1)[:, :k]
+        candidate_scores = np.take_along_axis(scores, ids, axis=1)
+        merged_scores = np.concatenate([best_scores, candidate_scores], axis=1)
+        merged_ids = np.concatenate([best_ids, ids + start], axis=1)
+        order = np.argsort(-merged_scores, axis=1)[:, :k]
+        best_scores = np.take_along_axis(merged_scores, order, axis=1)
+        best_ids = np.take_along_axis(merged_ids, order, axis=1)
+    return best_ids, (time.perf_counter() - start_time) / len(queries)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the HNSW index')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[100000, 1000000, 5000000], help='Index sizes')
+    parser.add_argument('--dim', type=int, default=384, help='Vector dimension')
+    parser.add_argument('--queries', type=int, default=200, help='Number of queries')
+    parser.add_argument('--k', type=int, default=10, help='Neighbours per query')
+    parser.add_argument('--M', type=int, default=16, help='HNSW M')
+    parser.add_argument('--ef-construction', type=int, default=200, help='HNSW ef_construction')
+    parser.add_argument('--ef', nargs='+', type=int, default=[32, 64, 128], help='ef_search values to sweep')
+    parser.add_argument('--workdir', default=None, help='Directory for the vector files (defaults to a temp dir)')
+    args = parser.parse_args()
+    
+    workdir = args.workdir or tempfile.mkdtemp(prefix="bench_hnsw_")
+    rng = np.random.default_rng(7)
+    
+    for size in args.sizes:
+        path = os.path.join(workdir, f"vectors_{size}_{args.dim}.f32")
+        vectors = make_vectors(path, size, args.dim)
+        queries = rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+        queries = 0.3 * queries + np.asarray(vectors[rng.integers(0, size, args.queries)])
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+        
+        truth, exact_seconds = exact_top_k(vectors, queries, args.k)
+        logger.info(f"{size:>9,} vectors: exact scan {exact_seconds * 1000:8.2f} ms/query (amortized over the query batch)")
+        
+        start = time.perf_counter()
+        index = HnswIndex(args.dim, M=args.M, ef_construction=args.ef_construction, max_elements=size)
+        for offset in range(0, size, 100000):
+            rows = np.arange(offset, min(offset + 100000, size))
+            index.add(vectors[rows], rows)
+        logger.info(f"{size:>9,} vectors: built HNSW (M={args.M}) in {time.perf_counter() - start:.1f}s")
+        
+        for ef in args.ef:
+            index.ef_search = ef
+            latencies, hits = [], 0
+            for query, expected in zip(queries, truth):
+                query_start = time.perf_counter()
+                rows, _ = index.search(query, args.k)
+                latencies.append(time.perf_counter() - query_start)
+                hits += len(set(rows.tolist()) & set(expected.tolist()))
+            logger.info(
+                f"{size:>9,} vectors: ef={ef:<4} recall@{args.k} {hits / truth.size:.4f}, "
+                f"p50 {np.percentile(latencies, 50) * 1000:6.3f} ms, p99 {np.percentile(latencies, 99) * 1000:6.3f} ms"
+            )
+            
+        del index, vectors
+        os.remove(path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark search latency of vector, hybrid and local-fallback hybrid modes.
+
+Needs a running Weaviate (see docker-compose.yml). The corpus is ingested
+into a separate class in hybrid mode so the local keyword index is built
+too, then each mode answers the same keyword-heavy questions.
+
+Usage:
+    python -m benchmarks.bench_hybrid_search --host localhost --port 9090 --pages 200
+"""
+import time
+import random
+import logging
+import argparse
+
+import numpy as np
+
+from benchmarks.bench_chunker import synthetic_pages, WORDS
+from src.langgraph.document_processing.text_chunker import OffsetTextChunker
+from src.langgraph.document_processing.vector_store import WeaviateVectorStore
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark hybrid search')
+    parser.add_argument('--host', default='localhost', help='Weaviate host')
+    parser.add_argument('--port', default='9090', help='Weaviate port')
+    parser.add_argument('--index-name', default='BenchHybridDocuments', help='Class to ingest into')
+    parser.add_argument('--pages', type=int, default=200, help='Synthetic pages to ingest (0 to reuse the class)')
+    parser.add_argument('--queries', type=int, default=200, help='Number of queries per mode')
+    parser.add_argument('--alpha', type=float, default=0.5, help='Hybrid alpha')
+    args = parser.parse_args()
+    
+    store = WeaviateVectorStore(
+        host=args.host, port=args.port, index_name=args.index_name, search_mode="hybrid", hybrid_alpha=args.alpha
+    )
+    store.connect()
+    if args.pages:
+        store.delete_by_filter({})
+        chunks = OffsetTextChunker(1000, 200).chunk_text(synthetic_pages(args.pages))
+        store.add_documents(chunks)
+        
+    rng = random.Random(7)
+    questions = [f"define {rng.choice(WORDS)} and {rng.choice(WORDS)}" for _ in range(args.queries)]
+    logging.getLogger("src.langgraph.document_processing.vector_store").setLevel(logging.WARNING)
+    
+    modes = [
+        ("vector (current)", "vector", None),
+        ("hybrid (server)", "hybrid", None),
+        ("hybrid (local BM25 fallback)", "hybrid", False),
+    ]
+    for name, mode, server_hybrid in modes:
+        store.search_mode = mode
+        store.server_hybrid = server_hybrid
+        store.search(questions[0], limit=5)
+        
+        latencies = []
+        for question in questions:
+            start = time.perf_counter()
+            store.search(question, limit=5)
+            latencies.append(time.perf_counter() - start)
+            
+        logger.info(
+            f"{name:<30} p50 {np.percentile(latencies, 50) * 1000:7.2f} ms, "
+            f"p95 {np.percentile(latencies, 95) * 1000:7.2f} ms, p99 {np.percentile(latencies, 99) * 1000:7.2f} ms"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark the retrieval query cache on a class of students asking
+paraphrased questions, against a fake Weaviate server.
+
+Questions are drawn from a few topics, each asked with one of several
+phrasings ("what is ...", "explain ...", "define ..."). "no cache" searches
+every question; "exact" only reuses identical normalized questions;
+"exact+similar" also matches paraphrases by query embedding. Halfway
+through, a document is added, which must drop the cache.
+
+Usage:
+    python -m benchmarks.bench_query_cache --questions 2000 --request-latency-ms 20
+"""
+import time
+import random
+import logging
+import argparse
+
+import numpy as np
+
+from benchmarks.fake_weaviate import start_server
+from benchmarks.bench_batch_insert import make_documents
+from src.langgraph.document_processing.embedding import EmbeddingModel
+from src.langgraph.document_processing.document_processor import DocumentProcessor
+from src.langgraph.document_processing.query_cache import QueryCache
+from src.langgraph.document_processing.vector_store import WeaviateVectorStore
+from src.langgraph.nodes.retriever.retriever_node import CustomRetriever
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+TOPICS = [
+    "photosynthesis", "osmosis", "the cell membrane", "chlorophyll", "diffusion",
+    "respiration", "the nucleus", "enzymes", "mitosis", "the water cycle",
+]
+PHRASINGS = [
+    "what is {}", "What is {}?", "explain {}", "Explain {} please", "define {}",
+    "what does {} mean", "can you explain {}", "tell me about {}",
+]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the retrieval query cache')
+    parser.add_argument('--questions', type=int, default=2000, help='Questions asked by the class')
+    parser.add_argument('--request-latency-ms', type=float, default=20.0, help='Simulated latency per request')
+    parser.add_argument('--similarity', type=float, default=0.92, help='Threshold of the approximate level')
+    parser.add_argument('--model', default='all-MiniLM-L6-v2', help='sentence-transformers model name')
+    parser.add_argument('--backend', default='torch', help='Embedding backend (torch, onnx, onnx-int8)')
+    args = parser.parse_args()
+    
+    server, state = start_server(base_latency_ms=0.0, per_object_latency_ms=0.0, request_latency_ms=args.request_latency_ms)
+    port = str(server.server_address[1])
+    logging.getLogger("src.langgraph").setLevel(logging.WARNING)
+    
+    embedder = EmbeddingModel(model_name=args.model, backend=args.backend)
+    store = WeaviateVectorStore(host="127.0.0.1", port=port, index_name="BenchCacheDocuments", embedding_model="none", embedder=embedder)
+    store.add_documents(make_documents(100))
+    processor = DocumentProcessor(vector_store=store)
+    store.search("warm up")
+    
+    rng = random.Random(3)
+    questions = [rng.choice(PHRASINGS).format(rng.choice(TOPICS)) for _ in range(args.questions)]
+    modes = {
+        "no cache": CustomRetriever(processor),
+        "exact": CustomRetriever(processor, cache=QueryCache(similarity_threshold=0)),
+        "exact+similar": CustomRetriever(
+            processor,
+            cache=QueryCache(similarity_threshold=args.similarity),
+            query_embedder=store.get_query_embedder()
+        ),
+    }
+    
+    try:
+        for name, retriever in modes.items():
+            state.reset_counts()
+            latencies = []
+            for i, question in enumerate(questions):
+                if i == len(questions) // 2:
+                    # New material for the chapter: cached results are stale
+                    store.add_documents([{
+                        "text": f"New notes for {name}: " + "osmosis moves water across a membrane. " * 25,
+                        "metadata": {"source": "notes.pdf", "file_name": "notes.pdf", "page": 1, "chunk": 1}
+                    }])
+                start = time.perf_counter()
+                retriever.get_relevant_documents(question)
+                latencies.append(time.perf_counter() - start)
+                
+            stats = retriever.cache.stats() if retriever.cache else {"hit_rate": 0.0, "exact_hits": 0, "semantic_hits": 0}
+            logger.info(
+                f"{name:<14} hit rate {stats['hit_rate']:6.1%} ({stats['exact_hits']} exact, {stats['semantic_hits']} similar), "
+                f"{state.requests.get('POST /v1/graphql', 0):5} searches, "
+                f"p50 {np.percentile(latencies, 50) * 1000:7.2f} ms, mean {np.mean(latencies) * 1000:7.2f} ms"
+            )
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Load benchmark for query embedding under concurrent traffic.
+
+Simulates concurrent students, each sending queries back to back, and
+compares one embedding call per query with the MicroBatchEmbedder.
+Reports queries/sec, queries/sec per core and p50/p99 latency.
+
+Usage:
+    python -m benchmarks.bench_query_embedding --clients 200 --queries 20
+"""
+import os
+import time
+import random
+import logging
+import argparse
+import threading
+
+import numpy as np
+
+from benchmarks.bench_chunker import WORDS
+from src.langgraph.document_processing.embedding import EmbeddingModel
+from src.langgraph.document_processing.micro_batcher import MicroBatchEmbedder
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def run_load(embed_one, clients, queries, seed=42):
+    """
+    Run concurrent clients and return (queries/sec, latencies in seconds).
+    """
+    rng = random.Random(seed)
+    questions = [
+        "What is " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 12))) + "?"
+        for _ in range(clients * queries)
+    ]
+    latencies = [[] for _ in range(clients)]
+    barrier = threading.Barrier(clients + 1)
+    
+    def client(index):
+        barrier.wait()
+        for question in questions[index * queries:(index + 1) * queries]:
+            start = time.perf_counter()
+            embed_one(question)
+            latencies[index].append(time.perf_counter() - start)
+            
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return clients * queries / elapsed, np.concatenate([np.asarray(l) for l in latencies])
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark micro-batched query embedding')
+    parser.add_argument('--model', default='all-MiniLM-L6-v2', help='sentence-transformers model name')
+    parser.add_argument('--backend', default='torch', help='Embedding backend (torch, onnx, onnx-int8)')
+    parser.add_argument('--clients', type=int, default=200, help='Concurrent clients')
+    parser.add_argument('--queries', type=int, default=20, help='Queries per client')
+    parser.add_argument('--max-batch-size', type=int, default=32, help='Micro-batch size limit')
+    parser.add_argument('--max-wait-ms', type=float, default=5.0, help='Micro-batch time window')
+    args = parser.parse_args()
+    
+    model = EmbeddingModel(args.model, backend=args.backend)
+    model.load_model()
+    model.embed(["warm up"], use_cache=False)
+    logging.getLogger("src.langgraph.document_processing.embedding").setLevel(logging.WARNING)
+    cores = os.cpu_count() or 1
+    
+    batcher = MicroBatchEmbedder(model, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+    for name, embed_one in [
+        ("one call per query", lambda text: model.embed([text], use_cache=False)[0]),
+        (f"micro-batched ({args.max_batch_size}, {args.max_wait_ms:g} ms)", batcher.embed_query),
+    ]:
+        rate, latencies = run_load(embed_one, args.clients, args.queries)
+        logger.info(
+            f"{name:<28} {rate:8.1f} queries/sec ({rate / cores:6.1f} per core), "
+            f"p50 {np.percentile(latencies, 50) * 1000:7.1f} ms, p99 {np.percentile(latencies, 99) * 1000:7.1f} ms"
+        )
+    logger.info(f"Micro-batching: {batcher.stats()}")
+    batcher.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark N sequential searches against one batched search_many call, on a
+fake Weaviate server.
+
+Usage:
+    python -m benchmarks.bench_search_many --queries 1 4 16 64 --request-latency-ms 20
+"""
+import time
+import logging
+import argparse
+
+from benchmarks.fake_weaviate import start_server
+from benchmarks.bench_batch_insert import make_documents
+from src.langgraph.document_processing.vector_store import WeaviateVectorStore
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark batched multi-query search')
+    parser.add_argument('--queries', nargs='+', type=int, default=[1, 4, 16, 64], help='Queries per turn')
+    parser.add_argument('--request-latency-ms', type=float, default=20.0, help='Simulated latency per request')
+    args = parser.parse_args()
+    
+    server, state = start_server(base_latency_ms=0.0, per_object_latency_ms=0.0, request_latency_ms=args.request_latency_ms)
+    port = str(server.server_address[1])
+    logging.getLogger("src.langgraph").setLevel(logging.WARNING)
+    
+    store = WeaviateVectorStore(host="127.0.0.1", port=port, index_name="BenchManyDocuments")
+    store.add_documents(make_documents(100))
+    store.search("warm up")
+    
+    try:
+        for count in args.queries:
+            queries = [f"part {i} of the homework question" for i in range(count)]
+            
+            state.reset_counts()
+            start = time.perf_counter()
+            sequential = [store.search(query) for query in queries]
+            sequential_elapsed, sequential_requests = time.perf_counter() - start, sum(state.requests.values())
+            
+            state.reset_counts()
+            start = time.perf_counter()
+            batched = store.search_many(queries)
+            batched_elapsed, batched_requests = time.perf_counter() - start, sum(state.requests.values())
+            
+            assert [len(result) for result in batched] == [len(result) for result in sequential]
+            logger.info(
+                f"{count:>4} queries: sequential {sequential_requests:3} requests {sequential_elapsed * 1000:8.1f} ms, "
+                f"search_many {batched_requests:3} requests {batched_elapsed * 1000:8.1f} ms"
+            )
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
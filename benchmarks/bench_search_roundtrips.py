@@ -0,0 +1,63 @@
+"""
+Benchmark round-trips and latency per question on the search path against a
+fake Weaviate server.
+
+"cold" reconnects and clears the cached schema and object-count flags
+before every question, which is what each question used to cost; "cached"
+is the steady state, where only the search query itself goes to the server.
+
+Usage:
+    python -m benchmarks.bench_search_roundtrips --questions 200 --request-latency-ms 2
+"""
+import time
+import logging
+import argparse
+
+import numpy as np
+
+from benchmarks.fake_weaviate import start_server
+from benchmarks.bench_batch_insert import make_documents
+from src.langgraph.document_processing.document_processor import DocumentProcessor
+from src.langgraph.document_processing.vector_store import WeaviateVectorStore
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark search round-trips')
+    parser.add_argument('--questions', type=int, default=200, help='Number of questions per mode')
+    parser.add_argument('--request-latency-ms', type=float, default=2.0, help='Simulated latency per request')
+    args = parser.parse_args()
+    
+    server, state = start_server(base_latency_ms=0.0, per_object_latency_ms=0.0, request_latency_ms=args.request_latency_ms)
+    port = str(server.server_address[1])
+    logging.getLogger("src.langgraph.document_processing").setLevel(logging.WARNING)
+    
+    store = WeaviateVectorStore(host="127.0.0.1", port=port, index_name="BenchSearchDocuments")
+    processor = DocumentProcessor(vector_store=store)
+    store.add_documents(make_documents(100))
+    
+    try:
+        for name, cold in (("cold (previous)", True), ("cached", False)):
+            state.reset_counts()
+            latencies = []
+            for i in range(args.questions):
+                start = time.perf_counter()
+                if cold:
+                    store.connect(force=True)
+                    store.index_state.invalidate(schema=True)
+                processor.search_documents(f"question {i} about osmosis", limit=5)
+                latencies.append(time.perf_counter() - start)
+                
+            requests = sum(state.requests.values()) / args.questions
+            logger.info(
+                f"{name:<16} {requests:5.2f} requests/question, "
+                f"p50 {np.percentile(latencies, 50) * 1000:7.2f} ms, p99 {np.percentile(latencies, 99) * 1000:7.2f} ms"
+            )
+            logger.info(f"{name:<16} requests: {state.requests}")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
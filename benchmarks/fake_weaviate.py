@@ -0,0 +1,213 @@
+"""
+A stand-in HTTP server that mimics the parts of the Weaviate REST API used by
+WeaviateVectorStore, with configurable latency and failure injection.
+
+It answers readiness, meta and schema requests, accepts batch object
+creation with a latency of base + per-object cost, answers GraphQL Get and
+Aggregate queries from the stored objects, and counts every request and
+TCP connection so benchmarks can report round-trips as well as timings.
+Every other request takes request_latency_ms, standing in for the network
+round-trip.
+
+Usage:
+    python -m benchmarks.fake_weaviate --port 8089 --base-latency-ms 20
+"""
+import re
+import json
+import time
+import random
+import socket
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+class FakeWeaviateState:
+    """
+    Shared, thread-safe state of the fake server.
+    """
+    
+    def __init__(
+        self,
+        base_latency_ms: float = 20.0,
+        per_object_latency_ms: float = 0.2,
+        failure_rate: float = 0.0,
+        max_concurrency: int = 8,
+        request_latency_ms: float = 0.0,
+        seed: int = 42
+    ):
+        self.base_latency_ms = base_latency_ms
+        self.per_object_latency_ms = per_object_latency_ms
+        self.request_latency_ms = request_latency_ms
+        self.failure_rate = failure_rate
+        self.classes = {}
+        self.objects = {}
+        self.requests = {}
+        self.connections = 0
+        self.lock = threading.Lock()
+        self.random = random.Random(seed)
+        # Like a real server, only so many batches are vectorized at once
+        self.workers = threading.Semaphore(max_concurrency)
+        
+    def count(self, key: str) -> None:
+        with self.lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+            
+    def reset_counts(self) -> None:
+        with self.lock:
+            self.requests = {}
+            self.connections = 0
+            
+    def delay(self) -> None:
+        if self.request_latency_ms:
+            time.sleep(self.request_latency_ms / 1000)
+            
+    def graphql(self, query: str):
+        """
+        Answer a GraphQL Get or Aggregate query with the stored objects.
+        """
+        aggregate = re.search(r"Aggregate\s*{\s*(\w+)", query)
+        if aggregate:
+            name = aggregate.group(1)
+            with self.lock:
+                count = sum(1 for obj in self.objects.values() if obj.get("class") == name)
+            return {"data": {"Aggregate": {name: [{"meta": {"count": count}}]}}}
+            
+        # One block per class, or several aliased ones from multi_get
+        results = {}
+        for block in re.finditer(r"(?:(\w+):\s*)?([A-Z]\w*)\s*\(([^)]*)\)", query):
+            alias, name, arguments = block.groups()
+            limit = re.search(r"limit:\s*(\d+)", arguments)
+            limit = int(limit.group(1)) if limit else 10
+            with self.lock:
+                matches = [obj for obj in self.objects.values() if obj.get("class") == name][:limit]
+            results[alias or name] = [
+                dict(obj.get("properties", {}), _additional={"id": obj.get("id"), "distance": 0.5})
+                for obj in matches
+            ]
+        return {"data": {"Get": results}}
+
+def make_handler(state: FakeWeaviateState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        
+        def setup(self):
+            super().setup()
+            # Headers and body are written separately; don't let Nagle hold the body back
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with state.lock:
+                state.connections += 1
+                
+        def log_message(self, format, *args):
+            pass
+            
+        def _send(self, status: int, body=None) -> None:
+            payload = json.dumps(body).encode("utf-8") if body is not None else b""
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            
+        def _read_json(self):
+            length = int(self.headers.get("Content-Length", 0))
+            return json.loads(self.rfile.read(length) or b"{}")
+            
+        def do_GET(self):
+            path = urlparse(self.path).path
+            state.count(f"GET {path}")
+            state.delay()
+            if path.startswith("/v1/.well-known/"):
+                self._send(200)
+            elif path == "/v1/meta":
+                self._send(200, {"hostname": "http://[::]:8080", "version": "1.20.5", "modules": {}})
+            elif path == "/v1/schema":
+                self._send(200, {"classes": list(state.classes.values())})
+            elif path.startswith("/v1/schema/"):
+                name = path.rsplit("/", 1)[-1]
+                if name in state.classes:
+                    self._send(200, state.classes[name])
+                else:
+                    self._send(404)
+            else:
+                self._send(404)
+                
+        def do_POST(self):
+            path = urlparse(self.path).path
+            state.count(f"POST {path}")
+            body = self._read_json()
+            if path == "/v1/schema":
+                state.classes[body["class"]] = body
+                self._send(200, body)
+            elif path == "/v1/batch/objects":
+                objects = body.get("objects", [])
+                with state.workers:
+                    time.sleep((state.base_latency_ms + state.per_object_latency_ms * len(objects)) / 1000)
+                results = []
+                for obj in objects:
+                    result = dict(obj)
+                    if state.failure_rate and state.random.random() < state.failure_rate:
+                        result["result"] = {"errors": {"error": [{"message": "injected failure"}]}}
+                    else:
+                        with state.lock:
+                            state.objects[obj.get("id")] = obj
+                        result["result"] = {}
+                    results.append(result)
+                self._send(200, results)
+            elif path == "/v1/graphql":
+                state.delay()
+                self._send(200, state.graphql(body.get("query", "")))
+            else:
+                self._send(404)
+                
+        def do_DELETE(self):
+            path = urlparse(self.path).path
+            state.count(f"DELETE {path}")
+            self._send(200, {"results": {"successful": 0, "matches": 0}})
+            
+    return Handler
+
+class FakeWeaviateServer(ThreadingHTTPServer):
+    # Many clients may connect at once; the default backlog of 5 drops them
+    request_queue_size = 1024
+    daemon_threads = True
+
+def start_server(port: int = 0, **kwargs):
+    """
+    Start the fake server on a background thread.
+    
+    Args:
+        port: Port to listen on (0 picks a free port)
+        **kwargs: Options for FakeWeaviateState
+        
+    Returns:
+        Tuple of (server, state); call server.shutdown() to stop it
+    """
+    state = FakeWeaviateState(**kwargs)
+    server = FakeWeaviateServer(("127.0.0.1", port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='Run a fake Weaviate server')
+    parser.add_argument('--port', type=int, default=8089, help='Port to listen on')
+    parser.add_argument('--base-latency-ms', type=float, default=20.0, help='Fixed latency per batch request')
+    parser.add_argument('--per-object-latency-ms', type=float, default=0.2, help='Added latency per object')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of objects rejected')
+    args = parser.parse_args()
+    
+    server, _ = start_server(
+        args.port,
+        base_latency_ms=args.base_latency_ms,
+        per_object_latency_ms=args.per_object_latency_ms,
+        failure_rate=args.failure_rate
+    )
+    logger.info(f"Fake Weaviate listening on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
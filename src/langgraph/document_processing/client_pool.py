@@ -0,0 +1,279 @@
+"""
+Client pool module for sharing Weaviate clients across sessions.
+"""
+import os
+import time
+import asyncio
+import logging
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+import aiohttp
+import weaviate
+from weaviate.config import Config, ConnectionConfig
+
+logger = logging.getLogger(__name__)
+
+class PooledClient:
+    """
+    A Weaviate client shared by every store connecting with the same
+    host, port and credentials.
+    """
+    
+    def __init__(self, url: str, api_key: Optional[str]):
+        self.url = url
+        self.api_key = api_key
+        self.client = None
+        self.healthy = False
+        self.last_check = 0.0
+        # client.batch is a single stateful object per client, so ingestions
+        # sharing the client take turns
+        self.batch_lock = threading.Lock()
+        self.lock = threading.Lock()
+        # aiohttp sessions are bound to the event loop they were created on
+        self.async_sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+        self.async_sessions_lock = threading.Lock()
+
+class WeaviateClientPool:
+    """
+    A process-wide, thread-safe registry of Weaviate clients.
+    
+    Clients are keyed by (host, port, api key), so all UI components, graph
+    nodes and Streamlit sessions share one client, and with it one pool of
+    keep-alive HTTP connections, per server instead of one per session. A
+    background thread probes each client's readiness; a client that failed
+    its probe is replaced the next time it is requested.
+    """
+    
+    def __init__(
+        self,
+        pool_size: int = int(os.getenv("WEAVIATE_POOL_SIZE", "20")),
+        health_check_interval: float = float(os.getenv("WEAVIATE_HEALTH_CHECK_INTERVAL", "30"))
+    ):
+        """
+        Initialize the client pool.
+        
+        Args:
+            pool_size: Keep-alive connections kept open per client; requests
+                beyond this many in flight use short-lived connections
+            health_check_interval: Seconds between background readiness
+                probes (0 disables them)
+        """
+        self.pool_size = pool_size
+        self.health_check_interval = health_check_interval
+        self._clients: Dict[Tuple[str, str, str], PooledClient] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._health_thread = None
+        
+    def acquire(
+        self,
+        host: str,
+        port: str,
+        api_key: Optional[str] = None,
+        reconnect: bool = False
+    ) -> PooledClient:
+        """
+        Get the shared client for a server, connecting if needed.
+        
+        Args:
+            host: Weaviate host address
+            port: Weaviate port
+            api_key: Weaviate API key (if using cloud)
+            reconnect: Whether to replace the client even if it is healthy
+            
+        Returns:
+            PooledClient holding a ready client
+        """
+        key = (host, str(port), api_key or "")
+        with self._lock:
+            pooled = self._clients.get(key)
+            if pooled is None:
+                pooled = self._clients[key] = PooledClient(f"http://{host}:{port}", api_key)
+                
+        with pooled.lock:
+            if pooled.client is None or not pooled.healthy or reconnect:
+                self._connect(pooled)
+                
+        self._start_health_checks()
+        return pooled
+        
+    def _connect(self, pooled: PooledClient) -> None:
+        """
+        Create a new client for a pool entry.
+        
+        Args:
+            pooled: Pool entry to connect
+        """
+        try:
+            auth_config = None
+            if pooled.api_key:
+                auth_config = weaviate.auth.AuthApiKey(api_key=pooled.api_key)
+                
+            client = weaviate.Client(
+                url=pooled.url,
+                auth_client_secret=auth_config,
+                additional_headers={
+                    "X-OpenAI-Api-Key": os.getenv("OPENAI_API_KEY", "")  # Optional for OpenAI models
+                },
+                additional_config=Config(
+                    connection_config=ConnectionConfig(
+                        session_pool_connections=self.pool_size,
+                        session_pool_maxsize=self.pool_size
+                    )
+                )
+            )
+            
+            if not client.is_ready():
+                raise ConnectionError("Weaviate server is not ready")
+                
+            pooled.client = client
+            pooled.healthy = True
+            pooled.last_check = time.monotonic()
+            logger.info(f"Successfully connected to Weaviate at {pooled.url}")
+            
+        except Exception as e:
+            pooled.healthy = False
+            logger.error(f"Error connecting to Weaviate: {e}")
+            raise
+            
+    def get_async_session(self, pooled: PooledClient) -> aiohttp.ClientSession:
+        """
+        Get the aiohttp session for a server on the running event loop.
+        
+        The session keeps up to pool_size keep-alive connections and is
+        reused by every async search on the same loop. Each loop gets its own
+        session, since a session can only be used on the loop it was created
+        on; sessions of loops that have since closed are dropped.
+        
+        Args:
+            pooled: Pool entry of the server
+            
+        Returns:
+            aiohttp.ClientSession with the client's headers
+        """
+        loop = asyncio.get_running_loop()
+        with pooled.async_sessions_lock:
+            for closed_loop in [other for other in pooled.async_sessions if other.is_closed()]:
+                # Its connections died with the loop; nothing is left to await
+                pooled.async_sessions.pop(closed_loop)
+                
+            session = pooled.async_sessions.get(loop)
+            if session is None or session.closed:
+                headers = {"X-OpenAI-Api-Key": os.getenv("OPENAI_API_KEY", "")}  # Optional for OpenAI models
+                if pooled.api_key:
+                    headers["Authorization"] = f"Bearer {pooled.api_key}"
+                session = pooled.async_sessions[loop] = aiohttp.ClientSession(
+                    headers=headers,
+                    connector=aiohttp.TCPConnector(limit=self.pool_size),
+                    timeout=aiohttp.ClientTimeout(total=60)
+                )
+        return session
+        
+    def _close_async_sessions(self, pooled: PooledClient) -> None:
+        """
+        Close a server's aiohttp sessions on their own event loops.
+        
+        Args:
+            pooled: Pool entry of the server
+        """
+        with pooled.async_sessions_lock:
+            sessions = list(pooled.async_sessions.items())
+            pooled.async_sessions.clear()
+            
+        for loop, session in sessions:
+            if session.closed or not loop.is_running():
+                continue
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if loop is running:
+                loop.create_task(session.close())
+            else:
+                try:
+                    asyncio.run_coroutine_threadsafe(session.close(), loop).result(timeout=5)
+                except Exception as e:
+                    logger.warning(f"Error closing the async session of {pooled.url}: {e}")
+                
+    def mark_unhealthy(self, pooled: PooledClient) -> None:
+        """
+        Flag a client as broken so the next acquire replaces it.
+        
+        Args:
+            pooled: Pool entry whose client failed
+        """
+        pooled.healthy = False
+        
+    def _start_health_checks(self) -> None:
+        if self.health_check_interval <= 0 or self._health_thread is not None:
+            return
+            
+        with self._lock:
+            if self._health_thread is None:
+                self._health_thread = threading.Thread(
+                    target=self._check_health, name="weaviate-health-check", daemon=True
+                )
+                self._health_thread.start()
+                
+    def _check_health(self) -> None:
+        """
+        Probe every client's readiness until the pool is closed.
+        """
+        while not self._stop.wait(self.health_check_interval):
+            with self._lock:
+                clients = list(self._clients.values())
+                
+            for pooled in clients:
+                if pooled.client is None:
+                    continue
+                try:
+                    healthy = pooled.client.is_ready()
+                except Exception:
+                    healthy = False
+                if pooled.healthy and not healthy:
+                    logger.warning(f"Weaviate at {pooled.url} failed its health check, will reconnect on next use")
+                pooled.healthy = healthy
+                pooled.last_check = time.monotonic()
+                
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the state of the pooled clients.
+        
+        Returns:
+            Dictionary with the number of clients and each client's health
+        """
+        with self._lock:
+            clients = list(self._clients.values())
+        return {
+            "clients": len(clients),
+            "pool_size": self.pool_size,
+            "servers": {pooled.url: pooled.healthy for pooled in clients},
+        }
+        
+    def close(self) -> None:
+        """
+        Stop the health checks, close the async sessions and drop all clients.
+        """
+        self._stop.set()
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for pooled in clients:
+            self._close_async_sessions(pooled)
+
+_pool: Optional[WeaviateClientPool] = None
+_pool_lock = threading.Lock()
+
+def get_client_pool() -> WeaviateClientPool:
+    """
+    Get the process-wide client pool, creating it on first use.
+    
+    Returns:
+        Shared WeaviateClientPool
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WeaviateClientPool()
+        return _pool
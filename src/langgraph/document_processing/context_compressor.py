@@ -0,0 +1,131 @@
+"""
+Context compressor module for keeping only the sentences relevant to a question.
+"""
+import os
+import math
+import logging
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from src.langgraph.document_processing.context_packer import SENTENCE_END
+
+logger = logging.getLogger(__name__)
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences, joining the lines of each sentence.
+    
+    Args:
+        text: Text to split
+        
+    Returns:
+        List of non-empty sentences
+    """
+    sentences = []
+    start = 0
+    for end in SENTENCE_END.finditer(text):
+        sentences.append(text[start:end.end()])
+        start = end.end()
+    sentences.append(text[start:])
+    return [" ".join(sentence.split()) for sentence in sentences if sentence.strip()]
+
+class ContextCompressor:
+    """
+    A query-focused extractive compressor for packed context passages.
+    
+    Every passage is split into sentences, and all sentences of a turn are
+    embedded in one batch and scored against the question by cosine
+    similarity with a single matrix-vector product. The best sentences are
+    kept in their original order, under a citation of the page they come
+    from. No LLM call is made.
+    """
+    
+    def __init__(
+        self,
+        embedder: Optional[Any] = None,
+        ratio: float = float(os.getenv("CONTEXT_COMPRESSION_RATIO", "0.35")),
+        min_similarity: float = float(os.getenv("CONTEXT_COMPRESSION_MIN_SIMILARITY", "0.1")),
+        min_sentences: int = 3
+    ):
+        """
+        Initialize the context compressor.
+        
+        Args:
+            embedder: EmbeddingModel used to embed the question and the
+                sentences (created lazily if not given)
+            ratio: Share of the sentences kept
+            min_similarity: Sentences less similar to the question are
+                dropped even if they are within the ratio
+            min_sentences: Number of best sentences always kept, whatever
+                the ratio and their similarity
+        """
+        self.embedder = embedder
+        self.ratio = ratio
+        self.min_similarity = min_similarity
+        self.min_sentences = min_sentences
+        
+    def get_embedder(self):
+        """
+        Get the embedding model, the process-wide one unless one was given.
+        
+        Returns:
+            EmbeddingModel used for questions and sentences
+        """
+        if self.embedder is None:
+            from src.langgraph.document_processing.embedding import get_embedding_model
+            self.embedder = get_embedding_model()
+        return self.embedder
+        
+    def compress(self, query: str, passages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Keep the sentences of the passages most similar to the question.
+        
+        Args:
+            query: The question the passages were retrieved for
+            passages: Passages built by the context packer
+            
+        Returns:
+            Passages whose content is the kept sentences, prefixed with their
+            file and page; passages without kept sentences are left out
+        """
+        sentences = [split_sentences(passage["content"]) for passage in passages]
+        flat = [sentence for passage_sentences in sentences for sentence in passage_sentences]
+        if len(flat) <= self.min_sentences:
+            return passages
+            
+        try:
+            embedder = self.get_embedder()
+            # Sentences are one-off texts; caching them would evict chunk embeddings
+            vectors = np.asarray(embedder.embed(flat + [query], use_cache=False), dtype=np.float32)
+            vectors, query_vector = vectors[:-1], vectors[-1]
+        except Exception as e:
+            # The uncompressed context is still a valid prompt
+            logger.warning(f"Error embedding sentences for compression: {e}")
+            return passages
+            
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        query_vector /= max(float(np.linalg.norm(query_vector)), 1e-12)
+        scores = vectors @ query_vector
+        
+        keep = max(self.min_sentences, math.ceil(self.ratio * len(flat)))
+        ranked = np.argsort(-scores)
+        kept = set(ranked[:self.min_sentences].tolist())
+        kept.update(int(i) for i in ranked[self.min_sentences:keep] if scores[i] >= self.min_similarity)
+        
+        compressed = []
+        offset = 0
+        for passage, passage_sentences in zip(passages, sentences):
+            selected = [
+                sentence for i, sentence in enumerate(passage_sentences, start=offset) if i in kept
+            ]
+            offset += len(passage_sentences)
+            if not selected:
+                continue
+                
+            metadata = passage["metadata"]
+            citation = f"[{metadata.get('file_name', 'Unknown')}, p. {metadata.get('page', '?')}]"
+            compressed.append(dict(passage, content=citation + " " + " ".join(selected)))
+            
+        logger.info(f"Kept {len(kept)} of {len(flat)} sentences from {len(passages)} passages")
+        return compressed
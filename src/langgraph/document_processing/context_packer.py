@@ -0,0 +1,309 @@
+"""
+Context packer module for fitting retrieved chunks into a prompt token budget.
+"""
+import os
+import re
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Context tokens per Groq model, sized to leave room for the chat history and
+# the answer and to stay inside each model's tokens-per-minute limit
+MODEL_TOKEN_BUDGETS = {
+    "llama3-8b-8192": 1500,
+    "llama3-70b-8192": 1000,
+    "gemma2-9b-it": 1200,
+}
+DEFAULT_TOKEN_BUDGET = 1500
+
+# End of a sentence: terminal punctuation, optional closing quotes or brackets, whitespace
+SENTENCE_END = re.compile(r"[.!?][\"')\]]*(?:\s+|$)")
+FINISHED = re.compile(r"[.!?:][\"')\]]*$")
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of LLM tokens in a text.
+    
+    Args:
+        text: Text to measure
+        
+    Returns:
+        Approximate token count (about four characters per token)
+    """
+    return (len(text) + 3) // 4
+
+def get_token_budget(
+    model_name: Optional[str] = None,
+    budget: Optional[str] = os.getenv("CONTEXT_TOKEN_BUDGET")
+) -> int:
+    """
+    Get the context token budget for a model.
+    
+    Args:
+        model_name: Name of the chat model
+        budget: Budget that overrides the per-model defaults
+        
+    Returns:
+        Maximum number of context tokens per prompt
+    """
+    if budget:
+        return int(budget)
+    return MODEL_TOKEN_BUDGETS.get(model_name, DEFAULT_TOKEN_BUDGET)
+
+def _chunk_key(metadata: Dict[str, Any]) -> Tuple[str, int]:
+    return str(metadata.get("source") or metadata.get("file_name", "")), int(metadata.get("chunk", 0))
+
+def _overlap(first: str, second: str, max_overlap: int, min_overlap: int = 16) -> int:
+    """
+    Length of the longest suffix of first that is a prefix of second.
+    """
+    for length in range(min(len(first), len(second), max_overlap), min_overlap - 1, -1):
+        if first.endswith(second[:length]):
+            return length
+    return 0
+
+def _join(first: str, second: str, max_overlap: int) -> str:
+    """
+    Join the texts of two consecutive chunks, dropping their shared overlap.
+    """
+    length = _overlap(first, second, max_overlap)
+    if length:
+        return first + second[length:]
+    return first + "\n" + second
+
+class ContextPacker:
+    """
+    A packer that turns retrieved chunks into the context of one prompt.
+    
+    Hits below the relevance cutoff are dropped (the best hit is always
+    kept), consecutive chunks of the same page are merged into one passage
+    without the text they share through the chunk overlap, and a passage
+    that starts or ends mid-sentence is completed from its neighbouring
+    chunk. Neighbours that were not retrieved are fetched from the store in
+    one batched request. Passages are then added in order of relevance until
+    the token budget is full.
+    """
+    
+    def __init__(
+        self,
+        vector_store: Optional[Any] = None,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        min_relevance: float = float(os.getenv("CONTEXT_MIN_RELEVANCE", "0.2")),
+        fetch_neighbours: bool = os.getenv("CONTEXT_FETCH_NEIGHBOURS", "true").lower() == "true",
+        max_overlap: int = 400,
+        min_passage_tokens: int = 64
+    ):
+        """
+        Initialize the context packer.
+        
+        Args:
+            vector_store: Store neighbouring chunks are fetched from (None
+                disables neighbour fetching)
+            token_budget: Maximum number of context tokens
+            min_relevance: Hits with a lower relevance score are dropped
+            fetch_neighbours: Whether to complete passages cut at a chunk
+                boundary from the neighbouring chunks
+            max_overlap: Maximum characters shared by consecutive chunks
+            min_passage_tokens: Smallest truncated passage worth adding when
+                the next one does not fit the remaining budget
+        """
+        self.vector_store = vector_store
+        self.token_budget = token_budget
+        self.min_relevance = min_relevance
+        self.fetch_neighbours = fetch_neighbours
+        self.max_overlap = max_overlap
+        self.min_passage_tokens = min_passage_tokens
+        
+    def pack(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Pack retrieved documents into passages that fit the token budget.
+        
+        Args:
+            documents: Documents returned by the retriever, best first
+            
+        Returns:
+            List of passages with content, metadata and relevance_score
+        """
+        hits, retrieved = self._select(documents)
+        keys = self._neighbour_keys(hits, retrieved)
+        neighbours = self._fetch(keys) if keys else []
+        return self._assemble(hits, retrieved, neighbours)
+        
+    async def apack(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Pack retrieved documents without blocking the event loop; the
+        neighbour fetch, if any, runs in a worker thread.
+        
+        Args:
+            documents: Documents returned by the retriever, best first
+            
+        Returns:
+            List of passages with content, metadata and relevance_score
+        """
+        hits, retrieved = self._select(documents)
+        keys = self._neighbour_keys(hits, retrieved)
+        neighbours = await asyncio.to_thread(self._fetch, keys) if keys else []
+        return self._assemble(hits, retrieved, neighbours)
+        
+    def _select(
+        self,
+        documents: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], Dict[Tuple[str, int], Dict[str, Any]]]:
+        """
+        Score and de-duplicate the retrieved documents and apply the cutoff.
+        
+        Returns:
+            Kept hits sorted by relevance, and every retrieved document by
+            chunk key (dropped hits can still complete a neighbour)
+        """
+        retrieved = {}
+        for doc in documents:
+            key = _chunk_key(doc["metadata"])
+            relevance = 1.0 - doc.get("_distance", 0.0)  # Convert distance to similarity
+            if key not in retrieved or relevance > retrieved[key]["relevance_score"]:
+                retrieved[key] = {"text": doc["text"], "metadata": doc["metadata"], "relevance_score": relevance}
+                
+        ranked = sorted(retrieved.values(), key=lambda hit: hit["relevance_score"], reverse=True)
+        hits = [hit for i, hit in enumerate(ranked) if i == 0 or hit["relevance_score"] >= self.min_relevance]
+        if len(hits) < len(ranked):
+            logger.info(f"Dropped {len(ranked) - len(hits)} hits below relevance {self.min_relevance}")
+        return hits, retrieved
+        
+    def _neighbour_keys(
+        self,
+        hits: List[Dict[str, Any]],
+        retrieved: Dict[Tuple[str, int], Dict[str, Any]]
+    ) -> List[Tuple[str, int]]:
+        """
+        Find the neighbouring chunks needed to complete cut sentences that
+        were not among the retrieved documents.
+        """
+        if not self.fetch_neighbours or self.vector_store is None:
+            return []
+            
+        keys = []
+        for hit in hits:
+            source, chunk = _chunk_key(hit["metadata"])
+            text = hit["text"].strip()
+            if self._starts_mid_sentence(text) and chunk > 1:
+                keys.append((source, chunk - 1))
+            if self._ends_mid_sentence(text):
+                keys.append((source, chunk + 1))
+        return sorted(set(key for key in keys if key not in retrieved))
+        
+    def _fetch(self, keys: List[Tuple[str, int]]) -> List[Dict[str, Any]]:
+        try:
+            return self.vector_store.fetch_chunks(keys)
+        except Exception as e:
+            # Packing still works without the neighbours
+            logger.warning(f"Error fetching neighbouring chunks: {e}")
+            return []
+            
+    def _assemble(
+        self,
+        hits: List[Dict[str, Any]],
+        retrieved: Dict[Tuple[str, int], Dict[str, Any]],
+        neighbours: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Merge hits into passages, complete them and fill the token budget.
+        """
+        chunks = dict(retrieved)
+        for doc in neighbours:
+            chunks.setdefault(_chunk_key(doc["metadata"]), doc)
+            
+        # Runs of consecutive chunks from the same page become one passage
+        groups = []
+        for hit in sorted(hits, key=lambda hit: _chunk_key(hit["metadata"])):
+            source, chunk = _chunk_key(hit["metadata"])
+            page = hit["metadata"].get("page")
+            last = groups[-1] if groups else None
+            if last and last["source"] == source and last["page"] == page and last["chunks"][-1] == chunk - 1:
+                last["text"] = _join(last["text"], hit["text"], self.max_overlap)
+                last["chunks"].append(chunk)
+                last["relevance_score"] = max(last["relevance_score"], hit["relevance_score"])
+            else:
+                groups.append({
+                    "source": source,
+                    "page": page,
+                    "chunks": [chunk],
+                    "text": hit["text"],
+                    "metadata": hit["metadata"],
+                    "relevance_score": hit["relevance_score"]
+                })
+                
+        for group in groups:
+            before = chunks.get((group["source"], group["chunks"][0] - 1))
+            if before is not None and before["metadata"].get("page") == group["page"]:
+                group["text"] = self._complete_start(before["text"], group["text"])
+            after = chunks.get((group["source"], group["chunks"][-1] + 1))
+            if after is not None and after["metadata"].get("page") == group["page"]:
+                group["text"] = self._complete_end(group["text"], after["text"])
+                
+        passages = []
+        remaining = self.token_budget
+        for group in sorted(groups, key=lambda group: group["relevance_score"], reverse=True):
+            text = group["text"].strip()
+            tokens = estimate_tokens(text)
+            if tokens > remaining:
+                if remaining < self.min_passage_tokens:
+                    continue
+                text = self._truncate(text, remaining)
+                tokens = estimate_tokens(text)
+                
+            remaining -= tokens
+            metadata = dict(group["metadata"])
+            metadata["chunks"] = group["chunks"]
+            passages.append({
+                "content": text,
+                "metadata": metadata,
+                "relevance_score": group["relevance_score"]
+            })
+            
+        return passages
+        
+    @staticmethod
+    def _starts_mid_sentence(text: str) -> bool:
+        return bool(text) and (text[0].islower() or text[0] in ",;")
+        
+    @staticmethod
+    def _ends_mid_sentence(text: str) -> bool:
+        return bool(text) and not FINISHED.search(text)
+        
+    def _complete_start(self, before: str, text: str) -> str:
+        """
+        Prepend the start of the sentence text was cut in from the previous chunk.
+        """
+        if not self._starts_mid_sentence(text.strip()):
+            return text
+        length = _overlap(before, text, self.max_overlap)
+        position = len(before) - length
+        ends = list(SENTENCE_END.finditer(before, max(0, position - self.max_overlap), position))
+        if not ends:
+            return text
+        return before[ends[-1].end():position] + ("" if length else " ") + text
+        
+    def _complete_end(self, text: str, after: str) -> str:
+        """
+        Append the end of the sentence text was cut in from the next chunk.
+        """
+        if not self._ends_mid_sentence(text.strip()):
+            return text
+        position = _overlap(text, after, self.max_overlap)
+        end = SENTENCE_END.search(after, position, position + self.max_overlap)
+        if end is None:
+            return text
+        return text + ("" if position else " ") + after[position:end.end()].rstrip()
+        
+    @staticmethod
+    def _truncate(text: str, tokens: int) -> str:
+        """
+        Cut text to a number of tokens, at a sentence end when there is one.
+        """
+        text = text[:tokens * 4]
+        ends = list(SENTENCE_END.finditer(text))
+        if ends and ends[-1].end() > len(text) // 2:
+            return text[:ends[-1].end()].rstrip()
+        return text
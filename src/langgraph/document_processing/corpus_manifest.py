@@ -0,0 +1,423 @@
+"""
+Corpus manifest module for content-addressed, reference-counted ingestion.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import List, Dict, Any, Optional, Union, Set
+
+logger = logging.getLogger(__name__)
+
+class CorpusManifest:
+    """
+    A SQLite-backed manifest mapping file content hashes to stored chunks.
+    
+    Every (file, uploader) pair holds one reference on each distinct chunk of
+    the file. Re-uploading a known file only attaches the new uploader, and
+    releasing a file reports the chunks whose reference count dropped to zero
+    so the caller can delete exactly those from the vector store.
+    """
+    
+    def __init__(
+        self,
+        db_path: str = os.getenv("CORPUS_MANIFEST_PATH", "data/corpus_manifest.db")
+    ):
+        """
+        Initialize the corpus manifest.
+        
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS files (
+                file_hash TEXT PRIMARY KEY,
+                file_name TEXT NOT NULL,
+                chunk_ids TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS files_by_name ON files (file_name);
+            CREATE TABLE IF NOT EXISTS file_uploaders (
+                file_hash TEXT NOT NULL,
+                uploader TEXT NOT NULL,
+                PRIMARY KEY (file_hash, uploader)
+            );
+            CREATE TABLE IF NOT EXISTS uploaders (
+                uploader TEXT PRIMARY KEY,
+                last_seen REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS chunk_refs (
+                chunk_id TEXT PRIMARY KEY,
+                refcount INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                file_hash TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                page_hash TEXT NOT NULL,
+                first_chunk INTEGER NOT NULL,
+                chunk_ids TEXT NOT NULL,
+                PRIMARY KEY (file_hash, page)
+            );
+            """
+        )
+        
+    @staticmethod
+    def hash_file(file_path: str) -> str:
+        """
+        Compute the content hash of a file without reading it all into memory.
+        
+        Args:
+            file_path: Path to the file
+            
+        Returns:
+            Hex SHA-256 digest of the file content
+        """
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+        
+    @staticmethod
+    def hash_bytes(data: Union[bytes, memoryview]) -> str:
+        """
+        Compute the content hash of an in-memory file.
+        
+        Args:
+            data: File content, e.g. UploadedFile.getbuffer()
+            
+        Returns:
+            Hex SHA-256 digest of the content
+        """
+        return hashlib.sha256(data).hexdigest()
+        
+    def lookup(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up an ingested file by content hash.
+        
+        Args:
+            file_hash: Content hash of the file
+            
+        Returns:
+            File record with file_name, chunk_ids and uploaders, or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT file_name, chunk_ids FROM files WHERE file_hash = ?", (file_hash,)
+            ).fetchone()
+            if row is None:
+                return None
+                
+            uploaders = [
+                uploader for (uploader,) in self._conn.execute(
+                    "SELECT uploader FROM file_uploaders WHERE file_hash = ?", (file_hash,)
+                )
+            ]
+            
+        return {
+            "file_hash": file_hash,
+            "file_name": row[0],
+            "chunk_ids": json.loads(row[1]),
+            "uploaders": uploaders
+        }
+        
+    def find_by_name(self, file_name: str) -> List[Dict[str, Any]]:
+        """
+        Find ingested versions of a file by name.
+        
+        Args:
+            file_name: Name of the file
+            
+        Returns:
+            File records, newest first
+        """
+        with self._lock:
+            hashes = [
+                file_hash for (file_hash,) in self._conn.execute(
+                    "SELECT file_hash FROM files WHERE file_name = ? ORDER BY created_at DESC", (file_name,)
+                )
+            ]
+        return [record for record in map(self.lookup, hashes) if record]
+        
+    @staticmethod
+    def hash_text(text: str) -> str:
+        """
+        Compute the fingerprint of a page of text.
+        
+        Args:
+            text: Page text
+            
+        Returns:
+            Hex SHA-256 digest of the text
+        """
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+        
+    def register(
+        self,
+        file_hash: str,
+        file_name: str,
+        chunk_ids: List[str],
+        uploader: str,
+        pages: Optional[List[Dict[str, Any]]] = None
+    ) -> None:
+        """
+        Record a newly ingested file and attach its first uploader.
+        
+        Args:
+            file_hash: Content hash of the file
+            file_name: Name of the file
+            chunk_ids: IDs of the chunks stored for the file
+            uploader: Identifier of the uploader
+            pages: Optional per-page fingerprints, each with page, page_hash,
+                first_chunk and chunk_ids, used for incremental re-ingestion
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (file_hash, file_name, chunk_ids, created_at) VALUES (?, ?, ?, ?)",
+                (file_hash, file_name, json.dumps(chunk_ids), time.time())
+            )
+            if pages:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO pages (file_hash, page, page_hash, first_chunk, chunk_ids) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (file_hash, page["page"], page["page_hash"], page["first_chunk"], json.dumps(page["chunk_ids"]))
+                        for page in pages
+                    ]
+                )
+            self._attach(file_hash, uploader)
+        logger.info(f"Registered {file_name} ({file_hash[:12]}) with {len(chunk_ids)} chunks")
+        
+    def get_pages(self, file_hash: str) -> Dict[int, Dict[str, Any]]:
+        """
+        Get the per-page fingerprints recorded for a file.
+        
+        Args:
+            file_hash: Content hash of the file
+            
+        Returns:
+            Mapping of page number to page_hash, first_chunk and chunk_ids
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page, page_hash, first_chunk, chunk_ids FROM pages WHERE file_hash = ?", (file_hash,)
+            ).fetchall()
+            
+        return {
+            page: {"page_hash": page_hash, "first_chunk": first_chunk, "chunk_ids": json.loads(chunk_ids)}
+            for page, page_hash, first_chunk, chunk_ids in rows
+        }
+        
+    def stored_chunks(self, chunk_ids: List[str]) -> Set[str]:
+        """
+        Find which chunks are already stored, i.e. referenced by some file.
+        
+        Args:
+            chunk_ids: Chunk IDs to check
+            
+        Returns:
+            The subset of chunk_ids that is currently referenced
+        """
+        chunk_ids = list(set(chunk_ids))
+        stored = set()
+        with self._lock:
+            for start in range(0, len(chunk_ids), 500):
+                batch = chunk_ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                stored.update(
+                    chunk_id for (chunk_id,) in self._conn.execute(
+                        f"SELECT chunk_id FROM chunk_refs WHERE refcount > 0 AND chunk_id IN ({placeholders})",
+                        batch
+                    )
+                )
+        return stored
+        
+    def attach(self, file_hash: str, uploader: str) -> List[str]:
+        """
+        Attach an uploader to an ingested file, referencing its chunks.
+        
+        Args:
+            file_hash: Content hash of the file
+            uploader: Identifier of the uploader
+            
+        Returns:
+            IDs of the file's chunks
+        """
+        with self._lock, self._conn:
+            return self._attach(file_hash, uploader)
+            
+    def _attach(self, file_hash: str, uploader: str) -> List[str]:
+        """
+        Attach an uploader to a file inside the caller's transaction.
+        
+        The caller must hold the lock and the connection's transaction.
+        
+        Args:
+            file_hash: Content hash of the file
+            uploader: Identifier of the uploader
+            
+        Returns:
+            IDs of the file's chunks
+        """
+        row = self._conn.execute(
+            "SELECT chunk_ids FROM files WHERE file_hash = ?", (file_hash,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"File {file_hash} is not in the manifest")
+        chunk_ids = json.loads(row[0])
+        
+        inserted = self._conn.execute(
+            "INSERT OR IGNORE INTO file_uploaders (file_hash, uploader) VALUES (?, ?)",
+            (file_hash, uploader)
+        ).rowcount
+        self._touch(uploader)
+        
+        # An uploader holds a single reference, however often they re-upload
+        if inserted:
+            self._conn.executemany(
+                "INSERT INTO chunk_refs (chunk_id, refcount) VALUES (?, 1) "
+                "ON CONFLICT(chunk_id) DO UPDATE SET refcount = refcount + 1",
+                [(chunk_id,) for chunk_id in set(chunk_ids)]
+            )
+            
+        return chunk_ids
+        
+    def touch(self, uploader: str) -> None:
+        """
+        Record that an uploader is still active, so their files are not
+        reported by idle_uploaders.
+        
+        Args:
+            uploader: Identifier of the uploader
+        """
+        with self._lock, self._conn:
+            self._touch(uploader)
+            
+    def _touch(self, uploader: str) -> None:
+        """
+        Update an uploader's last-seen time inside the caller's transaction.
+        
+        Args:
+            uploader: Identifier of the uploader
+        """
+        self._conn.execute(
+            "INSERT INTO uploaders (uploader, last_seen) VALUES (?, ?) "
+            "ON CONFLICT(uploader) DO UPDATE SET last_seen = excluded.last_seen",
+            (uploader, time.time())
+        )
+        
+    def idle_uploaders(self, max_age: float) -> List[str]:
+        """
+        Find uploaders holding files who have not been seen for a while.
+        
+        Uploaders that were never recorded as seen, e.g. per-session IDs
+        from before uploader activity was tracked, always count as idle.
+        
+        Args:
+            max_age: Seconds since an uploader was last seen
+            
+        Returns:
+            Identifiers of the idle uploaders
+        """
+        with self._lock:
+            return [
+                uploader for (uploader,) in self._conn.execute(
+                    "SELECT DISTINCT f.uploader FROM file_uploaders f "
+                    "LEFT JOIN uploaders u ON u.uploader = f.uploader "
+                    "WHERE u.last_seen IS NULL OR u.last_seen < ?",
+                    (time.time() - max_age,)
+                )
+            ]
+            
+            
+    def release(self, file_hash: str, uploader: str) -> List[str]:
+        """
+        Detach an uploader from a file and drop its chunk references.
+        
+        Args:
+            file_hash: Content hash of the file
+            uploader: Identifier of the uploader
+            
+        Returns:
+            IDs of chunks that are no longer referenced and should be deleted
+        """
+        with self._lock, self._conn:
+            removed = self._conn.execute(
+                "DELETE FROM file_uploaders WHERE file_hash = ? AND uploader = ?",
+                (file_hash, uploader)
+            ).rowcount
+            row = self._conn.execute(
+                "SELECT chunk_ids FROM files WHERE file_hash = ?", (file_hash,)
+            ).fetchone()
+            if not removed or row is None:
+                return []
+                
+            chunk_ids = list(set(json.loads(row[0])))
+            self._conn.executemany(
+                "UPDATE chunk_refs SET refcount = refcount - 1 WHERE chunk_id = ?",
+                [(chunk_id,) for chunk_id in chunk_ids]
+            )
+            
+            orphaned = []
+            for start in range(0, len(chunk_ids), 500):
+                batch = chunk_ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                orphaned.extend(
+                    chunk_id for (chunk_id,) in self._conn.execute(
+                        f"SELECT chunk_id FROM chunk_refs WHERE refcount <= 0 AND chunk_id IN ({placeholders})",
+                        batch
+                    )
+                )
+            self._conn.executemany(
+                "DELETE FROM chunk_refs WHERE chunk_id = ?", [(chunk_id,) for chunk_id in orphaned]
+            )
+            
+            remaining = self._conn.execute(
+                "SELECT COUNT(*) FROM file_uploaders WHERE file_hash = ?", (file_hash,)
+            ).fetchone()[0]
+            if remaining == 0:
+                self._conn.execute("DELETE FROM files WHERE file_hash = ?", (file_hash,))
+                self._conn.execute("DELETE FROM pages WHERE file_hash = ?", (file_hash,))
+                
+        logger.info(f"Released {file_hash[:12]} for {uploader}, {len(orphaned)} chunks orphaned")
+        return orphaned
+        
+    def uploader_files(self, uploader: str) -> List[str]:
+        """
+        Find the files an uploader holds references on.
+        
+        Args:
+            uploader: Identifier of the uploader
+            
+        Returns:
+            Content hashes of the uploader's files
+        """
+        with self._lock:
+            return [
+                file_hash for (file_hash,) in self._conn.execute(
+                    "SELECT file_hash FROM file_uploaders WHERE uploader = ?", (uploader,)
+                )
+            ]
+            
+    def clear(self) -> None:
+        """
+        Remove every record from the manifest.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM files")
+            self._conn.execute("DELETE FROM file_uploaders")
+            self._conn.execute("DELETE FROM chunk_refs")
+            self._conn.execute("DELETE FROM pages")
+            self._conn.execute("DELETE FROM uploaders")
@@ -1,16 +1,102 @@
 """
 Document processor module to orchestrate the document processing pipeline.
 """
+import io
 import logging
 import os
-from typing import List, Dict, Any, Optional
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Callable, Union, Tuple, Iterable, Iterator, Sequence
 
 from src.langgraph.document_processing.pdf_loader import PDFLoader
-from src.langgraph.document_processing.text_chunker import TextChunker
-from src.langgraph.document_processing.vector_store import WeaviateVectorStore
+from src.langgraph.document_processing.text_chunker import TextChunker, OffsetTextChunker
+from src.langgraph.document_processing.vector_store import VectorStore, get_vector_store, make_document_id
+from src.langgraph.document_processing.corpus_manifest import CorpusManifest
 
 logger = logging.getLogger(__name__)
 
+def _extract_and_chunk(
+    source: Union[str, bytes],
+    file_name: str,
+    pdf_loader: PDFLoader,
+    chunker: Union[TextChunker, OffsetTextChunker],
+    chunk_docs: bool = True
+) -> Tuple[List[Dict[str, Any]], Dict[int, str]]:
+    """
+    Extract and optionally chunk a single PDF inside a worker process.
+    
+    Args:
+        source: Path to the PDF file or the raw bytes of an uploaded PDF
+        file_name: Display name of the file
+        pdf_loader: PDF loader to extract text with
+        chunker: Text chunker to split pages with
+        chunk_docs: Whether to chunk the documents or keep as full pages
+        
+    Returns:
+        Tuple of the processed documents and the page fingerprints
+    """
+    if isinstance(source, (bytes, bytearray)):
+        # Mimic the Streamlit UploadedFile interface used by the loader
+        buffer = io.BytesIO(source)
+        buffer.name = file_name
+        documents = pdf_loader.extract_text_from_uploaded_pdf(buffer)
+    else:
+        documents = pdf_loader.extract_text_from_pdf(source)
+        
+    page_hashes = _fingerprint_pages(documents)
+    if chunk_docs:
+        return chunker.chunk_text(documents), page_hashes
+    return documents, page_hashes
+
+def _fingerprint_pages(documents: List[Dict[str, Any]]) -> Dict[int, str]:
+    """
+    Fingerprint every page of a document by its text.
+    
+    Args:
+        documents: Page dictionaries as returned by the PDF loader
+        
+    Returns:
+        Mapping of page number to text hash
+    """
+    return {
+        doc["metadata"].get("page", 0): CorpusManifest.hash_text(doc["text"])
+        for doc in documents
+    }
+
+def _chunk_key(doc: Dict[str, Any]) -> Tuple[int, int, str]:
+    """
+    Get the page, chunk number and ID of a chunk (or page).
+    """
+    return doc["metadata"].get("page", 0), doc["metadata"].get("chunk", 0), make_document_id(doc["text"])
+
+def _page_records(
+    page_hashes: Dict[int, str],
+    chunk_keys: Iterable[Tuple[int, int, str]]
+) -> List[Dict[str, Any]]:
+    """
+    Build the per-page manifest records for a processed document.
+    
+    Args:
+        page_hashes: Mapping of page number to text hash
+        chunk_keys: (page, chunk number, chunk ID) of every chunk (or page)
+            that was stored, in order
+            
+    Returns:
+        Records with page, page_hash, first_chunk and chunk_ids
+    """
+    records = {
+        page: {"page": page, "page_hash": page_hash, "first_chunk": 0, "chunk_ids": []}
+        for page, page_hash in page_hashes.items()
+    }
+    for page, chunk, chunk_id in chunk_keys:
+        record = records.get(page)
+        if record is None:
+            continue
+        if not record["chunk_ids"]:
+            record["first_chunk"] = chunk
+        record["chunk_ids"].append(chunk_id)
+    return list(records.values())
+
 class DocumentProcessor:
     """
     A class to orchestrate the document processing pipeline.
@@ -18,27 +104,48 @@ class DocumentProcessor:
     
     def __init__(
         self,
-        vector_store: Optional[WeaviateVectorStore] = None,
+        vector_store: Optional[VectorStore] = None,
         chunk_size: int = 1000,
-        chunk_overlap: int = 200
+        chunk_overlap: int = 200,
+        max_workers: Optional[int] = None,
+        chunker: Optional[Union[TextChunker, OffsetTextChunker]] = None,
+        manifest: Optional[CorpusManifest] = None
     ):
         """
         Initialize the document processor.
         
         Args:
-            vector_store: Vector store for document storage
+            vector_store: Vector store for document storage (defaults to the
+                backend selected by VECTOR_STORE)
             chunk_size: Size of text chunks
             chunk_overlap: Overlap between chunks
+            max_workers: Number of worker processes used by process_many
+                (defaults to INGEST_MAX_WORKERS or the CPU count)
+            chunker: Chunker to split pages with (defaults to the one selected
+                by TEXT_CHUNKER, "langchain" or "offset")
+            manifest: Optional corpus manifest used to skip files that were
+                already ingested and to reference-count shared chunks
         """
         self.pdf_loader = PDFLoader()
-        self.chunker = TextChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-        self.vector_store = vector_store or WeaviateVectorStore()
+        if chunker is not None:
+            self.chunker = chunker
+        elif os.getenv("TEXT_CHUNKER", "langchain") == "offset":
+            self.chunker = OffsetTextChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        else:
+            self.chunker = TextChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        self.vector_store = vector_store or get_vector_store()
+        self.max_workers = max_workers or int(os.getenv("INGEST_MAX_WORKERS", "0")) or os.cpu_count() or 1
+        self.manifest = manifest
         
     def process_pdf(
         self, 
         file_path: str,
         connect_vector_store: bool = True,
-        chunk_docs: bool = True
+        chunk_docs: bool = True,
+        stream: bool = False,
+        window_size: int = 50,
+        uploader: str = "default",
+        incremental: bool = False
     ) -> List[str]:
         """
         Process a PDF file and store in the vector database.
@@ -47,11 +154,35 @@ class DocumentProcessor:
             file_path: Path to the PDF file
             connect_vector_store: Whether to connect to the vector store
             chunk_docs: Whether to chunk the documents or keep as full pages
-            
+            stream: Whether to stream pages through chunking into the vector
+                store instead of materialising the whole document first
+            window_size: Number of chunks in flight at once when streaming
+            uploader: Identifier of the uploader, used for reference counting
+            incremental: Whether to re-index only the pages that changed since
+                this uploader last ingested a file with the same name
+                
         Returns:
             List of document IDs
         """
+        if incremental:
+            return self.reingest_pdf(file_path, connect_vector_store=connect_vector_store, uploader=uploader)
+            
+        if stream:
+            return self.stream_pdf(
+                file_path,
+                connect_vector_store=connect_vector_store,
+                chunk_docs=chunk_docs,
+                window_size=window_size,
+                uploader=uploader
+            )
+            
         try:
+            # Skip parsing and vectorization entirely for known content
+            file_hash = CorpusManifest.hash_file(file_path) if self.manifest else None
+            document_ids = self._reuse_ingested(file_hash, uploader)
+            if document_ids is not None:
+                return document_ids
+                
             # Extract text from PDF using LangChain loader
             logger.info(f"Processing PDF: {file_path}")
             documents = self.pdf_loader.extract_text_from_pdf(file_path)
@@ -69,6 +200,10 @@ class DocumentProcessor:
                 self.vector_store.connect()
                 
             document_ids = self.vector_store.add_documents(processed_documents)
+            self._record_ingested(
+                file_hash, os.path.basename(file_path), document_ids, uploader,
+                _page_records(_fingerprint_pages(documents), map(_chunk_key, processed_documents))
+            )
             
             logger.info(f"Successfully processed {file_path} into {len(document_ids)} chunks/pages")
             return document_ids
@@ -77,11 +212,78 @@ class DocumentProcessor:
             logger.error(f"Error processing PDF {file_path}: {e}")
             raise
             
+    def stream_pdf(
+        self,
+        file_path: str,
+        connect_vector_store: bool = True,
+        chunk_docs: bool = True,
+        window_size: int = 50,
+        uploader: str = "default"
+    ) -> List[str]:
+        """
+        Stream a PDF page by page through chunking into the vector database.
+        
+        Pages are loaded lazily and chunks are sent to the vector store in
+        batches of window_size, so peak memory stays flat regardless of the
+        number of pages and vectorization starts with the first page.
+        
+        Args:
+            file_path: Path to the PDF file
+            connect_vector_store: Whether to connect to the vector store
+            chunk_docs: Whether to chunk the documents or keep as full pages
+            window_size: Number of chunks in flight at once
+            uploader: Identifier of the uploader, used for reference counting
+            
+        Returns:
+            List of document IDs
+        """
+        try:
+            file_hash = CorpusManifest.hash_file(file_path) if self.manifest else None
+            document_ids = self._reuse_ingested(file_hash, uploader)
+            if document_ids is not None:
+                return document_ids
+                
+            logger.info(f"Streaming PDF: {file_path}")
+            page_hashes: Dict[int, str] = {}
+            chunk_keys: List[Tuple[int, int, str]] = []
+            
+            # Fingerprint pages and chunks as they stream past, keeping only the hashes
+            def fingerprinted(pages: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+                for page in pages:
+                    page_hashes[page["metadata"].get("page", 0)] = CorpusManifest.hash_text(page["text"])
+                    yield page
+                    
+            def keyed(documents: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+                for doc in documents:
+                    chunk_keys.append(_chunk_key(doc))
+                    yield doc
+                    
+            pages = fingerprinted(self.pdf_loader.iter_pages(file_path))
+            processed_documents = keyed(self.chunker.iter_chunks(pages) if chunk_docs else pages)
+            
+            if connect_vector_store:
+                self.vector_store.connect()
+                
+            document_ids = self.vector_store.add_documents(processed_documents, batch_size=window_size)
+            self._record_ingested(
+                file_hash, os.path.basename(file_path), document_ids, uploader,
+                _page_records(page_hashes, chunk_keys)
+            )
+            
+            logger.info(f"Successfully streamed {file_path} into {len(document_ids)} chunks/pages")
+            return document_ids
+            
+        except Exception as e:
+            logger.error(f"Error streaming PDF {file_path}: {e}")
+            raise
+            
     def process_uploaded_pdf(
         self,
         uploaded_file,
         connect_vector_store: bool = True,
-        chunk_docs: bool = True
+        chunk_docs: bool = True,
+        uploader: str = "default",
+        incremental: bool = False
     ) -> List[str]:
         """
         Process a PDF uploaded via Streamlit and store in vector database.
@@ -90,11 +292,24 @@ class DocumentProcessor:
             uploaded_file: Streamlit UploadedFile object
             connect_vector_store: Whether to connect to the vector store
             chunk_docs: Whether to chunk the documents or keep as full pages
-            
+            uploader: Identifier of the uploader, used for reference counting
+            incremental: Whether to re-index only the pages that changed since
+                this uploader last ingested a file with the same name
+                
         Returns:
             List of document IDs
         """
+        if incremental:
+            return self.reingest_uploaded_pdf(
+                uploaded_file, connect_vector_store=connect_vector_store, uploader=uploader
+            )
+            
         try:
+            file_hash = CorpusManifest.hash_bytes(uploaded_file.getbuffer()) if self.manifest else None
+            document_ids = self._reuse_ingested(file_hash, uploader)
+            if document_ids is not None:
+                return document_ids
+                
             # Extract text from uploaded PDF using LangChain loader
             logger.info(f"Processing uploaded PDF: {uploaded_file.name}")
             documents = self.pdf_loader.extract_text_from_uploaded_pdf(uploaded_file)
@@ -112,6 +327,10 @@ class DocumentProcessor:
                 self.vector_store.connect()
                 
             document_ids = self.vector_store.add_documents(processed_documents)
+            self._record_ingested(
+                file_hash, uploaded_file.name, document_ids, uploader,
+                _page_records(_fingerprint_pages(documents), map(_chunk_key, processed_documents))
+            )
             
             logger.info(f"Successfully processed {uploaded_file.name} into {len(document_ids)} chunks/pages")
             return document_ids
@@ -120,11 +339,508 @@ class DocumentProcessor:
             logger.error(f"Error processing uploaded PDF {uploaded_file.name}: {e}")
             raise
             
+    def process_many(
+        self,
+        files: List[Any],
+        connect_vector_store: bool = True,
+        chunk_docs: bool = True,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        uploader: str = "default",
+        incremental: bool = False
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Process many PDFs in parallel and store them in the vector database.
+        
+        Extraction and chunking run in a process pool while the results are
+        inserted into the vector store from this process as they complete.
+        
+        Args:
+            files: File paths and/or Streamlit UploadedFile objects
+            connect_vector_store: Whether to connect to the vector store
+            chunk_docs: Whether to chunk the documents or keep as full pages
+            progress_callback: Optional callable receiving (completed, total)
+            uploader: Identifier of the uploader, used for reference counting
+            incremental: Whether to re-index only the pages that changed since
+                this uploader last ingested files with the same names
+                
+        Returns:
+            Report with per-file "results" and "errors", both in input order
+        """
+        total = len(files)
+        outcomes: List[Optional[Dict[str, Any]]] = [None] * total
+        file_hashes: List[Optional[str]] = [None] * total
+        completed = 0
+        
+        if incremental:
+            # The cost is dominated by the diff, not parsing, so skip the pool
+            for index, item in enumerate(files):
+                is_path = isinstance(item, str)
+                file_name = os.path.basename(item) if is_path else item.name
+                try:
+                    if is_path:
+                        file_hash = CorpusManifest.hash_file(item)
+                        document_ids = self.reingest_pdf(item, connect_vector_store, uploader, file_hash)
+                    else:
+                        file_hash = CorpusManifest.hash_bytes(item.getbuffer())
+                        document_ids = self.reingest_uploaded_pdf(item, connect_vector_store, uploader, file_hash)
+                    outcomes[index] = {
+                        "file_name": file_name,
+                        "file_hash": file_hash,
+                        "document_ids": document_ids,
+                        "deduplicated": False
+                    }
+                except Exception as e:
+                    outcomes[index] = {"file_name": file_name, "error": str(e)}
+                if progress_callback:
+                    progress_callback(index + 1, total)
+            jobs = []
+        else:
+            jobs = self._prepare_jobs(files, outcomes, file_hashes, uploader)
+            completed = total - len(jobs)
+            
+        if progress_callback and completed:
+            progress_callback(completed, total)
+            
+        if connect_vector_store and jobs:
+            self.vector_store.connect()
+            
+        def store(index: int, file_name: str, result: Tuple[List[Dict[str, Any]], Dict[int, str]]) -> None:
+            processed_documents, page_hashes = result
+            try:
+                document_ids = self.vector_store.add_documents(processed_documents)
+                self._record_ingested(
+                    file_hashes[index], file_name, document_ids, uploader,
+                    _page_records(page_hashes, map(_chunk_key, processed_documents))
+                )
+                outcomes[index] = {
+                    "file_name": file_name,
+                    "file_hash": file_hashes[index],
+                    "document_ids": document_ids,
+                    "deduplicated": False
+                }
+                logger.info(f"Successfully processed {file_name} into {len(document_ids)} chunks/pages")
+            except Exception as e:
+                logger.error(f"Error storing PDF {file_name}: {e}")
+                outcomes[index] = {"file_name": file_name, "error": str(e)}
+                
+        workers = min(self.max_workers, len(jobs))
+        if workers <= 1:
+            # No point paying for a pool with a single file or worker
+            for index, source, file_name in jobs:
+                try:
+                    result = _extract_and_chunk(
+                        source, file_name, self.pdf_loader, self.chunker, chunk_docs
+                    )
+                    store(index, file_name, result)
+                except Exception as e:
+                    logger.error(f"Error processing PDF {file_name}: {e}")
+                    outcomes[index] = {"file_name": file_name, "error": str(e)}
+                completed += 1
+                if progress_callback:
+                    progress_callback(completed, total)
+        else:
+            logger.info(f"Processing {total} PDFs with {workers} worker processes")
+            # Spawn rather than fork: the parent holds threads (Streamlit, clients, models)
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                futures = {
+                    executor.submit(
+                        _extract_and_chunk, source, file_name, self.pdf_loader, self.chunker, chunk_docs
+                    ): (index, file_name)
+                    for index, source, file_name in jobs
+                }
+                
+                for future in as_completed(futures):
+                    index, file_name = futures[future]
+                    try:
+                        store(index, file_name, future.result())
+                    except Exception as e:
+                        logger.error(f"Error processing PDF {file_name}: {e}")
+                        outcomes[index] = {"file_name": file_name, "error": str(e)}
+                    completed += 1
+                    if progress_callback:
+                        progress_callback(completed, total)
+                        
+        report = {"results": [], "errors": []}
+        for outcome in outcomes:
+            if "error" in outcome:
+                report["errors"].append(outcome)
+            else:
+                report["results"].append(outcome)
+                
+        logger.info(f"Processed {len(report['results'])} of {total} PDFs ({len(report['errors'])} failed)")
+        return report
+        
+    def _prepare_jobs(
+        self,
+        files: List[Any],
+        outcomes: List[Optional[Dict[str, Any]]],
+        file_hashes: List[Optional[str]],
+        uploader: str
+    ) -> List[Tuple[int, Union[str, bytes], str]]:
+        """
+        Resolve process_many inputs into worker jobs, skipping known files.
+        
+        Args:
+            files: File paths and/or Streamlit UploadedFile objects
+            outcomes: Per-file outcomes, filled in for files already ingested
+            file_hashes: Per-file content hashes, filled in when using a manifest
+            uploader: Identifier of the uploader
+            
+        Returns:
+            List of (index, path or bytes, file name) jobs still to process
+        """
+        # Resolve each input to something that can be sent to a worker process
+        jobs = []
+        for index, item in enumerate(files):
+            if isinstance(item, str):
+                source, file_name = item, os.path.basename(item)
+            else:
+                source, file_name = item.getvalue(), item.name
+                
+            if self.manifest:
+                try:
+                    file_hash = (
+                        CorpusManifest.hash_file(source) if isinstance(source, str)
+                        else CorpusManifest.hash_bytes(source)
+                    )
+                except Exception as e:
+                    logger.error(f"Error reading PDF {file_name}: {e}")
+                    outcomes[index] = {"file_name": file_name, "error": str(e)}
+                    continue
+                file_hashes[index] = file_hash
+                document_ids = self._reuse_ingested(file_hash, uploader)
+                if document_ids is not None:
+                    outcomes[index] = {
+                        "file_name": file_name,
+                        "file_hash": file_hash,
+                        "document_ids": document_ids,
+                        "deduplicated": True
+                    }
+                    continue
+                    
+            jobs.append((index, source, file_name))
+            
+        return jobs
+        
+    def reingest_pdf(
+        self,
+        file_path: str,
+        connect_vector_store: bool = True,
+        uploader: str = "default",
+        file_hash: Optional[str] = None
+    ) -> List[str]:
+        """
+        Incrementally re-ingest a new version of a PDF file.
+        
+        See _reingest for how the previous version is diffed.
+        
+        Args:
+            file_path: Path to the PDF file
+            connect_vector_store: Whether to connect to the vector store
+            uploader: Identifier of the uploader
+            file_hash: Content hash of the file, if the caller already computed it
+            
+        Returns:
+            List of document IDs of the new version
+        """
+        try:
+            return self._reingest(
+                file_hash or CorpusManifest.hash_file(file_path),
+                os.path.basename(file_path),
+                lambda: self.pdf_loader.extract_text_from_pdf(file_path),
+                connect_vector_store,
+                uploader
+            )
+        except Exception as e:
+            logger.error(f"Error re-ingesting PDF {file_path}: {e}")
+            raise
+            
+    def reingest_uploaded_pdf(
+        self,
+        uploaded_file,
+        connect_vector_store: bool = True,
+        uploader: str = "default",
+        file_hash: Optional[str] = None
+    ) -> List[str]:
+        """
+        Incrementally re-ingest a new version of a PDF uploaded via Streamlit.
+        
+        See _reingest for how the previous version is diffed.
+        
+        Args:
+            uploaded_file: Streamlit UploadedFile object
+            connect_vector_store: Whether to connect to the vector store
+            uploader: Identifier of the uploader
+            file_hash: Content hash of the file, if the caller already computed it
+            
+        Returns:
+            List of document IDs of the new version
+        """
+        try:
+            return self._reingest(
+                file_hash or CorpusManifest.hash_bytes(uploaded_file.getbuffer()),
+                uploaded_file.name,
+                lambda: self.pdf_loader.extract_text_from_uploaded_pdf(uploaded_file),
+                connect_vector_store,
+                uploader
+            )
+        except Exception as e:
+            logger.error(f"Error re-ingesting uploaded PDF {uploaded_file.name}: {e}")
+            raise
+            
+    def _reingest(
+        self,
+        file_hash: str,
+        file_name: str,
+        load_pages: Callable[[], List[Dict[str, Any]]],
+        connect_vector_store: bool,
+        uploader: str
+    ) -> List[str]:
+        """
+        Diff a new file version against the previous one and apply the changes.
+        
+        Pages whose fingerprint matches the uploader's previous version of the
+        same file name keep their chunks untouched. Only changed or new pages
+        are re-chunked, only chunks that are not stored yet are sent to the
+        vector store, and chunks left unreferenced by the old version are
+        batch-deleted. Unchanged chunk text that moved to another page keeps
+        its original metadata.
+        
+        Args:
+            file_hash: Content hash of the new version
+            file_name: Name of the file
+            load_pages: Callable returning the page dictionaries of the new version
+            connect_vector_store: Whether to connect to the vector store
+            uploader: Identifier of the uploader
+            
+        Returns:
+            List of document IDs of the new version
+        """
+        if not self.manifest:
+            raise ValueError("Incremental re-ingestion requires a corpus manifest")
+            
+        previous = next(
+            (
+                record for record in self.manifest.find_by_name(file_name)
+                if uploader in record["uploaders"] and record["file_hash"] != file_hash
+            ),
+            None
+        )
+        
+        # Identical content was already ingested, e.g. by another uploader: nothing
+        # to diff, but the new version still replaces the uploader's previous one
+        document_ids = self._reuse_ingested(file_hash, uploader)
+        if document_ids is not None:
+            if previous:
+                deleted = self._release_version(previous["file_hash"], uploader)
+                logger.info(f"Replaced {file_name} with an ingested version, {deleted} obsolete chunks deleted")
+            return document_ids
+            
+        old_pages = self.manifest.get_pages(previous["file_hash"]) if previous else {}
+        
+        documents = load_pages()
+        page_hashes = _fingerprint_pages(documents)
+        changed = [
+            doc for doc in documents
+            if old_pages.get(doc["metadata"]["page"], {}).get("page_hash") != page_hashes[doc["metadata"]["page"]]
+        ]
+        
+        # Re-chunk changed pages, numbering each page's chunks from where they used to start
+        # if they still fit there, or from a fresh range after every old chunk otherwise
+        chunks_by_page: Dict[int, List[Dict[str, Any]]] = {}
+        for chunk in self.chunker.chunk_text(changed) if changed else []:
+            chunks_by_page.setdefault(chunk["metadata"]["page"], []).append(chunk)
+            
+        next_chunk = max(
+            (record["first_chunk"] + len(record["chunk_ids"]) for record in old_pages.values()),
+            default=1
+        )
+        changed_pages = {doc["metadata"]["page"] for doc in changed}
+        page_records = []
+        document_ids = []
+        new_chunks = []
+        for doc in documents:
+            page = doc["metadata"]["page"]
+            if page in changed_pages:
+                page_chunks = chunks_by_page.get(page, [])
+                old_page = old_pages.get(page)
+                if (
+                    old_page is not None
+                    and old_page["first_chunk"] is not None
+                    and len(page_chunks) <= len(old_page["chunk_ids"])
+                ):
+                    first_chunk = old_page["first_chunk"]
+                else:
+                    first_chunk = next_chunk
+                    next_chunk += len(page_chunks)
+                for offset, chunk in enumerate(page_chunks):
+                    chunk["metadata"]["chunk"] = first_chunk + offset
+                chunk_ids = [make_document_id(chunk["text"]) for chunk in page_chunks]
+                new_chunks.extend(zip(chunk_ids, page_chunks))
+            else:
+                first_chunk = old_pages[page]["first_chunk"]
+                chunk_ids = old_pages[page]["chunk_ids"]
+                
+            page_records.append({
+                "page": page,
+                "page_hash": page_hashes[page],
+                "first_chunk": first_chunk,
+                "chunk_ids": chunk_ids
+            })
+            document_ids.extend(chunk_ids)
+            
+        # Upsert only chunks that no stored file references yet
+        stored = self.manifest.stored_chunks([chunk_id for chunk_id, _ in new_chunks])
+        upserts = {}
+        for chunk_id, chunk in new_chunks:
+            if chunk_id not in stored:
+                upserts.setdefault(chunk_id, chunk)
+                
+        if upserts:
+            if connect_vector_store:
+                self.vector_store.connect()
+            self.vector_store.add_documents(list(upserts.values()))
+            
+        # Reference the new version before releasing the old one so shared chunks survive
+        self.manifest.register(file_hash, file_name, document_ids, uploader, page_records)
+        deleted = self._release_version(previous["file_hash"], uploader) if previous else 0
+        
+        logger.info(
+            f"Re-ingested {file_name}: {len(changed)} of {len(documents)} pages changed, "
+            f"{len(upserts)} chunks upserted, {deleted} obsolete chunks deleted"
+        )
+        return document_ids
+        
+    def _release_version(self, file_hash: str, uploader: str) -> int:
+        """
+        Release an uploader's earlier version of a file after its new version
+        was registered, deleting the chunks no file references any more.
+        
+        Args:
+            file_hash: Content hash of the earlier version
+            uploader: Identifier of the uploader
+            
+        Returns:
+            Number of chunks deleted from the vector store
+        """
+        orphaned = self.manifest.release(file_hash, uploader)
+        if not orphaned:
+            return 0
+        return self.vector_store.delete_by_ids(orphaned)
+        
+    def remove_file(self, file_hash: str, uploader: str = "default") -> int:
+        """
+        Remove an uploader's reference to a file from the corpus.
+        
+        Only chunks that are no longer referenced by any uploader or file are
+        deleted from the vector store.
+        
+        Args:
+            file_hash: Content hash of the file
+            uploader: Identifier of the uploader
+            
+        Returns:
+            Number of chunks deleted from the vector store
+        """
+        if not self.manifest:
+            raise ValueError("Removing files requires a corpus manifest")
+            
+        return self._release_version(file_hash, uploader)
+        
+    def remove_uploader(self, uploader: str) -> int:
+        """
+        Remove all of an uploader's files from the corpus.
+        
+        Files that other uploaders also hold stay in the corpus; only chunks
+        that are no longer referenced are deleted from the vector store.
+        
+        Args:
+            uploader: Identifier of the uploader
+            
+        Returns:
+            Number of chunks deleted from the vector store
+        """
+        if not self.manifest:
+            raise ValueError("Removing files requires a corpus manifest")
+            
+        orphaned = []
+        for file_hash in self.manifest.uploader_files(uploader):
+            orphaned.extend(self.manifest.release(file_hash, uploader))
+        if not orphaned:
+            return 0
+        return self.vector_store.delete_by_ids(orphaned)
+        
+    def remove_idle_uploaders(
+        self,
+        max_age: float = float(os.getenv("UPLOADER_MAX_IDLE_DAYS", "90")) * 86400
+    ) -> int:
+        """
+        Remove the files of uploaders who have not been seen for a while.
+        
+        Uploads are reference counted per uploader, so the files of students
+        who never come back would otherwise stay in the corpus forever.
+        
+        Args:
+            max_age: Seconds since an uploader was last seen
+            
+        Returns:
+            Number of chunks deleted from the vector store
+        """
+        if not self.manifest:
+            raise ValueError("Removing files requires a corpus manifest")
+            
+        orphaned = []
+        uploaders = self.manifest.idle_uploaders(max_age)
+        for uploader in uploaders:
+            for file_hash in self.manifest.uploader_files(uploader):
+                orphaned.extend(self.manifest.release(file_hash, uploader))
+                
+        logger.info(f"Released the files of {len(uploaders)} idle uploaders")
+        if not orphaned:
+            return 0
+        return self.vector_store.delete_by_ids(orphaned)
+        
+    def _reuse_ingested(self, file_hash: Optional[str], uploader: str) -> Optional[List[str]]:
+        """
+        Attach the uploader to an already ingested file, if there is one.
+        
+        Args:
+            file_hash: Content hash of the file, or None without a manifest
+            uploader: Identifier of the uploader
+            
+        Returns:
+            IDs of the existing chunks, or None if the file must be ingested
+        """
+        if not file_hash or not self.manifest.lookup(file_hash):
+            return None
+            
+        document_ids = self.manifest.attach(file_hash, uploader)
+        logger.info(f"File {file_hash[:12]} already ingested, reusing {len(document_ids)} chunks")
+        return document_ids
+        
+    def _record_ingested(
+        self,
+        file_hash: Optional[str],
+        file_name: str,
+        document_ids: List[str],
+        uploader: str,
+        pages: Optional[List[Dict[str, Any]]] = None
+    ) -> None:
+        """
+        Record a freshly ingested file in the manifest, if there is one.
+        """
+        if file_hash:
+            self.manifest.register(file_hash, file_name, document_ids, uploader, pages)
+            
     def search_documents(
         self,
         query: str,
         limit: int = 5,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        vector: Optional[Sequence[float]] = None
     ) -> List[Dict[str, Any]]:
         """
         Search for relevant documents based on a query.
@@ -133,7 +849,9 @@ class DocumentProcessor:
             query: Search query
             limit: Maximum number of results
             filters: Optional filters for search
-            
+            vector: Query embedding from the store's get_query_embedder(),
+                if the caller already has one; the store embeds the query otherwise
+                
         Returns:
             List of relevant documents
         """
@@ -144,16 +862,41 @@ class DocumentProcessor:
             
             # Check if there are any documents in the index
             # If no documents, return empty results to prevent errors
-            schema = self.vector_store.client.schema.get()
-            class_names = [c['class'] for c in schema.get('classes', [])]
-            
-            if self.vector_store.index_name not in class_names:
+            if not self.vector_store.index_exists():
                 logger.warning(f"Schema {self.vector_store.index_name} does not exist yet. No documents to search.")
                 return []
             
             # Try to search with the query
-            return self.vector_store.search(query=query, limit=limit, filters=filters)
+            return self.vector_store.search(query=query, limit=limit, filters=filters, vector=vector)
         except Exception as e:
             logger.error(f"Error searching documents: {e}")
             # Return empty list instead of raising exception
             return []
+            
+    async def asearch_documents(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        vector: Optional[Sequence[float]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search for relevant documents without blocking the event loop.
+        
+        Args:
+            query: Search query
+            limit: Maximum number of results
+            filters: Optional filters for search
+            vector: Query embedding from the store's get_query_embedder(),
+                if the caller already has one; the store embeds the query otherwise
+                
+        Returns:
+            List of relevant documents
+        """
+        try:
+            # The store checks its connection and schema itself, from cache
+            # once they have been confirmed
+            return await self.vector_store.asearch(query=query, limit=limit, filters=filters, vector=vector)
+        except Exception as e:
+            logger.error(f"Error searching documents: {e}")
+            return []
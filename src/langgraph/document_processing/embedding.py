@@ -2,45 +2,252 @@
 Embedding module for generating embeddings from text.
 """
 import logging
-from typing import List, Dict, Any
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 
 import os
-import sentence_transformers
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Model loaded once per embedding pool worker process
+_worker_model = None
+
+def _init_worker(model_name: str, batch_size: int, backend: str, intra_op_threads: int) -> None:
+    """
+    Load the embedding model in a pool worker.
+    """
+    global _worker_model
+    _worker_model = EmbeddingModel(
+        model_name,
+        batch_size=batch_size,
+        backend=backend,
+        intra_op_threads=intra_op_threads
+    )
+    _worker_model.load_model()
+
+def _encode_shard(texts: List[str]) -> np.ndarray:
+    """
+    Encode one shard of texts in a pool worker.
+    
+    Returns:
+        Contiguous float32 array, sent back to the parent as a single buffer
+    """
+    return np.ascontiguousarray(_worker_model._encode(texts))
+
 class EmbeddingModel:
     """
     A class to generate embeddings from text.
     Note: With Weaviate's text2vec-transformers module,
     we don't need to generate embeddings ourselves.
-    This class is for standalone use or custom embedding scenarios.
+    This class is used when the vector store runs with vectorizer "none"
+    and chunks are embedded in-process before insertion.
     """
     
     def __init__(
         self,
-        model_name: str = "all-MiniLM-L6-v2"
+        model_name: str = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2"),
+        batch_size: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "64")),
+        cache: Optional[Any] = None,
+        backend: str = os.getenv("EMBEDDING_BACKEND", "torch"),
+        intra_op_threads: int = int(os.getenv("EMBEDDING_THREADS", "0")),
+        num_workers: int = int(os.getenv("EMBEDDING_WORKERS", "0"))
     ):
         """
         Initialize the embedding model.
         
         Args:
             model_name: Name of the model to use for embeddings
+            batch_size: Number of texts encoded per forward pass
+            cache: Optional EmbeddingCache consulted before encoding, so
+                unchanged chunks are not embedded again
+            backend: Inference backend: "torch" (sentence-transformers),
+                "onnx" (ONNX Runtime) or "onnx-int8" (ONNX Runtime with a
+                dynamically int8-quantized graph)
+            intra_op_threads: Threads used per operator on CPU (0 keeps the
+                backend default, or splits the cores evenly between pool
+                workers)
+            num_workers: Number of worker processes used for large inputs;
+                0 or 1 encodes in the calling process
         """
         self.model_name = model_name
+        self.batch_size = batch_size
+        self.cache = cache
+        self.backend = backend
+        self.intra_op_threads = intra_op_threads
+        self.num_workers = num_workers
         self.model = None
+        self._pool = None
+        # Guards lazy loading; one model is shared by every thread of the process
+        self._load_lock = threading.Lock()
         
     def load_model(self) -> None:
         """
         Load the embedding model.
         """
         try:
-            self.model = sentence_transformers.SentenceTransformer(self.model_name)
-            logger.info(f"Loaded embedding model {self.model_name}")
+            if self.backend in ("onnx", "onnx-int8"):
+                # Imported lazily so the ONNX path never loads PyTorch
+                from src.langgraph.document_processing.onnx_backend import OnnxEmbeddingBackend
+                
+                self.model = OnnxEmbeddingBackend(
+                    self.model_name,
+                    quantize=self.backend == "onnx-int8",
+                    intra_op_threads=self.intra_op_threads
+                )
+            elif self.backend == "torch":
+                import torch
+                import sentence_transformers
+                
+                if self.intra_op_threads:
+                    torch.set_num_threads(self.intra_op_threads)
+                self.model = sentence_transformers.SentenceTransformer(self.model_name)
+            else:
+                raise ValueError(f"Unknown embedding backend: {self.backend}")
+            logger.info(f"Loaded embedding model {self.model_name} ({self.backend})")
         except Exception as e:
             logger.error(f"Error loading embedding model: {e}")
             raise
             
+    def get_tokenizer(self):
+        """
+        Get the tokenizer of the embedding model.
+        
+        Returns:
+            Hugging Face tokenizer used by the model, e.g. for token-sized chunking
+        """
+        if not self.model:
+            with self._load_lock:
+                if not self.model:
+                    self.load_model()
+                    
+        return self.model.tokenizer
+        
+    def embed(
+        self,
+        texts: List[str],
+        use_cache: bool = True
+    ) -> np.ndarray:
+        """
+        Embed a list of texts in batches of batch_size.
+        
+        With a cache, only the texts that are not cached are encoded and
+        their embeddings are added to the cache.
+        
+        Args:
+            texts: List of texts to embed
+            use_cache: Whether to consult the cache; one-off texts such as
+                queries skip it so they do not evict chunk embeddings
+                
+        Returns:
+            Float32 array of shape (len(texts), dimension)
+        """
+        if self.cache is None or not use_cache:
+            return self._encode(texts)
+            
+        if not len(texts):
+            return np.empty((0, self.cache.dimension or 0), dtype=np.float32)
+            
+        embeddings, missing = self.cache.get_many(texts)
+        if len(missing):
+            missing_texts = [texts[i] for i in missing]
+            encoded = self._encode(missing_texts)
+            self.cache.put_many(missing_texts, encoded)
+            if embeddings is None:
+                return encoded
+            embeddings[missing] = encoded
+            
+        return embeddings
+        
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """
+        Start the worker pool on first use.
+        
+        Workers are spawned rather than forked so they do not inherit the
+        parent's PyTorch thread pools, and each loads the model once.
+        """
+        with self._load_lock:
+            if self._pool is None:
+                threads = self.intra_op_threads or max(1, (os.cpu_count() or 1) // self.num_workers)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.num_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.model_name, self.batch_size, self.backend, threads)
+                )
+                logger.info(f"Started {self.num_workers} embedding workers with {threads} threads each")
+        return self._pool
+        
+    def close(self) -> None:
+        """
+        Shut down the worker pool, if one was started.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+            
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        
+    def _encode(
+        self,
+        texts: List[str]
+    ) -> np.ndarray:
+        """
+        Encode texts with the model, bypassing the cache.
+        
+        With num_workers > 1, inputs larger than one batch are split into
+        shards of batch_size texts that the workers take from the pool's
+        queue; the shards are written back in order into one array.
+        """
+        if self.num_workers > 1 and len(texts) > self.batch_size:
+            return self._encode_in_pool(texts)
+            
+        if not self.model:
+            with self._load_lock:
+                if not self.model:
+                    self.load_model()
+                    
+        try:
+            embeddings = self.model.encode(
+                texts,
+                batch_size=self.batch_size,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+            return np.asarray(embeddings, dtype=np.float32)
+        except Exception as e:
+            logger.error(f"Error generating embeddings: {e}")
+            raise
+            
+    def _encode_in_pool(
+        self,
+        texts: List[str]
+    ) -> np.ndarray:
+        """
+        Encode texts across the worker pool, preserving their order.
+        """
+        pool = self._get_pool()
+        embeddings = None
+        
+        try:
+            offset = 0
+            shards = [texts[start:start + self.batch_size] for start in range(0, len(texts), self.batch_size)]
+            for shard in pool.map(_encode_shard, shards):
+                if embeddings is None:
+                    embeddings = np.empty((len(texts), shard.shape[1]), dtype=np.float32)
+                embeddings[offset:offset + len(shard)] = shard
+                offset += len(shard)
+            return embeddings
+        except Exception as e:
+            logger.error(f"Error generating embeddings in worker pool: {e}")
+            raise
+            
     def generate_embeddings(
         self, 
         texts: List[str]
@@ -54,12 +261,56 @@ class EmbeddingModel:
         Returns:
             List of embeddings as float arrays
         """
-        if not self.model:
-            self.load_model()
-            
-        try:
-            embeddings = self.model.encode(texts)
-            return embeddings.tolist()
-        except Exception as e:
-            logger.error(f"Error generating embeddings: {e}")
-            raise
+        return self.embed(texts).tolist()
+
+def create_embedding_model(**kwargs) -> EmbeddingModel:
+    """
+    Create the embedding model configured by the environment.
+    
+    Prefer get_embedding_model, which shares one model per configuration.
+    
+    Args:
+        **kwargs: Options passed to EmbeddingModel's constructor
+        
+    Returns:
+        EmbeddingModel with the shared EmbeddingCache of its model and backend
+        attached unless EMBEDDING_CACHE is "false"
+    """
+    model = EmbeddingModel(**kwargs)
+    if os.getenv("EMBEDDING_CACHE", "true").lower() == "true":
+        from src.langgraph.document_processing.embedding_cache import get_embedding_cache
+        
+        # Quantized backends return slightly different vectors, so each backend
+        # gets its own cache; torch keeps the plain model name of existing caches
+        cache_name = model.model_name if model.backend == "torch" else f"{model.model_name}-{model.backend}"
+        model.cache = get_embedding_cache(cache_name)
+    return model
+
+_models: Dict[Tuple[Any, ...], EmbeddingModel] = {}
+_models_lock = threading.Lock()
+
+def get_embedding_model() -> EmbeddingModel:
+    """
+    Get the process-wide embedding model configured by the environment.
+    
+    Vector stores, the context compressor and the answer cache all embed
+    with the same configuration, so they share one loaded model, worker
+    pool and cache instead of each loading their own.
+    
+    Returns:
+        EmbeddingModel shared by every caller with the same configuration
+    """
+    # Read at call time so values loaded from .env after import apply
+    config = {
+        "model_name": os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2"),
+        "batch_size": int(os.getenv("EMBEDDING_BATCH_SIZE", "64")),
+        "backend": os.getenv("EMBEDDING_BACKEND", "torch"),
+        "intra_op_threads": int(os.getenv("EMBEDDING_THREADS", "0")),
+        "num_workers": int(os.getenv("EMBEDDING_WORKERS", "0"))
+    }
+    key = tuple(config.values()) + (os.getenv("EMBEDDING_CACHE", "true").lower() == "true",)
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            model = _models[key] = create_embedding_model(**config)
+        return model
@@ -0,0 +1,371 @@
+"""
+Embedding cache module for reusing chunk embeddings across ingestion runs.
+"""
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingCache:
+    """
+    A persistent, size-bounded cache of embeddings keyed by chunk content.
+    
+    Each model gets its own directory holding an append-only float16 vector
+    file, read through a memory map, and a compact index of sorted 64-bit
+    content hashes with the row of each vector. Lookups for a whole batch of
+    texts are a single searchsorted over the index, so only the misses need
+    to be embedded. When the vector file grows past max_bytes, the least
+    recently used vectors are dropped and the file is compacted into a new
+    generation; saving the index, which names the generation, is what
+    switches to it, so a crash leaves a consistent cache either way.
+    
+    Use get_embedding_cache to share one instance per directory. Instances
+    on the same directory share a lock, and one reloads the index whenever
+    another has rewritten it.
+    """
+    
+    def __init__(
+        self,
+        model_name: str,
+        cache_dir: str = os.getenv("EMBEDDING_CACHE_DIR", "data/embedding_cache"),
+        max_bytes: int = int(os.getenv("EMBEDDING_CACHE_MAX_MB", "1024")) * 1024 * 1024
+    ):
+        """
+        Initialize the embedding cache.
+        
+        Args:
+            model_name: Name of the embedding model; vectors of different
+                models never mix
+            cache_dir: Directory holding the per-model caches
+            max_bytes: Size of the vector file above which entries are evicted
+        """
+        self.model_name = model_name
+        self.max_bytes = max_bytes
+        self.directory = os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name))
+        os.makedirs(self.directory, exist_ok=True)
+        
+        self.index_path = os.path.join(self.directory, "index.npz")
+        self.meta_path = os.path.join(self.directory, "meta.json")
+        
+        self._lock = _directory_lock(self.directory)
+        self._vectors = None
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        
+        with self._lock:
+            self._load()
+            
+    @property
+    def vectors_path(self) -> str:
+        # Generation 0 keeps the name used before generations were introduced
+        if not self.generation:
+            return os.path.join(self.directory, "vectors.f16")
+        return os.path.join(self.directory, f"vectors.{self.generation}.f16")
+        
+    def _index_stamp(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.index_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+        
+    def _load(self) -> None:
+        """
+        Read the metadata and index from disk. Caller holds the lock.
+        """
+        self.dimension = None
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                self.dimension = json.load(f)["dimension"]
+                
+        self._stamp = self._index_stamp()
+        if self._stamp is not None:
+            with np.load(self.index_path) as index:
+                self._keys = index["keys"]
+                self._rows = index["rows"]
+                self._last_used = index["last_used"]
+                self._clock = int(index["clock"])
+                self.generation = int(index["generation"]) if "generation" in index.files else 0
+        else:
+            self._keys = np.empty(0, dtype=np.uint64)
+            self._rows = np.empty(0, dtype=np.int64)
+            self._last_used = np.empty(0, dtype=np.int64)
+            self._clock = 0
+            self.generation = 0
+            
+        self._open_vectors()
+        
+    def _refresh(self) -> None:
+        """
+        Reload the index if another instance saved it since. Caller holds the lock.
+        """
+        if self._index_stamp() != self._stamp:
+            self._load()
+            
+    @staticmethod
+    def hash_texts(texts: List[str]) -> np.ndarray:
+        """
+        Compute the 64-bit content hashes of a list of texts.
+        
+        Args:
+            texts: Chunk texts
+            
+        Returns:
+            Array of uint64 keys, one per text
+        """
+        return np.fromiter(
+            (
+                int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+                for text in texts
+            ),
+            dtype=np.uint64,
+            count=len(texts)
+        )
+        
+    def _open_vectors(self) -> None:
+        """
+        Map the vector file into memory (or drop the map if it is empty).
+        """
+        self._vectors = None
+        if not self.dimension or not os.path.exists(self.vectors_path):
+            return
+            
+        rows = os.path.getsize(self.vectors_path) // (self.dimension * 2)
+        if rows:
+            self._vectors = np.memmap(
+                self.vectors_path, dtype=np.float16, mode="r", shape=(rows, self.dimension)
+            )
+            
+    def _find(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Locate keys in the sorted index.
+        
+        Returns:
+            Tuple of (hit mask, index positions of the hits)
+        """
+        if not len(self._keys):
+            return np.zeros(len(keys), dtype=bool), np.empty(0, dtype=np.int64)
+            
+        positions = np.searchsorted(self._keys, keys)
+        positions = np.minimum(positions, len(self._keys) - 1)
+        hits = self._keys[positions] == keys
+        return hits, positions[hits]
+        
+    def get_many(self, texts: List[str]) -> Tuple[Optional[np.ndarray], np.ndarray]:
+        """
+        Look up the embeddings of a batch of texts.
+        
+        Args:
+            texts: Chunk texts
+            
+        Returns:
+            Tuple of (embeddings, missing) where embeddings is a float32 array
+            with a row per text (rows of misses are zero) or None if nothing
+            is cached yet, and missing holds the indices of texts to embed
+        """
+        keys = self.hash_texts(texts)
+        with self._lock:
+            self._refresh()
+            hits, positions = self._find(keys)
+            hit_count = int(hits.sum())
+            self._hits += hit_count
+            self._misses += len(texts) - hit_count
+            
+            if not hit_count or self._vectors is None:
+                return None, np.arange(len(texts))
+                
+            self._clock += 1
+            self._last_used[positions] = self._clock
+            embeddings = np.zeros((len(texts), self.dimension), dtype=np.float32)
+            embeddings[hits] = self._vectors[self._rows[positions]]
+            
+        return embeddings, np.flatnonzero(~hits)
+        
+    def put_many(self, texts: List[str], embeddings: np.ndarray) -> None:
+        """
+        Append the embeddings of newly embedded texts.
+        
+        Args:
+            texts: Chunk texts
+            embeddings: Array of shape (len(texts), dimension)
+        """
+        if not len(texts):
+            return
+            
+        embeddings = np.asarray(embeddings)
+        keys, first = np.unique(self.hash_texts(texts), return_index=True)
+        
+        with self._lock:
+            self._refresh()
+            if self.dimension is None:
+                self.dimension = int(embeddings.shape[1])
+                with open(self.meta_path, "w") as f:
+                    json.dump({"model_name": self.model_name, "dimension": self.dimension}, f)
+            elif embeddings.shape[1] != self.dimension:
+                raise ValueError(
+                    f"Embedding dimension {embeddings.shape[1]} does not match cache dimension {self.dimension}"
+                )
+                
+            hits, _ = self._find(keys)
+            keys, first = keys[~hits], first[~hits]
+            if not len(keys):
+                return
+                
+            try:
+                with open(self.vectors_path, "ab") as f:
+                    # Rows are appended after whatever a previous run left behind
+                    start = f.tell() // (self.dimension * 2)
+                    f.seek(start * self.dimension * 2)
+                    f.truncate()
+                    f.write(np.ascontiguousarray(embeddings[first], dtype=np.float16).tobytes())
+                    
+                self._clock += 1
+                keys = np.concatenate([self._keys, keys])
+                rows = np.concatenate([self._rows, np.arange(start, start + len(first), dtype=np.int64)])
+                last_used = np.concatenate([self._last_used, np.full(len(first), self._clock, dtype=np.int64)])
+                order = np.argsort(keys, kind="stable")
+                self._keys, self._rows, self._last_used = keys[order], rows[order], last_used[order]
+                
+                if os.path.getsize(self.vectors_path) > self.max_bytes:
+                    self._evict()
+                else:
+                    self._save_index()
+                self._open_vectors()
+            except Exception as e:
+                logger.error(f"Error writing embedding cache: {e}")
+                raise
+                
+    def _evict(self) -> None:
+        """
+        Keep the most recently used vectors that fit in 80% of max_bytes,
+        write them to a new generation of the vector file and save the index
+        that points at it. Caller holds the lock.
+        """
+        capacity = int(self.max_bytes * 0.8) // (self.dimension * 2)
+        keep = np.sort(np.argsort(-self._last_used, kind="stable")[:capacity])
+        
+        old_path = self.vectors_path
+        rows = os.path.getsize(old_path) // (self.dimension * 2)
+        vectors = np.memmap(old_path, dtype=np.float16, mode="r", shape=(rows, self.dimension))
+        self.generation += 1
+        with open(self.vectors_path, "wb") as f:
+            for start in range(0, len(keep), 65536):
+                f.write(np.ascontiguousarray(vectors[self._rows[keep[start:start + 65536]]]).tobytes())
+        del vectors
+        self._vectors = None
+        
+        self._evictions += len(self._keys) - len(keep)
+        logger.info(f"Evicted {len(self._keys) - len(keep)} embeddings from the {self.model_name} cache")
+        self._keys = self._keys[keep]
+        self._rows = np.arange(len(keep), dtype=np.int64)
+        self._last_used = self._last_used[keep]
+        
+        # The index names the new generation, so the old file is unused once it is saved
+        self._save_index()
+        os.remove(old_path)
+        
+    def _save_index(self) -> None:
+        """
+        Atomically persist the index. Caller holds the lock.
+        """
+        temp_path = self.index_path + ".tmp.npz"
+        np.savez(
+            temp_path,
+            keys=self._keys,
+            rows=self._rows,
+            last_used=self._last_used,
+            clock=self._clock,
+            generation=self.generation
+        )
+        os.replace(temp_path, self.index_path)
+        self._stamp = self._index_stamp()
+        
+    def flush(self) -> None:
+        """
+        Persist recency information gathered from lookups.
+        """
+        with self._lock:
+            # Never overwrite an index another instance saved since
+            self._refresh()
+            self._save_index()
+            
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+        
+        Returns:
+            Dictionary with hits, misses, hit_rate, entries, size_bytes and
+            evictions since the cache was opened
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "model_name": self.model_name,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "entries": len(self._keys),
+                "size_bytes": os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0,
+                "evictions": self._evictions
+            }
+            
+    def clear(self) -> None:
+        """
+        Remove every cached embedding of the model.
+        """
+        with self._lock:
+            self._vectors = None
+            for path in (self.vectors_path, self.index_path, self.meta_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._stamp = None
+            self.generation = 0
+            self.dimension = None
+            self._keys = np.empty(0, dtype=np.uint64)
+            self._rows = np.empty(0, dtype=np.int64)
+            self._last_used = np.empty(0, dtype=np.int64)
+            self._clock = 0
+
+_directory_locks: Dict[str, threading.Lock] = {}
+_caches: Dict[Tuple[str, int], EmbeddingCache] = {}
+_registry_lock = threading.Lock()
+
+def _directory_lock(directory: str) -> threading.Lock:
+    """
+    Get the lock shared by every cache instance on a directory.
+    """
+    with _registry_lock:
+        return _directory_locks.setdefault(os.path.abspath(directory), threading.Lock())
+
+def get_embedding_cache(
+    model_name: str,
+    cache_dir: str = os.getenv("EMBEDDING_CACHE_DIR", "data/embedding_cache"),
+    max_bytes: int = int(os.getenv("EMBEDDING_CACHE_MAX_MB", "1024")) * 1024 * 1024
+) -> EmbeddingCache:
+    """
+    Get the process-wide embedding cache of a model, creating it on first use.
+    
+    Args:
+        model_name: Name of the embedding model
+        cache_dir: Directory holding the per-model caches
+        max_bytes: Size of the vector file above which entries are evicted
+        
+    Returns:
+        EmbeddingCache shared by every embedding model in the process
+    """
+    key = (os.path.abspath(os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name))), max_bytes)
+    with _registry_lock:
+        cache = _caches.get(key)
+    if cache is None:
+        cache = EmbeddingCache(model_name, cache_dir=cache_dir, max_bytes=max_bytes)
+        with _registry_lock:
+            cache = _caches.setdefault(key, cache)
+    return cache
@@ -0,0 +1,161 @@
+"""
+HNSW approximate nearest-neighbour index for the local vector store.
+"""
+import os
+import logging
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class HnswIndex:
+    """
+    An HNSW graph over L2-normalized vectors, labelled by row number.
+    
+    Built on hnswlib with inner-product space, so the returned distances are
+    cosine distances. Inserts are incremental, deletes mark rows as
+    tombstones that are skipped by queries, and the graph is saved to and
+    loaded from a single file.
+    
+    Queries may run while rows are added or deleted; growing the graph waits
+    for running queries, since hnswlib cannot resize under them.
+    """
+    
+    def __init__(
+        self,
+        dimension: int,
+        M: int = int(os.getenv("HNSW_M", "16")),
+        ef_construction: int = int(os.getenv("HNSW_EF_CONSTRUCTION", "200")),
+        ef_search: int = int(os.getenv("HNSW_EF_SEARCH", "64")),
+        max_elements: int = 1024,
+        num_threads: int = -1,
+        path: Optional[str] = None
+    ):
+        """
+        Initialize an empty index, or load one saved with save().
+        
+        Args:
+            dimension: Vector dimension
+            M: Number of graph neighbours per node; higher improves recall
+                at the cost of memory and insert time
+            ef_construction: Candidate list size while inserting
+            ef_search: Candidate list size while querying (raised to k if
+                smaller); higher improves recall at the cost of latency
+            max_elements: Initial capacity; grown by doubling on insert
+            num_threads: Threads used for batch inserts (-1 uses all cores)
+            path: Optional index file to load; M and ef_construction are
+                then taken from the file
+        """
+        try:
+            import hnswlib
+        except ImportError as e:
+            raise ImportError("The HNSW index requires hnswlib: pip install hnswlib") from e
+            
+        self.dimension = dimension
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.num_threads = num_threads
+        self._queries = 0
+        self._resize_condition = threading.Condition()
+        self.index = hnswlib.Index(space="ip", dim=dimension)
+        if path:
+            self.index.load_index(path, max_elements=max_elements)
+            logger.info(f"Loaded HNSW index {path} with {self.index.get_current_count()} elements")
+        else:
+            self.index.init_index(max_elements=max_elements, ef_construction=ef_construction, M=M)
+        self.index.set_ef(ef_search)
+        
+    def __len__(self) -> int:
+        return self.index.get_current_count()
+        
+    def add(self, vectors: np.ndarray, rows: np.ndarray) -> None:
+        """
+        Insert vectors labelled with their row numbers.
+        
+        Args:
+            vectors: L2-normalized float32 array of shape (n, dimension)
+            rows: Row numbers used as labels
+        """
+        if not len(rows):
+            return
+            
+        needed = self.index.get_current_count() + len(rows)
+        capacity = self.index.get_max_elements()
+        if needed > capacity:
+            while capacity < needed:
+                capacity *= 2
+            with self._resize_condition:
+                self._resize_condition.wait_for(lambda: self._queries == 0)
+                self.index.resize_index(capacity)
+                
+        self.index.add_items(np.asarray(vectors, dtype=np.float32), np.asarray(rows), num_threads=self.num_threads)
+        
+    def delete(self, rows: List[int]) -> None:
+        """
+        Mark rows as deleted; they stay in the graph but are never returned.
+        
+        Args:
+            rows: Row numbers to delete
+        """
+        for row in rows:
+            try:
+                self.index.mark_deleted(int(row))
+            except RuntimeError:
+                # Already deleted or never inserted
+                pass
+                
+    def search(
+        self,
+        vector: np.ndarray,
+        k: int,
+        allowed: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the approximate k nearest rows.
+        
+        hnswlib raises a RuntimeError when the graph search reaches fewer
+        than k allowed rows, which a selective filter can cause.
+        
+        Args:
+            vector: L2-normalized query vector
+            k: Number of neighbours, at most the number of live (and
+                allowed) rows
+            allowed: Optional boolean mask over rows; only rows where it is
+                True are returned
+                
+        Returns:
+            Tuple of (rows, cosine distances), nearest first
+        """
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            
+        with self._resize_condition:
+            self._queries += 1
+        try:
+            self.index.set_ef(max(self.ef_search, k))
+            if allowed is None:
+                labels, distances = self.index.knn_query(vector, k=k)
+            else:
+                # Rows added after the mask was taken are not allowed
+                labels, distances = self.index.knn_query(
+                    vector, k=k, filter=lambda label: label < len(allowed) and bool(allowed[label])
+                )
+        finally:
+            with self._resize_condition:
+                self._queries -= 1
+                self._resize_condition.notify_all()
+        return labels[0].astype(np.int64), distances[0]
+        
+    def save(self, path: str) -> None:
+        """
+        Atomically save the index to a file.
+        
+        Args:
+            path: Path of the index file
+        """
+        temp_path = path + ".tmp"
+        self.index.save_index(temp_path)
+        os.replace(temp_path, path)
@@ -0,0 +1,198 @@
+"""
+Keyword index module for BM25 search over ingested chunks.
+"""
+import os
+import re
+import json
+import sqlite3
+import logging
+import threading
+from typing import List, Dict, Any, Optional, Iterable
+
+logger = logging.getLogger(__name__)
+
+class KeywordIndex:
+    """
+    A local BM25 inverted index over chunks, backed by SQLite FTS5.
+    
+    Chunks are written at ingest time alongside the vector store, so hybrid
+    search can fall back to fusing local keyword scores with vector scores
+    when the Weaviate server has no hybrid query.
+    """
+    
+    def __init__(
+        self,
+        db_path: str
+    ):
+        """
+        Initialize the keyword index.
+        
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS chunks (
+                rowid INTEGER PRIMARY KEY,
+                id TEXT UNIQUE NOT NULL,
+                content TEXT NOT NULL,
+                metadata TEXT NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+                content, content='chunks', content_rowid='rowid', tokenize='porter unicode61'
+            );
+            CREATE TRIGGER IF NOT EXISTS chunks_insert AFTER INSERT ON chunks BEGIN
+                INSERT INTO chunks_fts (rowid, content) VALUES (new.rowid, new.content);
+            END;
+            CREATE TRIGGER IF NOT EXISTS chunks_delete AFTER DELETE ON chunks BEGIN
+                INSERT INTO chunks_fts (chunks_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+            END;
+            """
+        )
+        
+    @staticmethod
+    def _match_expression(query: str) -> str:
+        """
+        Turn free text into an FTS5 query matching any of its terms.
+        """
+        terms = re.findall(r"\w+", query.lower())
+        return " OR ".join(f'"{term}"' for term in terms)
+        
+    def add(self, documents: Iterable[Dict[str, Any]]) -> None:
+        """
+        Index chunks; chunks already indexed are left as they are.
+        
+        Args:
+            documents: Chunks with id, text and metadata
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO chunks (id, content, metadata) VALUES (?, ?, ?)",
+                [(doc["id"], doc["text"], json.dumps(dict(doc["metadata"]))) for doc in documents]
+            )
+            
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the chunks with the best BM25 score for a query.
+        
+        Args:
+            query: Search query
+            limit: Maximum number of results
+            filters: Optional metadata filters; a list value matches any of
+                its items
+                
+        Returns:
+            Chunks with id, text, metadata and a positive "_score" (higher
+            is better)
+        """
+        expression = self._match_expression(query)
+        if not expression:
+            return []
+            
+        clauses, params = [], [expression]
+        for key, value in (filters or {}).items():
+            values = value if isinstance(value, list) else [value]
+            clauses.append(f"json_extract(c.metadata, ?) IN ({','.join('?' * len(values))})")
+            params.extend([f"$.{key}", *values])
+        where = "".join(f" AND {clause}" for clause in clauses)
+        
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT c.id, c.content, c.metadata, bm25(chunks_fts) AS score "
+                "FROM chunks_fts JOIN chunks c ON c.rowid = chunks_fts.rowid "
+                f"WHERE chunks_fts MATCH ?{where} ORDER BY score LIMIT ?",
+                (*params, limit)
+            ).fetchall()
+            
+        # FTS5 reports BM25 as a negative number, lower is better
+        return [
+            {"id": doc_id, "text": content, "metadata": json.loads(metadata), "_score": -score}
+            for doc_id, content, metadata, score in rows
+        ]
+        
+    def delete(self, document_ids: List[str]) -> None:
+        """
+        Remove chunks by ID.
+        
+        Args:
+            document_ids: IDs of the chunks to remove
+        """
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM chunks WHERE id = ?", [(doc_id,) for doc_id in document_ids])
+            
+    def delete_by_filter(self, filters: Dict[str, Any]) -> None:
+        """
+        Remove chunks whose metadata matches the filters; empty filters
+        remove everything.
+        
+        Args:
+            filters: Metadata filters
+        """
+        clauses, params = [], []
+        for key, value in filters.items():
+            values = value if isinstance(value, list) else [value]
+            clauses.append(f"json_extract(metadata, ?) IN ({','.join('?' * len(values))})")
+            params.extend([f"$.{key}", *values])
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM chunks{where}", params)
+
+def fuse_results(
+    vector_results: List[Dict[str, Any]],
+    keyword_results: List[Dict[str, Any]],
+    alpha: float,
+    limit: int
+) -> List[Dict[str, Any]]:
+    """
+    Fuse vector and keyword results with relative score fusion.
+    
+    Each list's scores are min-max normalized to [0, 1] and combined as
+    alpha * vector + (1 - alpha) * keyword, matching Weaviate's hybrid
+    alpha (1 is pure vector search, 0 pure keyword search).
+    
+    Args:
+        vector_results: Results with "id" and "_distance"
+        keyword_results: Results with "id" and "_score"
+        alpha: Weight of the vector scores
+        limit: Maximum number of results
+        
+    Returns:
+        Fused results, best first, with the combined "_score"
+    """
+    def normalized(results, score):
+        if not results:
+            return {}
+        scores = [score(result) for result in results]
+        low, high = min(scores), max(scores)
+        span = high - low
+        return {
+            result["id"]: (value - low) / span if span else 1.0
+            for result, value in zip(results, scores)
+        }
+        
+    vector_scores = normalized(vector_results, lambda result: 1.0 - result["_distance"])
+    keyword_scores = normalized(keyword_results, lambda result: result["_score"])
+    
+    documents = {result["id"]: result for result in keyword_results}
+    documents.update({result["id"]: result for result in vector_results})
+    
+    fused = []
+    for doc_id, document in documents.items():
+        score = alpha * vector_scores.get(doc_id, 0.0) + (1 - alpha) * keyword_scores.get(doc_id, 0.0)
+        fused.append(dict(document, _score=score))
+    fused.sort(key=lambda result: result["_score"], reverse=True)
+    return fused[:limit]
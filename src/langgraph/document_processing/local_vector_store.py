@@ -0,0 +1,710 @@
+"""
+In-process vector store backed by memory-mapped NumPy arrays.
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+from itertools import islice
+from typing import List, Dict, Any, Optional, Iterable, Tuple, Sequence
+
+import numpy as np
+
+from src.langgraph.document_processing.vector_store import make_document_id, get_index_state
+
+logger = logging.getLogger(__name__)
+
+class NumpyVectorStore:
+    """
+    A vector store that keeps every vector in one contiguous float32 matrix.
+    
+    Vectors are L2-normalized on insert, so top-k cosine search is a single
+    matrix-vector product followed by argpartition. Vectors live in a
+    memory-mapped file that grows by doubling; records (ID, text and
+    metadata) are kept in an append-only JSON-lines log where deletes are
+    tombstones. Once most of the log is dead both files are rewritten as a
+    new generation, which state.json switches to atomically.
+    
+    With index_type "hnsw", searches go through an approximate HNSW graph
+    over the same rows instead of the exact scan, for corpora of millions
+    of chunks.
+    
+    Stores opened on the same directory in one process share the
+    directory's IndexState: its write lock serializes them, and an instance
+    reloads the files when the version shows another instance wrote.
+    """
+    
+    def __init__(
+        self,
+        index_name: str = "SchoolTutorDocuments",
+        data_dir: str = os.getenv("LOCAL_VECTOR_STORE_DIR", "data/vector_store"),
+        embedder: Optional[Any] = None,
+        embed_batch_size: int = int(os.getenv("WEAVIATE_EMBED_BATCH_SIZE", "512")),
+        index_type: str = os.getenv("LOCAL_VECTOR_INDEX", "flat")
+    ):
+        """
+        Initialize the local vector store.
+        
+        Args:
+            index_name: Name of the index, used as the directory name
+            data_dir: Directory holding the indexes
+            embedder: EmbeddingModel used for documents and queries (created
+                lazily if not given)
+            embed_batch_size: Number of chunks embedded together
+            index_type: "flat" for exact search or "hnsw" for approximate
+                search (M and ef are read from HNSW_M, HNSW_EF_CONSTRUCTION
+                and HNSW_EF_SEARCH)
+        """
+        self.index_name = index_name
+        self.directory = os.path.join(data_dir, index_name)
+        self.embedder = embedder
+        self.embed_batch_size = embed_batch_size
+        self.query_embedder = None
+        self.index_type = index_type
+        
+        self.state_path = os.path.join(self.directory, "state.json")
+        self.index_state = get_index_state(f"file://{os.path.abspath(self.directory)}", index_name)
+        
+        # Shared by every store on this directory
+        self._lock = self.index_state.write_lock
+        self._reset()
+        
+    def _reset(self) -> None:
+        """
+        Forget everything loaded from the files.
+        """
+        self._loaded = False
+        self._seen_version = None
+        self.dimension = None
+        self.generation = 0
+        self._vectors = None
+        self._capacity = 0
+        self._count = 0
+        self._alive = np.zeros(0, dtype=bool)
+        self._records: List[Optional[Dict[str, Any]]] = []
+        self._rows: Dict[str, int] = {}
+        self._columns: Dict[str, np.ndarray] = {}
+        self._log_lines = 0
+        self._hnsw = None
+        
+    @property
+    def vectors_path(self) -> str:
+        return os.path.join(self.directory, f"vectors.{self.generation}.f32")
+        
+    @property
+    def records_path(self) -> str:
+        return os.path.join(self.directory, f"records.{self.generation}.jsonl")
+        
+    @property
+    def hnsw_path(self) -> str:
+        return os.path.join(self.directory, f"hnsw.{self.generation}.bin")
+        
+    def _save_state(self) -> None:
+        """
+        Atomically record the dimension and current file generation.
+        """
+        temp_path = self.state_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"dimension": self.dimension, "generation": self.generation}, f)
+        os.replace(temp_path, self.state_path)
+        
+    def get_embedder(self):
+        """
+        Get the embedding model, the process-wide one unless one was given.
+        
+        Returns:
+            EmbeddingModel used for documents and queries
+        """
+        if self.embedder is None:
+            from src.langgraph.document_processing.embedding import get_embedding_model
+            self.embedder = get_embedding_model()
+        return self.embedder
+        
+    def get_query_embedder(self):
+        """
+        Get the micro-batching front end used to embed search queries.
+        
+        Returns:
+            MicroBatchEmbedder shared by every user of the embedding model
+        """
+        if self.query_embedder is None:
+            from src.langgraph.document_processing.micro_batcher import get_micro_batcher
+            self.query_embedder = get_micro_batcher(self.get_embedder())
+        return self.query_embedder
+        
+    def connect(self) -> None:
+        """
+        Open the index, mapping the vector file and replaying the record log.
+        
+        An open index is reloaded if another store on the same directory
+        has written to it since.
+        """
+        with self._lock:
+            if self._loaded:
+                if self._seen_version == self.index_state.version:
+                    return
+                logger.info(f"Reloading local vector store {self.index_name} after a write by another instance")
+                if self._vectors is not None:
+                    self._vectors.flush()
+                self._reset()
+                
+            try:
+                start_time = time.perf_counter()
+                os.makedirs(self.directory, exist_ok=True)
+                
+                if os.path.exists(self.state_path):
+                    with open(self.state_path) as f:
+                        state = json.load(f)
+                    self.dimension = state["dimension"]
+                    self.generation = state["generation"]
+                    
+                records: Dict[str, Dict[str, Any]] = {}
+                if os.path.exists(self.records_path):
+                    with open(self.records_path, encoding="utf-8") as f:
+                        for line in f:
+                            self._log_lines += 1
+                            entry = json.loads(line)
+                            if "deleted" in entry:
+                                records.pop(entry["deleted"], None)
+                            else:
+                                records[entry["id"]] = entry
+                                
+                if self.dimension and os.path.exists(self.vectors_path):
+                    self._map_vectors(os.path.getsize(self.vectors_path) // (self.dimension * 4))
+                    
+                self._count = max((entry["row"] for entry in records.values()), default=-1) + 1
+                self._records = [None] * self._count
+                self._alive = np.zeros(self._capacity, dtype=bool)
+                for doc_id, entry in records.items():
+                    self._records[entry["row"]] = entry
+                    self._rows[doc_id] = entry["row"]
+                    self._alive[entry["row"]] = True
+                    
+                if self.index_type == "hnsw" and self.dimension:
+                    self._open_hnsw()
+                    
+                self._loaded = True
+                self._seen_version = self.index_state.version
+                logger.info(
+                    f"Opened local vector store {self.index_name} with {len(self._rows)} documents "
+                    f"in {(time.perf_counter() - start_time) * 1000:.1f} ms"
+                )
+            except Exception as e:
+                logger.error(f"Error opening local vector store: {e}")
+                raise
+                
+    def setup_schema(self) -> None:
+        """
+        Make sure the index is open; the local store has no schema.
+        """
+        self.connect()
+        
+    def is_ready(self) -> bool:
+        """
+        Check whether the store can serve requests.
+        
+        Returns:
+            True once the index is open
+        """
+        self.connect()
+        return True
+        
+    def index_exists(self) -> bool:
+        """
+        Check whether the index holds any documents.
+        
+        Returns:
+            True if at least one document is stored
+        """
+        self.connect()
+        return bool(self._rows)
+        
+    def _map_vectors(self, capacity: int) -> None:
+        """
+        Map the vector file with room for capacity rows. Caller holds the lock.
+        """
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+            
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(capacity * self.dimension * 4)
+        self._capacity = capacity
+        if capacity:
+            self._vectors = np.memmap(
+                self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dimension)
+            )
+            
+    def _open_hnsw(self) -> None:
+        """
+        Load the saved HNSW graph and catch it up with the record log, or
+        build it from the vectors. Caller holds the lock.
+        """
+        from src.langgraph.document_processing.hnsw_index import HnswIndex
+        
+        self._hnsw = HnswIndex(
+            self.dimension,
+            max_elements=max(self._capacity, 1024),
+            path=self.hnsw_path if os.path.exists(self.hnsw_path) else None
+        )
+        
+        # Rows are inserted in order, so anything past the graph's count was
+        # written after it was last saved; deletes are replayed the same way
+        indexed = len(self._hnsw)
+        self._hnsw.delete(np.flatnonzero(~self._alive[:indexed]))
+        missing = indexed + np.flatnonzero(self._alive[indexed:self._count])
+        if len(missing):
+            logger.info(f"Adding {len(missing)} rows to the HNSW index of {self.index_name}")
+            for start in range(0, len(missing), 65536):
+                rows = missing[start:start + 65536]
+                self._hnsw.add(self._vectors[rows], rows)
+            self._hnsw.save(self.hnsw_path)
+            
+    def _reserve(self, rows: int) -> None:
+        """
+        Grow the vector file, doubling it, until rows more rows fit.
+        """
+        needed = self._count + rows
+        if needed <= self._capacity:
+            return
+            
+        capacity = max(self._capacity, 1024)
+        while capacity < needed:
+            capacity *= 2
+        self._map_vectors(capacity)
+        self._alive = np.concatenate([self._alive, np.zeros(capacity - len(self._alive), dtype=bool)])
+        
+    def _append_log(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Append entries to the record log. Caller holds the lock.
+        """
+        with open(self.records_path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(entry) + "\n" for entry in entries)
+        self._log_lines += len(entries)
+        
+    def add_documents(
+        self,
+        documents: Iterable[Dict[str, Any]],
+        batch_size: int = 50
+    ) -> List[str]:
+        """
+        Add documents to the vector store.
+        
+        Args:
+            documents: List or iterable of documents with text and metadata
+            batch_size: Accepted for compatibility with WeaviateVectorStore
+            
+        Returns:
+            List of IDs of the stored documents
+        """
+        return self.add_documents_with_report(documents, batch_size=batch_size)["document_ids"]
+        
+    def add_documents_with_report(
+        self,
+        documents: Iterable[Dict[str, Any]],
+        batch_size: int = 50
+    ) -> Dict[str, Any]:
+        """
+        Embed and add documents, replacing any with the same ID.
+        
+        Args:
+            documents: List or iterable of documents with text and metadata
+            batch_size: Accepted for compatibility with WeaviateVectorStore
+            
+        Returns:
+            Report with "document_ids" of stored documents and an empty
+            "failed" list, matching WeaviateVectorStore
+        """
+        self.connect()
+        documents = iter(documents)
+        document_ids = []
+        start_time = time.perf_counter()
+        
+        try:
+            while True:
+                group = list(islice(documents, self.embed_batch_size))
+                if not group:
+                    break
+                vectors = self.get_embedder().embed([doc["text"] for doc in group])
+                document_ids.extend(self._insert(group, vectors))
+        except Exception as e:
+            logger.error(f"Error adding documents to local vector store: {e}")
+            raise
+            
+        if self._hnsw is not None:
+            with self._lock:
+                self._hnsw.save(self.hnsw_path)
+                
+        elapsed = time.perf_counter() - start_time
+        logger.info(f"Added {len(document_ids)} documents to {self.index_name} in {elapsed:.2f}s")
+        return {"document_ids": document_ids, "failed": []}
+        
+    def _insert(self, documents: List[Dict[str, Any]], vectors: np.ndarray) -> List[str]:
+        """
+        Write one embedded group of documents.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        
+        with self._lock:
+            # Pick up rows written by other instances before numbering new ones
+            self.connect()
+            if self.dimension is None:
+                self.dimension = int(vectors.shape[1])
+                self._save_state()
+                if self.index_type == "hnsw":
+                    self._open_hnsw()
+            self._reserve(len(documents))
+            
+            document_ids, entries, new_vectors = [], [], []
+            for doc, vector in zip(documents, vectors):
+                doc_id = make_document_id(doc["text"])
+                if doc_id in self._rows:
+                    # Same content, same vector: an upsert is a no-op
+                    document_ids.append(doc_id)
+                    continue
+                    
+                row = self._count
+                self._count += 1
+                entry = {"id": doc_id, "row": row, "text": doc["text"], "metadata": dict(doc["metadata"])}
+                self._vectors[row] = vector
+                self._records.append(entry)
+                self._rows[doc_id] = row
+                self._alive[row] = True
+                entries.append(entry)
+                new_vectors.append(vector)
+                document_ids.append(doc_id)
+                
+            if entries:
+                self._vectors.flush()
+                self._append_log(entries)
+                self._columns.clear()
+                self.index_state.mark_populated()
+                self._seen_version = self.index_state.version
+                if self._hnsw is not None:
+                    self._hnsw.add(np.stack(new_vectors), np.array([entry["row"] for entry in entries]))
+                    
+        return document_ids
+        
+    def _column(self, key: str) -> np.ndarray:
+        """
+        Get a metadata field of every row as an array, built once per write.
+        """
+        column = self._columns.get(key)
+        if column is None:
+            values = [
+                (record or {}).get("metadata", {}).get(key) for record in self._records
+            ]
+            column = np.empty(len(values), dtype=object)
+            column[:] = values
+            self._columns[key] = column
+        return column
+        
+    def _filter_mask(self, filters: Optional[Dict[str, Any]]) -> np.ndarray:
+        """
+        Build the mask of live rows matching the filters. Caller holds the lock.
+        """
+        mask = self._alive[:self._count].copy()
+        for key, value in (filters or {}).items():
+            column = self._column(key)
+            if isinstance(value, list):
+                mask &= np.isin(column, value)
+            else:
+                mask &= column == value
+        return mask
+        
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        vector: Optional[Sequence[float]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search for relevant documents based on a query.
+        
+        Args:
+            query: The search query
+            limit: Maximum number of results
+            filters: Optional metadata filters; a list value matches any of
+                its items
+            vector: Query embedding from get_query_embedder(), e.g. one
+                already computed for the query cache; embedded here if None
+                
+        Returns:
+            List of relevant documents or empty list on error
+        """
+        try:
+            self.connect()
+            if not self._rows:
+                logger.warning(f"No objects found in {self.index_name}, search will return empty results")
+                return []
+                
+            if vector is None:
+                vector = self.get_query_embedder().embed_query(query)
+            vector = np.asarray(vector, dtype=np.float32)
+            vector = vector / max(float(np.linalg.norm(vector)), 1e-12)
+            return self.search_by_vector(vector, limit=limit, filters=filters)
+        except Exception as e:
+            logger.error(f"Error searching local vector store: {e}")
+            return []
+            
+    async def asearch(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        vector: Optional[Sequence[float]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search without blocking the event loop while the query is embedded.
+        
+        Args:
+            query: The search query
+            limit: Maximum number of results
+            filters: Optional metadata filters; a list value matches any of
+                its items
+            vector: Query embedding from get_query_embedder(), e.g. one
+                already computed for the query cache; embedded here if None
+                
+        Returns:
+            List of relevant documents or empty list on error
+        """
+        try:
+            if not self._loaded or self._seen_version != self.index_state.version:
+                await asyncio.to_thread(self.connect)
+            if not self._rows:
+                logger.warning(f"No objects found in {self.index_name}, search will return empty results")
+                return []
+                
+            if vector is None:
+                vector = await asyncio.wrap_future(self.get_query_embedder().submit(query))
+            vector = np.asarray(vector, dtype=np.float32)
+            vector = vector / max(float(np.linalg.norm(vector)), 1e-12)
+            return self.search_by_vector(vector, limit=limit, filters=filters)
+        except Exception as e:
+            logger.error(f"Error searching local vector store: {e}")
+            return []
+            
+    def search_many(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Run several searches, embedding all queries in one batch.
+        
+        Args:
+            queries: The search queries
+            limit: Maximum number of results per query
+            filters: Optional metadata filters applied to every query
+            
+        Returns:
+            One list of relevant documents per query, in input order
+        """
+        if not queries:
+            return []
+            
+        try:
+            self.connect()
+            if not self._rows:
+                logger.warning(f"No objects found in {self.index_name}, search will return empty results")
+                return [[] for _ in queries]
+                
+            vectors = np.asarray(self.get_embedder().embed(queries, use_cache=False), dtype=np.float32)
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+            return [self.search_by_vector(vector, limit=limit, filters=filters) for vector in vectors]
+        except Exception as e:
+            logger.error(f"Error searching local vector store: {e}")
+            return [[] for _ in queries]
+            
+    def search_by_vector(
+        self,
+        vector: np.ndarray,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the documents nearest to a normalized query vector.
+        
+        Args:
+            vector: L2-normalized query vector
+            limit: Maximum number of results
+            filters: Optional metadata filters
+            
+        Returns:
+            Documents with their ID, and their cosine distance in "_distance"
+        """
+        # Snapshot under the lock and score outside it: writers only append
+        # rows past the snapshot, replace (never resize) the arrays and lists,
+        # or blank out records of deleted rows, which are then skipped
+        with self._lock:
+            self.connect()
+            mask = self._filter_mask(filters)
+            count, vectors, records, hnsw = self._count, self._vectors, self._records, self._hnsw
+            
+        candidates = np.flatnonzero(mask)
+        if not len(candidates):
+            return []
+            
+        k = min(limit, len(candidates))
+        if hnsw is not None:
+            try:
+                rows, distances = hnsw.search(
+                    vector, k, allowed=mask if len(candidates) < count else None
+                )
+                return [
+                    self._result(records[row], distance)
+                    for row, distance in zip(rows, distances)
+                    if row < count and records[row] is not None
+                ]
+            except RuntimeError as e:
+                # hnswlib gives up when a selective filter leaves fewer than k reachable rows
+                logger.info(f"HNSW search found too few matches, falling back to an exact scan: {e}")
+                
+        if len(candidates) == count:
+            scores = vectors[:count] @ vector
+        else:
+            scores = vectors[candidates] @ vector
+            
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        rows = top if len(candidates) == count else candidates[top]
+        
+        return [
+            self._result(records[row], 1.0 - scores[index])
+            for row, index in zip(rows, top)
+            if records[row] is not None
+        ]
+        
+    @staticmethod
+    def _result(record: Dict[str, Any], distance: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Turn a stored record into a document shaped like WeaviateVectorStore
+        results, with its own copy of the metadata.
+        """
+        document = {"id": record["id"], "text": record["text"], "metadata": dict(record["metadata"])}
+        if distance is not None:
+            document["_distance"] = float(distance)
+        return document
+        
+    def fetch_chunks(self, keys: List[Tuple[str, int]]) -> List[Dict[str, Any]]:
+        """
+        Fetch chunks by source and chunk number.
+        
+        Args:
+            keys: (source, chunk) pairs of the chunks to fetch
+            
+        Returns:
+            List of the chunks found, with text and metadata
+        """
+        if not keys:
+            return []
+            
+        wanted = {(source, int(chunk)) for source, chunk in keys}
+        with self._lock:
+            self.connect()
+            sources = self._column("source")
+            chunks = self._column("chunk")
+            rows = np.flatnonzero(self._alive[:self._count] & np.isin(chunks, [chunk for _, chunk in wanted]))
+            return [
+                self._result(self._records[row])
+                for row in rows
+                if (sources[row], chunks[row]) in wanted
+            ]
+            
+    def delete_by_ids(
+        self,
+        document_ids: List[str],
+        batch_size: int = 100
+    ) -> int:
+        """
+        Delete documents by their IDs.
+        
+        Args:
+            document_ids: IDs of the documents to delete
+            batch_size: Accepted for compatibility with WeaviateVectorStore
+            
+        Returns:
+            Number of deleted documents
+        """
+        with self._lock:
+            try:
+                self.connect()
+                deleted = [doc_id for doc_id in set(document_ids) if doc_id in self._rows]
+                rows = [self._rows.pop(doc_id) for doc_id in deleted]
+                for row in rows:
+                    self._alive[row] = False
+                    self._records[row] = None
+                if deleted:
+                    self._append_log([{"deleted": doc_id} for doc_id in deleted])
+                    self._columns.clear()
+                    self.index_state.mark_deleted()
+                    self._seen_version = self.index_state.version
+                    if self._log_lines > 1024 and len(self._rows) < self._log_lines // 2:
+                        self._compact()
+                    elif self._hnsw is not None:
+                        self._hnsw.delete(rows)
+                        self._hnsw.save(self.hnsw_path)
+            except Exception as e:
+                logger.error(f"Error deleting documents by ID: {e}")
+                raise
+                
+        logger.info(f"Deleted {len(deleted)} documents from {self.index_name}")
+        return len(deleted)
+        
+    def delete_by_filter(
+        self,
+        filters: Dict[str, Any]
+    ) -> int:
+        """
+        Delete documents based on filters; empty filters delete everything.
+        
+        Args:
+            filters: Filters to match documents for deletion
+            
+        Returns:
+            Number of deleted documents
+        """
+        with self._lock:
+            self.connect()
+            rows = np.flatnonzero(self._filter_mask(filters))
+            document_ids = [self._records[row]["id"] for row in rows]
+        return self.delete_by_ids(document_ids)
+        
+    def _compact(self) -> None:
+        """
+        Write the live rows to a new generation of files and switch to it.
+        Caller holds the lock.
+        """
+        live = np.flatnonzero(self._alive[:self._count])
+        records = [dict(self._records[row], row=index) for index, row in enumerate(live)]
+        old_paths = (self.vectors_path, self.records_path, self.hnsw_path)
+        self.generation += 1
+        
+        with open(self.vectors_path, "wb") as f:
+            for start in range(0, len(live), 65536):
+                f.write(np.ascontiguousarray(self._vectors[live[start:start + 65536]]).tobytes())
+        with open(self.records_path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+        self._save_state()
+        
+        self._vectors = None
+        self._hnsw = None
+        for path in old_paths:
+            if os.path.exists(path):
+                os.remove(path)
+                
+        self._count = len(records)
+        self._records = records
+        self._rows = {record["id"]: record["row"] for record in records}
+        self._log_lines = len(records)
+        self._columns.clear()
+        self._map_vectors(max(self._count, 1024))
+        self._alive = np.zeros(self._capacity, dtype=bool)
+        self._alive[:self._count] = True
+        if self.index_type == "hnsw":
+            self._open_hnsw()
+        logger.info(f"Compacted {self.index_name} to {len(records)} documents")
@@ -0,0 +1,198 @@
+"""
+Micro-batching front end for embedding concurrent queries.
+"""
+import os
+import time
+import queue
+import weakref
+import logging
+import threading
+from concurrent.futures import Future
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class MicroBatchEmbedder:
+    """
+    Coalesces concurrent single-text embedding calls into batches.
+    
+    Callers enqueue a text and wait on a future. A collector thread takes the
+    first waiting text, keeps collecting until max_batch_size texts are queued
+    or max_wait_ms has passed since the first one, embeds the batch in one
+    call and hands every caller its own row.
+    
+    The batcher holds only a weak reference to its embedder and stops its
+    collector thread once the embedder is garbage collected, so a batcher
+    never keeps a model (or a registry entry keyed by it) alive.
+    """
+    
+    def __init__(
+        self,
+        embedder,
+        max_batch_size: int = int(os.getenv("QUERY_BATCH_SIZE", "32")),
+        max_wait_ms: float = float(os.getenv("QUERY_BATCH_WAIT_MS", "5"))
+    ):
+        """
+        Initialize the micro-batcher and start its collector thread.
+        
+        Args:
+            embedder: EmbeddingModel used to embed each batch; the caller
+                keeps it alive for as long as the batcher is used
+            max_batch_size: Largest number of texts embedded together
+            max_wait_ms: Longest time the first text of a batch waits for
+                others to join it
+        """
+        self._embedder = weakref.ref(embedder)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue" = queue.Queue()
+        self._closed = threading.Event()
+        self._batches = 0
+        self._texts = 0
+        self._thread = threading.Thread(target=self._run, name="micro-batch-embedder", daemon=True)
+        self._thread.start()
+        self._finalizer = weakref.finalize(embedder, self._stop)
+        
+    @property
+    def embedder(self):
+        """
+        The embedding model, or None once it was garbage collected.
+        """
+        return self._embedder()
+        
+    def submit(self, text: str) -> Future:
+        """
+        Enqueue a text for embedding.
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            Future resolving to the text's float32 embedding
+        """
+        if self._closed.is_set():
+            raise RuntimeError("MicroBatchEmbedder is closed")
+            
+        future = Future()
+        self._queue.put((text, future))
+        return future
+        
+    def embed_query(self, text: str, timeout: Optional[float] = None) -> np.ndarray:
+        """
+        Embed a single text, batched with whatever else is in flight.
+        
+        Args:
+            text: Text to embed
+            timeout: Seconds to wait for the result (None waits forever)
+            
+        Returns:
+            Float32 embedding of the text
+        """
+        return self.submit(text).result(timeout=timeout)
+        
+    def _collect(self) -> List[Any]:
+        """
+        Block for the first request, then gather more until the batch is
+        full or the time window closes.
+        """
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+        
+    def _run(self) -> None:
+        """
+        Collector loop run on the background thread.
+        """
+        while True:
+            batch = self._collect()
+            # close() queues None behind every pending request
+            stopping = None in batch
+            batch = [request for request in batch if request is not None]
+            if batch:
+                self._embed_batch(batch)
+            if stopping:
+                return
+                
+    def _embed_batch(self, batch: List[Any]) -> None:
+        """
+        Embed one batch and resolve each caller's future with its row.
+        """
+        texts = [text for text, _ in batch]
+        try:
+            embedder = self._embedder()
+            if embedder is None:
+                raise RuntimeError("The embedding model of the micro-batcher was released")
+            embeddings = embedder.embed(texts, use_cache=False)
+            del embedder
+        except Exception as e:
+            logger.error(f"Error embedding batch of {len(texts)} queries: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+            
+        self._batches += 1
+        self._texts += len(texts)
+        for row, (_, future) in enumerate(batch):
+            future.set_result(embeddings[row])
+            
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get batching statistics.
+        
+        Returns:
+            Dictionary with batches, texts and mean_batch_size
+        """
+        return {
+            "batches": self._batches,
+            "texts": self._texts,
+            "mean_batch_size": self._texts / self._batches if self._batches else 0.0
+        }
+        
+    def _stop(self) -> None:
+        """
+        Let the collector thread exit after the queued texts, without waiting
+        for it; safe to call from any thread, including the collector.
+        """
+        if not self._closed.is_set():
+            self._closed.set()
+            self._queue.put(None)
+            
+    def close(self) -> None:
+        """
+        Stop the collector thread once the queued texts are embedded.
+        """
+        self._finalizer.detach()
+        self._stop()
+        self._thread.join()
+
+_batchers: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_batchers_lock = threading.Lock()
+
+def get_micro_batcher(embedder) -> MicroBatchEmbedder:
+    """
+    Get the micro-batcher of an embedding model, shared by all its users.
+    
+    The entry goes away with the model: the batcher does not reference it
+    strongly and its thread stops when the model is collected.
+    
+    Args:
+        embedder: EmbeddingModel the batches are embedded with
+        
+    Returns:
+        MicroBatchEmbedder for the model, with a single collector thread
+    """
+    with _batchers_lock:
+        batcher = _batchers.get(embedder)
+        if batcher is None:
+            batcher = _batchers[embedder] = MicroBatchEmbedder(embedder)
+        return batcher
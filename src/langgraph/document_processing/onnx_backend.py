@@ -0,0 +1,236 @@
+"""
+ONNX Runtime inference backend for CPU embedding.
+"""
+import os
+import re
+import json
+import logging
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def export_onnx_model(
+    model_name: str,
+    output_dir: str,
+    quantize: bool = False,
+    opset: int = 14
+) -> str:
+    """
+    Export a sentence-transformers model to ONNX, optionally quantized.
+    
+    The transformer is exported with dynamic batch and sequence axes; the
+    pooling and normalization steps of the sentence-transformers pipeline
+    are recorded in pooling.json and replayed in NumPy by the backend.
+    
+    Args:
+        model_name: Name of the sentence-transformers model
+        output_dir: Directory for the exported graph and tokenizer
+        quantize: Whether to also write a dynamically int8-quantized graph
+        opset: ONNX opset version
+        
+    Returns:
+        Path of the graph to load (the quantized one if requested)
+    """
+    import torch
+    import sentence_transformers
+    
+    os.makedirs(output_dir, exist_ok=True)
+    model_path = os.path.join(output_dir, "model.onnx")
+    quantized_path = os.path.join(output_dir, "model.int8.onnx")
+    
+    if not os.path.exists(model_path):
+        logger.info(f"Exporting {model_name} to ONNX in {output_dir}")
+        st_model = sentence_transformers.SentenceTransformer(model_name, device="cpu")
+        transformer = st_model[0].auto_model.eval()
+        tokenizer = st_model.tokenizer
+        
+        pooling = next(
+            (module for module in st_model if isinstance(module, sentence_transformers.models.Pooling)), None
+        )
+        config = {
+            "model_name": model_name,
+            "max_seq_length": st_model.max_seq_length,
+            "pooling": "cls" if pooling is not None and pooling.pooling_mode_cls_token else "mean",
+            "normalize": any(isinstance(module, sentence_transformers.models.Normalize) for module in st_model),
+        }
+        
+        sample = tokenizer(["An example sentence"], return_tensors="pt")
+        input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+        
+        with torch.no_grad():
+            torch.onnx.export(
+                transformer,
+                tuple(sample[name] for name in input_names),
+                model_path,
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=opset,
+                do_constant_folding=True
+            )
+        tokenizer.save_pretrained(output_dir)
+        with open(os.path.join(output_dir, "pooling.json"), "w") as f:
+            json.dump(config, f)
+            
+    if not quantize:
+        return model_path
+        
+    if not os.path.exists(quantized_path):
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        
+        logger.info(f"Quantizing {model_path} to int8")
+        quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+        
+    return quantized_path
+
+class OnnxEmbeddingBackend:
+    """
+    A drop-in replacement for SentenceTransformer.encode on ONNX Runtime.
+    
+    The graph is exported on first use and cached per model, so later
+    processes only import onnxruntime and the tokenizer, not PyTorch.
+    """
+    
+    def __init__(
+        self,
+        model_name: str,
+        quantize: bool = False,
+        intra_op_threads: int = 0,
+        model_dir: str = os.getenv("ONNX_MODEL_DIR", "data/onnx_models")
+    ):
+        """
+        Initialize the ONNX backend, exporting the model if needed.
+        
+        Args:
+            model_name: Name of the sentence-transformers model
+            quantize: Whether to run the dynamically int8-quantized graph
+            intra_op_threads: Threads used inside each operator (0 lets
+                ONNX Runtime decide)
+            model_dir: Directory holding exported models
+        """
+        try:
+            import onnxruntime
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise ImportError(
+                "The ONNX embedding backend requires onnxruntime and onnx: pip install onnxruntime onnx"
+            ) from e
+            
+        self.model_name = model_name
+        self.quantize = quantize
+        self.output_dir = os.path.join(model_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name))
+        graph_path = export_onnx_model(model_name, self.output_dir, quantize=quantize)
+        
+        with open(os.path.join(self.output_dir, "pooling.json")) as f:
+            self.config = json.load(f)
+        self.max_seq_length = self.config["max_seq_length"]
+        self.tokenizer = AutoTokenizer.from_pretrained(self.output_dir)
+        
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+        self.session = onnxruntime.InferenceSession(
+            graph_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+        logger.info(f"Loaded ONNX model {graph_path} ({'int8' if quantize else 'fp32'})")
+        
+    def encode(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        **kwargs
+    ) -> np.ndarray:
+        """
+        Embed texts like SentenceTransformer.encode.
+        
+        Texts are sorted by length so each batch pads to a similar length,
+        and the embeddings are returned in the original order.
+        
+        Args:
+            texts: List of texts to embed
+            batch_size: Number of texts per inference call
+            **kwargs: Accepted for compatibility and ignored
+            
+        Returns:
+            Float32 array of shape (len(texts), dimension)
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+            
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            batch = [texts[i] for i in order[start:start + batch_size]]
+            batches.append(self._encode_batch(batch))
+            
+        embeddings = np.empty((len(texts), batches[0].shape[1]), dtype=np.float32)
+        embeddings[order] = np.concatenate(batches)
+        return embeddings
+        
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Run one batch through the graph and pool the token embeddings.
+        """
+        features = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors="np"
+        )
+        inputs = {name: features[name].astype(np.int64) for name in self.input_names}
+        token_embeddings = self.session.run(None, inputs)[0]
+        
+        if self.config["pooling"] == "cls":
+            embeddings = token_embeddings[:, 0]
+        else:
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            embeddings = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            
+        if self.config["normalize"]:
+            embeddings = embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings.astype(np.float32)
+
+def check_parity(
+    backend: OnnxEmbeddingBackend,
+    texts: List[str],
+    min_cosine: float = 0.99
+) -> Dict[str, Any]:
+    """
+    Compare ONNX embeddings with the PyTorch sentence-transformers model.
+    
+    Args:
+        backend: ONNX backend to check
+        texts: Sample texts to embed with both models
+        min_cosine: Lowest acceptable cosine similarity per text
+        
+    Returns:
+        Dictionary with min_cosine, mean_cosine, max_abs_diff and passed
+    """
+    import sentence_transformers
+    
+    reference = sentence_transformers.SentenceTransformer(backend.model_name, device="cpu")
+    expected = np.asarray(reference.encode(texts, convert_to_numpy=True), dtype=np.float32)
+    actual = backend.encode(texts)
+    
+    cosine = (expected * actual).sum(axis=1) / (
+        np.linalg.norm(expected, axis=1) * np.linalg.norm(actual, axis=1)
+    )
+    result = {
+        "min_cosine": float(cosine.min()),
+        "mean_cosine": float(cosine.mean()),
+        "max_abs_diff": float(np.abs(expected - actual).max()),
+        "passed": bool(cosine.min() >= min_cosine)
+    }
+    
+    if result["passed"]:
+        logger.info(f"ONNX parity check passed: {result}")
+    else:
+        logger.warning(f"ONNX parity check failed: {result}")
+    return result
@@ -1,12 +1,17 @@
 """
 PDF loader module to extract text from PDF files using LangChain's document loaders.
 """
+import io
 import os
+import mmap
+import shutil
 import logging
 import tempfile
-from typing import List, Dict, Any, Optional
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Iterator, BinaryIO, Union
 import streamlit as st
 
+from pypdf import PdfReader
 from langchain_community.document_loaders import PyPDFLoader, PDFMinerLoader, DirectoryLoader
 from langchain_community.document_loaders.base import BaseLoader
 
@@ -17,14 +22,21 @@ class PDFLoader:
     A class to extract text and metadata from PDF files using LangChain loaders.
     """
     
-    def __init__(self, use_pypdf: bool = True):
+    def __init__(
+        self,
+        use_pypdf: bool = True,
+        spill_threshold_bytes: int = int(os.getenv("PDF_SPILL_THRESHOLD_MB", "64")) * 1024 * 1024
+    ):
         """
         Initialize the PDF loader.
         
         Args:
             use_pypdf: Whether to use PyPDFLoader (True) or PDFMinerLoader (False)
+            spill_threshold_bytes: Uploads larger than this are spilled to a
+                memory-mapped temporary file instead of parsed from memory
         """
         self.use_pypdf = use_pypdf
+        self.spill_threshold_bytes = spill_threshold_bytes
         
     def get_loader(self, file_path: str) -> BaseLoader:
         """
@@ -57,22 +69,12 @@ class PDFLoader:
             langchain_docs = loader.load()
             
             # Convert LangChain documents to our format
-            documents = []
             file_name = os.path.basename(file_path)
             total_pages = len(langchain_docs)
-            
-            for doc in langchain_docs:
-                page = doc.metadata.get("page", 0) + 1  # LangChain uses 0-indexed pages
-                
-                documents.append({
-                    "text": doc.page_content,
-                    "metadata": {
-                        "source": file_path,
-                        "file_name": file_name,
-                        "page": page,
-                        "total_pages": total_pages
-                    }
-                })
+            documents = [
+                self._to_page_dict(doc, file_path, file_name, total_pages)
+                for doc in langchain_docs
+            ]
             
             logger.info(f"Successfully extracted text from {file_path}")
             return documents
@@ -81,10 +83,71 @@ class PDFLoader:
             logger.error(f"Error extracting text from PDF {file_path}: {e}")
             raise
             
+    def iter_pages(self, file_path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily extract text from a PDF file one page at a time.
+        
+        Unlike extract_text_from_pdf, only the current page is held in memory,
+        so callers can start processing before the whole file is parsed.
+        
+        Args:
+            file_path: Path to the PDF file
+            
+        Yields:
+            Dictionaries with text content and metadata, one per page
+        """
+        try:
+            loader = self.get_loader(file_path)
+            file_name = os.path.basename(file_path)
+            
+            pages = 0
+            for doc in loader.lazy_load():
+                # Newer loaders report the page count on every page
+                total_pages = doc.metadata.get("total_pages", 0)
+                yield self._to_page_dict(doc, file_path, file_name, total_pages)
+                pages += 1
+                
+            logger.info(f"Successfully streamed {pages} pages from {file_path}")
+            
+        except Exception as e:
+            logger.error(f"Error streaming text from PDF {file_path}: {e}")
+            raise
+            
+    @staticmethod
+    def _to_page_dict(doc, source: str, file_name: str, total_pages: int) -> Dict[str, Any]:
+        """
+        Convert a LangChain page document to our page format.
+        
+        Args:
+            doc: LangChain Document for a single page
+            source: Source path recorded in the metadata
+            file_name: Name of the file
+            total_pages: Total number of pages in the PDF
+            
+        Returns:
+            Dictionary with text content and metadata
+        """
+        page = doc.metadata.get("page", 0) + 1  # LangChain uses 0-indexed pages
+        
+        return {
+            "text": doc.page_content,
+            "metadata": {
+                "source": source,
+                "file_name": file_name,
+                "page": page,
+                "total_pages": total_pages
+            }
+        }
+        
     def extract_text_from_uploaded_pdf(self, uploaded_file) -> List[Dict[str, Any]]:
         """
         Extract text from a PDF uploaded via Streamlit.
         
+        With PyPDF the upload is parsed straight from its in-memory buffer,
+        or from a memory-mapped spill file above spill_threshold_bytes.
+        PDFMiner only reads from a path, so it always goes through a
+        temporary file. Temporary files are removed on every path.
+        
         Args:
             uploaded_file: Streamlit UploadedFile object
             
@@ -92,20 +155,107 @@ class PDFLoader:
             List of dictionaries with text content and metadata
         """
         try:
-            # Create a temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-                # Write uploaded file content to temp file
-                tmp_file.write(uploaded_file.getbuffer())
-                temp_path = tmp_file.name
+            if not self.use_pypdf:
+                with self._spill_to_temp_file(uploaded_file) as tmp_file:
+                    documents = self.extract_text_from_pdf(tmp_file.name)
+                    
+                # The temp path means nothing to users, record the upload name instead
+                for doc in documents:
+                    doc["metadata"]["source"] = uploaded_file.name
+                    doc["metadata"]["file_name"] = uploaded_file.name
+                return documents
+                
+            with self._open_upload_stream(uploaded_file) as stream:
+                return self.extract_text_from_buffer(stream, uploaded_file.name)
+                
+        except Exception as e:
+            logger.error(f"Error extracting text from uploaded PDF {uploaded_file.name}: {e}")
+            raise
             
-            # Process the temporary file
-            documents = self.extract_text_from_pdf(temp_path)
+    def extract_text_from_buffer(
+        self,
+        data: Union[bytes, memoryview, BinaryIO],
+        file_name: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Extract text from a PDF held in memory using PyPDF.
+        
+        Args:
+            data: PDF bytes, a memoryview or a seekable binary stream
+            file_name: Name of the file recorded in the metadata
             
-            # Clean up the temporary file
-            os.unlink(temp_path)
+        Returns:
+            List of dictionaries with text content and metadata
+        """
+        stream = io.BytesIO(data) if isinstance(data, (bytes, bytearray, memoryview)) else data
+        
+        try:
+            reader = PdfReader(stream)
+            total_pages = len(reader.pages)
             
+            documents = []
+            for index, page in enumerate(reader.pages):
+                documents.append({
+                    "text": page.extract_text() or "",
+                    "metadata": {
+                        "source": file_name,
+                        "file_name": file_name,
+                        "page": index + 1,
+                        "total_pages": total_pages
+                    }
+                })
+                
+            logger.info(f"Successfully extracted text from {file_name}")
             return documents
             
         except Exception as e:
-            logger.error(f"Error extracting text from uploaded PDF {uploaded_file.name}: {e}")
+            logger.error(f"Error extracting text from PDF buffer {file_name}: {e}")
             raise
+            
+    @contextmanager
+    def _open_upload_stream(self, uploaded_file) -> Iterator[BinaryIO]:
+        """
+        Open a seekable stream over an upload, spilling large files to disk.
+        
+        Args:
+            uploaded_file: Streamlit UploadedFile or any seekable binary stream
+            
+        Yields:
+            The upload itself, or a read-only memory map of the spill file
+        """
+        uploaded_file.seek(0, io.SEEK_END)
+        size = uploaded_file.tell()
+        uploaded_file.seek(0)
+        
+        if size <= self.spill_threshold_bytes:
+            # UploadedFile is already a BytesIO, so parse it without copying
+            yield uploaded_file
+            return
+            
+        logger.info(f"Spilling {uploaded_file.name} ({size} bytes) to a memory-mapped file")
+        # An anonymous temp file is unlinked on creation, so it can never leak
+        with tempfile.TemporaryFile(suffix='.pdf') as tmp_file:
+            shutil.copyfileobj(uploaded_file, tmp_file, length=1024 * 1024)
+            tmp_file.flush()
+            with mmap.mmap(tmp_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+                
+    @contextmanager
+    def _spill_to_temp_file(self, uploaded_file) -> Iterator[BinaryIO]:
+        """
+        Copy an upload to a named temporary file for path-based loaders.
+        
+        Args:
+            uploaded_file: Streamlit UploadedFile or any seekable binary stream
+            
+        Yields:
+            The closed temporary file, removed again when the context exits
+        """
+        tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
+        try:
+            with tmp_file:
+                uploaded_file.seek(0)
+                shutil.copyfileobj(uploaded_file, tmp_file, length=1024 * 1024)
+            yield tmp_file
+        finally:
+            os.unlink(tmp_file.name)
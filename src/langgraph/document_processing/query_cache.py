@@ -0,0 +1,319 @@
+"""
+Query cache module for reusing search results of repeated and similar questions.
+"""
+import os
+import re
+import time
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a query for exact matching.
+    
+    Args:
+        query: The search query
+        
+    Returns:
+        Lowercased words of the query separated by single spaces
+    """
+    return " ".join(re.findall(r"\w+", query.lower()))
+
+class QueryCache:
+    """
+    A two-level, in-memory cache of search results for one collection.
+    
+    The exact level matches the normalized query text. The approximate
+    level matches the query embedding against the embeddings of cached
+    queries with one matrix-vector product and accepts the closest one
+    above the similarity threshold, so "what is photosynthesis" and
+    "explain photosynthesis" share an entry.
+    
+    Entries are evicted least recently used beyond max_entries and expire
+    after ttl seconds; memory is bounded by max_entries result lists plus
+    a max_entries x dimension float32 matrix of query embeddings. Results
+    are tagged with the collection's IndexState version, and the whole
+    cache is dropped as soon as a write through this process bumps it.
+    Writes made by other processes are only picked up when entries expire.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = int(os.getenv("QUERY_CACHE_SIZE", "1024")),
+        ttl: float = float(os.getenv("QUERY_CACHE_TTL", "600")),
+        similarity_threshold: float = float(os.getenv("QUERY_CACHE_SIMILARITY", "0.92"))
+    ):
+        """
+        Initialize the query cache.
+        
+        Args:
+            max_entries: Maximum number of cached queries
+            ttl: Seconds a cached result stays valid
+            similarity_threshold: Minimum cosine similarity for an
+                approximate hit (0 disables the approximate level)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[Tuple[str, int], Dict[str, Any]]" = OrderedDict()
+        self._vectors: Optional[np.ndarray] = None
+        self._occupied = np.zeros(max_entries, dtype=bool)
+        self._limits = np.zeros(max_entries, dtype=np.int64)
+        self._slot_keys: List[Optional[Tuple[str, int]]] = [None] * max_entries
+        self._free = list(range(max_entries - 1, -1, -1))
+        self._version = 0
+        self._lock = threading.Lock()
+        
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._search_seconds = None
+        
+    def get(self, query: str, limit: int, version: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up the results of a query by its normalized text.
+        
+        Args:
+            query: The search query
+            limit: Maximum number of results the search asked for
+            version: Current IndexState version of the collection
+            
+        Returns:
+            Cached list of documents, or None if the query is not cached
+        """
+        key = (normalize_query(query), limit)
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry["created"] > self.ttl:
+                self._remove(key)
+                return None
+                
+            self._entries.move_to_end(key)
+            self.exact_hits += 1
+            return list(entry["documents"])
+            
+    def get_similar(
+        self,
+        query: str,
+        vector: np.ndarray,
+        limit: int,
+        version: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up the results of the cached query most similar to a query embedding.
+        
+        On a hit the query's normalized text is cached as well, so the next
+        identical question is an exact hit that needs no embedding.
+        
+        Args:
+            query: The search query
+            vector: Embedding of the search query
+            limit: Maximum number of results the search asked for
+            version: Current IndexState version of the collection
+            
+        Returns:
+            Cached list of documents, or None if no cached query is similar enough
+        """
+        with self._lock:
+            self._check_version(version)
+            key = self._nearest(vector, limit, time.monotonic())
+            if key is None:
+                return None
+                
+            entry = self._entries[key]
+            self._entries.move_to_end(key)
+            self.semantic_hits += 1
+            self._insert((normalize_query(query), limit), dict(entry, slot=None))
+            return list(entry["documents"])
+            
+    def put(
+        self,
+        query: str,
+        limit: int,
+        version: int,
+        documents: List[Dict[str, Any]],
+        vector: Optional[np.ndarray] = None
+    ) -> None:
+        """
+        Cache the results of a query.
+        
+        Args:
+            query: The search query
+            limit: Maximum number of results the search asked for
+            version: IndexState version read before the search ran
+            documents: Documents returned by the search
+            vector: Query embedding for the approximate level
+        """
+        key = (normalize_query(query), limit)
+        with self._lock:
+            self._check_version(version)
+            if version < self._version:
+                # The collection changed while the search ran
+                return
+                
+            if key in self._entries:
+                self._remove(key)
+            self._make_room()
+            
+            slot = None
+            if vector is not None and self.similarity_threshold > 0:
+                vector = np.asarray(vector, dtype=np.float32)
+                if self._vectors is None:
+                    self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+                slot = self._free.pop()
+                self._vectors[slot] = vector / max(float(np.linalg.norm(vector)), 1e-12)
+                self._occupied[slot] = True
+                self._limits[slot] = limit
+                self._slot_keys[slot] = key
+                
+            self._entries[key] = {"documents": list(documents), "created": time.monotonic(), "slot": slot}
+            
+    def observe(self, seconds: float, hit: bool) -> None:
+        """
+        Record a retrieval, counting misses and estimating the time saved by hits.
+        
+        Args:
+            seconds: Duration of the retrieval, including the cache lookups
+            hit: Whether the results came from the cache
+        """
+        with self._lock:
+            if not hit:
+                self.misses += 1
+                # Moving average of the cost of a search
+                self._search_seconds = seconds if self._search_seconds is None else 0.9 * self._search_seconds + 0.1 * seconds
+            elif self._search_seconds is not None:
+                self.saved_seconds += max(0.0, self._search_seconds - seconds)
+                
+    def clear(self) -> None:
+        """
+        Drop every cached result.
+        """
+        with self._lock:
+            self._clear()
+            
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the cache's counters.
+        
+        Returns:
+            Dictionary with entries, hits per level, misses, hit rate and
+            estimated seconds saved
+        """
+        with self._lock:
+            lookups = self.exact_hits + self.semantic_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": (self.exact_hits + self.semantic_hits) / lookups if lookups else 0.0,
+                "saved_seconds": self.saved_seconds,
+            }
+            
+    def _nearest(self, vector: np.ndarray, limit: int, now: float) -> Optional[Tuple[str, int]]:
+        """
+        Find the cached query most similar to a query embedding. Caller holds the lock.
+        """
+        if self._vectors is None or self.similarity_threshold <= 0:
+            return None
+            
+        candidates = np.flatnonzero(self._occupied & (self._limits == limit))
+        if not len(candidates):
+            return None
+            
+        vector = np.asarray(vector, dtype=np.float32)
+        scores = self._vectors[candidates] @ (vector / max(float(np.linalg.norm(vector)), 1e-12))
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+            
+        key = self._slot_keys[candidates[best]]
+        if now - self._entries[key]["created"] > self.ttl:
+            self._remove(key)
+            return None
+        return key
+        
+    def _check_version(self, version: int) -> None:
+        """
+        Drop everything if the collection was written to. Caller holds the lock.
+        """
+        if version > self._version:
+            if self._entries:
+                logger.info(f"Collection changed, dropping {len(self._entries)} cached query results")
+            self._clear()
+            self._version = version
+            
+    def _insert(self, key: Tuple[str, int], entry: Dict[str, Any]) -> None:
+        if key in self._entries:
+            self._remove(key)
+        self._make_room()
+        self._entries[key] = entry
+        
+    def _make_room(self) -> None:
+        # Evict the least recently used entries
+        while len(self._entries) >= self.max_entries:
+            self._remove(next(iter(self._entries)))
+            
+    def _remove(self, key: Tuple[str, int]) -> None:
+        entry = self._entries.pop(key)
+        slot = entry["slot"]
+        if slot is not None:
+            self._occupied[slot] = False
+            self._slot_keys[slot] = None
+            self._free.append(slot)
+            
+    def _clear(self) -> None:
+        self._entries.clear()
+        self._occupied[:] = False
+        self._slot_keys = [None] * self.max_entries
+        self._free = list(range(self.max_entries - 1, -1, -1))
+
+_caches: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+def get_query_cache(index_state: Any) -> QueryCache:
+    """
+    Get the query cache of a collection, shared by all sessions.
+    
+    Args:
+        index_state: IndexState of the collection, whose version
+            invalidates the cache
+            
+    Returns:
+        QueryCache for the collection
+    """
+    with _caches_lock:
+        cache = _caches.get(index_state)
+        if cache is None:
+            cache = _caches[index_state] = QueryCache()
+        return cache
+
+def query_cache_stats() -> Dict[str, Any]:
+    """
+    Sum the counters of every query cache in the process.
+    
+    Returns:
+        Dictionary in the format of QueryCache.stats
+    """
+    with _caches_lock:
+        caches = list(_caches.values())
+        
+    totals = {"entries": 0, "exact_hits": 0, "semantic_hits": 0, "misses": 0, "saved_seconds": 0.0}
+    for cache in caches:
+        for name, value in cache.stats().items():
+            if name in totals:
+                totals[name] += value
+    lookups = totals["exact_hits"] + totals["semantic_hits"] + totals["misses"]
+    totals["hit_rate"] = (totals["exact_hits"] + totals["semantic_hits"]) / lookups if lookups else 0.0
+    return totals
@@ -1,8 +1,10 @@
 """
 Text chunker module for splitting text into smaller chunks for embedding using LangChain.
 """
+import bisect
 import logging
-from typing import List, Dict, Any, Optional
+from collections import ChainMap
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
@@ -91,3 +93,248 @@ class TextChunker:
         
         logger.info(f"Split {len(documents)} documents into {len(chunked_documents)} chunks")
         return chunked_documents
+        
+    def iter_chunks(
+        self,
+        documents: Iterable[Dict[str, Any]]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily split documents into chunks, one page at a time.
+        
+        Produces the same chunks as chunk_text, but consumes and yields
+        incrementally so it can sit between a streaming loader and the
+        vector store without materialising the whole document.
+        
+        Args:
+            documents: Iterable of dictionaries with text and metadata
+            
+        Yields:
+            Dictionaries with chunked text and metadata
+        """
+        chunk_number = 0
+        for doc in documents:
+            if not doc["text"] or not doc["text"].strip():
+                continue
+                
+            for text in self.text_splitter.split_text(doc["text"]):
+                chunk_number += 1
+                metadata = doc["metadata"].copy()
+                metadata["chunk"] = chunk_number
+                
+                yield {
+                    "text": text,
+                    "metadata": metadata
+                }
+
+
+class OffsetTextChunker:
+    """
+    A drop-in replacement for TextChunker that splits on string offsets.
+    
+    Instead of round-tripping every page through LangChain Documents and the
+    regex-based recursive splitter, each page is scanned once with str.rfind
+    for the best separator inside the chunk window. Chunks are plain slices
+    of the page text and share the page's metadata dict through a ChainMap,
+    so the per-chunk cost is one slice and one small dict.
+    
+    When a tokenizer is given, chunk_size and chunk_overlap are measured in
+    tokens instead of characters, using the tokenizer's offset mapping.
+    """
+    
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        separators: Optional[List[str]] = None,
+        tokenizer: Optional[Any] = None
+    ):
+        """
+        Initialize the offset-based text chunker.
+        
+        Args:
+            chunk_size: The size of each chunk in characters (or tokens)
+            chunk_overlap: The overlap between chunks in characters (or tokens)
+            separators: List of separators to break on, in order of priority
+            tokenizer: Optional Hugging Face fast tokenizer (for example
+                EmbeddingModel.get_tokenizer()) to size chunks in tokens
+        """
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+            
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.tokenizer = tokenizer
+        
+        # Same priority order as TextChunker; "" means a hard cut
+        self.separators = [
+            sep for sep in (separators or ["\n\n", "\n", ". ", ", ", " ", ""]) if sep
+        ]
+        
+    def split_offsets(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Compute (start, end) character offsets of the chunks of a text.
+        
+        Args:
+            text: The text to split
+            
+        Returns:
+            List of (start, end) offsets into text
+        """
+        if self.tokenizer is not None:
+            encoding = self.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+            token_starts = [start for start, _ in encoding["offset_mapping"]]
+            token_ends = [end for _, end in encoding["offset_mapping"]]
+        else:
+            token_starts = token_ends = None
+            
+        n = len(text)
+        spans = []
+        start = self._skip_whitespace(text, 0, n)
+        
+        while start < n:
+            if token_starts is None:
+                limit = start + self.chunk_size
+            else:
+                first = bisect.bisect_left(token_starts, start)
+                last = first + self.chunk_size
+                limit = n if last >= len(token_starts) else token_ends[last - 1]
+                
+            if limit >= n:
+                end = n
+            else:
+                end = self._find_break(text, start, limit, token_starts, token_ends)
+                
+            # Trim trailing whitespace without copying
+            stop = end
+            while stop > start and text[stop - 1].isspace():
+                stop -= 1
+            if stop > start:
+                spans.append((start, stop))
+                
+            if end >= n:
+                break
+                
+            start = self._skip_whitespace(text, self._overlap_start(text, start, end, token_starts), n)
+            
+        return spans
+        
+    def chunk_text(
+        self,
+        documents: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Split documents into smaller chunks.
+        
+        Args:
+            documents: List of dictionaries with text and metadata
+            
+        Returns:
+            List of dictionaries with chunked text and metadata
+        """
+        chunked_documents = list(self.iter_chunks(documents))
+        logger.info(f"Split {len(documents)} documents into {len(chunked_documents)} chunks")
+        return chunked_documents
+        
+    def iter_chunks(
+        self,
+        documents: Iterable[Dict[str, Any]]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily split documents into chunks, one page at a time.
+        
+        Args:
+            documents: Iterable of dictionaries with text and metadata
+            
+        Yields:
+            Dictionaries with chunked text and metadata
+        """
+        chunk_number = 0
+        for doc in documents:
+            text = doc["text"]
+            if not text or not text.strip():
+                continue
+                
+            page_metadata = doc["metadata"]
+            for start, end in self.split_offsets(text):
+                chunk_number += 1
+                yield {
+                    "text": text[start:end],
+                    "metadata": ChainMap(
+                        {"chunk": chunk_number, "start_index": start, "end_index": end},
+                        page_metadata
+                    )
+                }
+                
+    def _find_break(
+        self,
+        text: str,
+        start: int,
+        limit: int,
+        token_starts: Optional[List[int]] = None,
+        token_ends: Optional[List[int]] = None
+    ) -> int:
+        """
+        Find the end of a chunk at the highest-priority separator in range.
+        
+        Args:
+            text: The text being split
+            start: Start offset of the chunk
+            limit: Maximum end offset of the chunk
+            token_starts: Token start offsets when sizing in tokens
+            token_ends: Token end offsets when sizing in tokens
+            
+        Returns:
+            End offset of the chunk (exclusive)
+        """
+        # Never break inside the overlap, otherwise the next chunk cannot advance
+        if token_starts is None:
+            floor = start + self.chunk_overlap + 1
+        else:
+            index = bisect.bisect_left(token_starts, start) + self.chunk_overlap
+            floor = token_ends[index] if index < len(token_ends) else limit
+        floor = min(floor, limit)
+        for sep in self.separators:
+            index = text.rfind(sep, floor, limit)
+            if index != -1:
+                return index + len(sep)
+        return limit
+        
+    def _overlap_start(
+        self,
+        text: str,
+        start: int,
+        end: int,
+        token_starts: Optional[List[int]]
+    ) -> int:
+        """
+        Find where the next chunk starts so that it overlaps the previous one.
+        
+        Args:
+            text: The text being split
+            start: Start offset of the previous chunk
+            end: End offset of the previous chunk
+            token_starts: Token start offsets when sizing in tokens
+            
+        Returns:
+            Start offset of the next chunk
+        """
+        if token_starts is None:
+            candidate = end - self.chunk_overlap
+        else:
+            index = bisect.bisect_left(token_starts, end) - self.chunk_overlap
+            candidate = token_starts[max(index, 0)]
+            
+        if candidate <= start:
+            return end
+            
+        # Align to the start of a word so the overlap does not begin mid-word
+        space = text.find(" ", candidate, end)
+        newline = text.find("\n", candidate, end)
+        boundaries = [index for index in (space, newline) if index != -1]
+        return min(boundaries) + 1 if boundaries else candidate
+        
+    @staticmethod
+    def _skip_whitespace(text: str, index: int, n: int) -> int:
+        while index < n and text[index].isspace():
+            index += 1
+        return index
@@ -2,16 +2,182 @@
 Vector store module for managing document embeddings with Weaviate.
 """
 import os
+import time
 import uuid
+import asyncio
 import hashlib
 import logging
-from typing import List, Dict, Any, Optional, Union
+import threading
+from itertools import islice
+from typing import List, Dict, Any, Optional, Union, Iterable, Iterator, Tuple, Sequence, Protocol, runtime_checkable
+import aiohttp
 import weaviate
+from requests.exceptions import ConnectionError as RequestsConnectionError
 from weaviate.client import Client
 from weaviate.exceptions import WeaviateBaseError
+from weaviate.gql.get import HybridFusion
+
+from src.langgraph.document_processing.client_pool import get_client_pool
 
 logger = logging.getLogger(__name__)
 
+def make_document_id(text: str) -> str:
+    """
+    Derive the ID of a document chunk from its text.
+    
+    Args:
+        text: Text content of the chunk
+        
+    Returns:
+        UUID string that is stable for identical text
+    """
+    # Generate a UUID based on content for deduplication using MD5 hash
+    # This ensures we get a valid UUID that's consistently derived from the content
+    content_hash = hashlib.md5(text.encode('utf-8')).hexdigest()
+    return str(uuid.uuid5(uuid.NAMESPACE_DNS, content_hash))
+
+class IndexState:
+    """
+    Cached facts about one Weaviate class, shared by every store using it.
+    
+    Only positive answers are cached, so a class created or filled by
+    another process is still picked up. Ingestion marks the class as
+    existing and non-empty, while deletes and search errors clear the
+    flags so the next search checks again. The version counts the writes
+    made through this process, so caches of search results can tell when
+    they are stale, and local stores on the same directory when to reload.
+    The write lock serializes those local stores.
+    """
+    
+    def __init__(self):
+        self.schema_exists = False
+        self.has_objects = False
+        self.version = 0
+        self.lock = threading.Lock()
+        self.write_lock = threading.RLock()
+        
+    def mark_populated(self) -> None:
+        with self.lock:
+            self.schema_exists = True
+            self.has_objects = True
+            self.version += 1
+            
+    def mark_deleted(self) -> None:
+        with self.lock:
+            self.has_objects = False
+            self.version += 1
+            
+    def invalidate(self, schema: bool = False) -> None:
+        """
+        Forget the cached flags.
+        
+        Args:
+            schema: Whether to forget that the class exists as well as that
+                it holds objects
+        """
+        with self.lock:
+            self.has_objects = False
+            if schema:
+                self.schema_exists = False
+
+_index_states: Dict[Tuple[str, str], IndexState] = {}
+_index_states_lock = threading.Lock()
+
+def get_index_state(url: str, index_name: str) -> IndexState:
+    """
+    Get the shared state of a class on a Weaviate server, or of a local index.
+    
+    Args:
+        url: URL of the Weaviate server, or file:// URL of a local store
+        index_name: Name of the class
+        
+    Returns:
+        IndexState shared by all stores in this process
+    """
+    with _index_states_lock:
+        return _index_states.setdefault((url, index_name), IndexState())
+
+@runtime_checkable
+class VectorStore(Protocol):
+    """
+    The interface DocumentProcessor, RetrieverNode and the UI rely on.
+    
+    Implemented by WeaviateVectorStore and, in local_vector_store,
+    NumpyVectorStore; use get_vector_store to pick one from the environment.
+    """
+    
+    index_name: str
+    index_state: IndexState
+    
+    def connect(self) -> None: ...
+    
+    def setup_schema(self) -> None: ...
+    
+    def is_ready(self) -> bool: ...
+    
+    def index_exists(self) -> bool: ...
+    
+    def get_embedder(self) -> Any: ...
+    
+    def get_query_embedder(self) -> Any: ...
+    
+    def add_documents(self, documents: Iterable[Dict[str, Any]], batch_size: int = 50) -> List[str]: ...
+    
+    def add_documents_with_report(
+        self, documents: Iterable[Dict[str, Any]], batch_size: int = 50
+    ) -> Dict[str, Any]: ...
+    
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        vector: Optional[Sequence[float]] = None
+    ) -> List[Dict[str, Any]]: ...
+    
+    async def asearch(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        vector: Optional[Sequence[float]] = None
+    ) -> List[Dict[str, Any]]: ...
+    
+    def search_many(
+        self, queries: List[str], limit: int = 5, filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]: ...
+    
+    def fetch_chunks(self, keys: List[Tuple[str, int]]) -> List[Dict[str, Any]]: ...
+    
+    def delete_by_filter(self, filters: Dict[str, Any]) -> int: ...
+    
+    def delete_by_ids(self, document_ids: List[str], batch_size: int = 100) -> int: ...
+
+def get_vector_store(
+    backend: str = os.getenv("VECTOR_STORE", "weaviate"),
+    **kwargs
+) -> VectorStore:
+    """
+    Create the vector store backend selected by VECTOR_STORE.
+    
+    Args:
+        backend: "weaviate" or "numpy" (in-process, no containers needed)
+        **kwargs: Options passed to the backend's constructor
+        
+    Returns:
+        A VectorStore implementation
+    """
+    if backend == "weaviate":
+        # Read at call time so values loaded from .env after import apply
+        kwargs.setdefault("host", os.getenv("WEAVIATE_HOST", "localhost"))
+        kwargs.setdefault("port", os.getenv("WEAVIATE_PORT", "8080"))
+        return WeaviateVectorStore(**kwargs)
+    if backend == "numpy":
+        # Imported lazily: local_vector_store imports this module
+        from src.langgraph.document_processing.local_vector_store import NumpyVectorStore
+        return NumpyVectorStore(**kwargs)
+    raise ValueError(f"Unknown vector store backend: {backend}")
+
 class WeaviateVectorStore:
     """
     A class to manage document embeddings using Weaviate.
@@ -23,7 +189,17 @@ class WeaviateVectorStore:
         port: str = os.getenv("WEAVIATE_PORT", "8080"),
         api_key: Optional[str] = None,
         index_name: str = "SchoolTutorDocuments",
-        embedding_model: str = "text2vec-transformers",
+        embedding_model: str = os.getenv("WEAVIATE_VECTORIZER", "text2vec-transformers"),
+        embedder: Optional[Any] = None,
+        embed_batch_size: int = int(os.getenv("WEAVIATE_EMBED_BATCH_SIZE", "512")),
+        batch_workers: int = int(os.getenv("WEAVIATE_BATCH_WORKERS", "4")),
+        dynamic_batching: bool = os.getenv("WEAVIATE_DYNAMIC_BATCHING", "true").lower() == "true",
+        batch_creation_time: float = 10.0,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        search_mode: str = os.getenv("SEARCH_MODE", "vector"),
+        hybrid_alpha: float = float(os.getenv("HYBRID_ALPHA", "0.5")),
+        keyword_index: Optional[Any] = None,
     ):
         """
         Initialize the Weaviate vector store.
@@ -33,50 +209,198 @@ class WeaviateVectorStore:
             port: Weaviate port
             api_key: Weaviate API key (if using cloud)
             index_name: Name of the class in Weaviate
-            embedding_model: Model for text embeddings
+            embedding_model: Model for text embeddings, or "none" to embed
+                chunks in-process and send the vectors with each object
+            embedder: EmbeddingModel used when embedding_model is "none"
+                (created lazily if not given)
+            embed_batch_size: Number of chunks embedded together before
+                they are handed to the batch workers
+            batch_workers: Number of batch requests sent concurrently
+            dynamic_batching: Whether to resize batches from observed latency
+            batch_creation_time: Target seconds per batch request when dynamic
+            max_retries: Number of times failed objects are re-sent
+            retry_backoff: Initial delay in seconds between retries, doubled
+                on every attempt
+            search_mode: "vector" for pure vector search or "hybrid" to fuse
+                BM25 keyword scores with vector scores
+            hybrid_alpha: Weight of the vector scores in hybrid search (1 is
+                pure vector search, 0 pure keyword search)
+            keyword_index: KeywordIndex maintained at ingest time in hybrid
+                mode and used when the server has no hybrid query (created
+                lazily if not given)
         """
         self.host = host
         self.port = port
         self.api_key = api_key
         self.index_name = index_name
         self.embedding_model = embedding_model
-        self.client = None
+        self.embedder = embedder
+        self.embed_batch_size = embed_batch_size
+        self.query_embedder = None
+        self.batch_workers = batch_workers
+        self.dynamic_batching = dynamic_batching
+        self.batch_creation_time = batch_creation_time
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.search_mode = search_mode
+        self.hybrid_alpha = hybrid_alpha
+        self.keyword_index = keyword_index
+        self.server_hybrid = None
+        self.index_state = get_index_state(f"http://{host}:{port}", index_name)
+        self.pooled_client = None
         
-    def connect(self) -> None:
+    @property
+    def client(self):
         """
-        Connect to the Weaviate server.
+        The shared Weaviate client, or None before connect().
         """
-        try:
-            url = f"http://{self.host}:{self.port}"
-            auth_config = None
+        return self.pooled_client.client if self.pooled_client else None
+        
+    def connect(self, force: bool = False) -> None:
+        """
+        Get the client for this server from the process-wide pool.
+        
+        Later calls reuse it until the pool's health check marks it as
+        broken, after which the next call reconnects.
+        
+        Args:
+            force: Whether to replace the shared client with a new one
+        """
+        if self.pooled_client is not None and self.pooled_client.healthy and not force:
+            return
+        self.pooled_client = get_client_pool().acquire(self.host, self.port, self.api_key, reconnect=force)
+        
+    def is_ready(self) -> bool:
+        """
+        Check whether the Weaviate server is ready.
+        
+        Returns:
+            True if the server answers its readiness probe
+        """
+        self.connect()
+        return self.client.is_ready()
+        
+    def index_exists(self) -> bool:
+        """
+        Check whether the class for this index exists in the schema.
+        
+        Returns:
+            True if the class exists
+        """
+        if self.index_state.schema_exists:
+            return True
             
-            if self.api_key:
-                auth_config = weaviate.auth.AuthApiKey(api_key=self.api_key)
-                
-            self.client = weaviate.Client(
-                url=url,
-                auth_client_secret=auth_config,
-                additional_headers={
-                    "X-OpenAI-Api-Key": os.getenv("OPENAI_API_KEY", "")  # Optional for OpenAI models
-                }
-            )
+        self.connect()
+        schema = self.client.schema.get()
+        exists = self.index_name in [c['class'] for c in schema.get('classes', [])]
+        if exists:
+            self.index_state.schema_exists = True
+        return exists
+        
+    def get_keyword_index(self):
+        """
+        Get the local BM25 index, creating it on first use.
+        
+        Returns:
+            KeywordIndex for this class
+        """
+        if self.keyword_index is None:
+            from src.langgraph.document_processing.keyword_index import KeywordIndex
+            directory = os.getenv("KEYWORD_INDEX_DIR", "data/keyword_index")
+            self.keyword_index = KeywordIndex(os.path.join(directory, f"{self.index_name}.db"))
+        return self.keyword_index
+        
+    def supports_hybrid(self) -> bool:
+        """
+        Check once whether the server supports hybrid queries with relative
+        score fusion (1.20+).
+        
+        Returns:
+            True if the server version has the hybrid operator with relative
+            score fusion
+        """
+        if self.server_hybrid is None:
+            try:
+                version = self.client.get_meta().get("version", "0")
+                major, minor = (int(part) for part in version.split(".")[:2])
+                self.server_hybrid = (major, minor) >= (1, 20)
+            except Exception as e:
+                logger.warning(f"Could not read the Weaviate version, using the local keyword index: {e}")
+                self.server_hybrid = False
+        return self.server_hybrid
+        
+    @property
+    def client_side_vectors(self) -> bool:
+        """
+        Whether vectors are computed in-process instead of by Weaviate.
+        """
+        return self.embedding_model == "none"
+        
+    def get_embedder(self):
+        """
+        Get the in-process embedding model, the process-wide one unless one
+        was given.
+        
+        Returns:
+            EmbeddingModel used for client-side vectors
+        """
+        if self.embedder is None:
+            from src.langgraph.document_processing.embedding import get_embedding_model
+            self.embedder = get_embedding_model()
+        return self.embedder
+        
+    def get_query_embedder(self):
+        """
+        Get the micro-batching front end used to embed search queries.
+        
+        Concurrent searches share one collector, so queries arriving within
+        a few milliseconds of each other are embedded in a single batch.
+        
+        Returns:
+            MicroBatchEmbedder shared by every user of the embedding model
+        """
+        if self.query_embedder is None:
+            from src.langgraph.document_processing.micro_batcher import get_micro_batcher
+            self.query_embedder = get_micro_batcher(self.get_embedder())
+        return self.query_embedder
+        
+    def _with_vectors(
+        self,
+        documents: Iterable[Dict[str, Any]]
+    ) -> Iterator[Tuple[Dict[str, Any], Optional[Any]]]:
+        """
+        Pair documents with their vectors, embedding embed_batch_size at a time.
+        
+        Args:
+            documents: List or iterable of documents with text and metadata
             
-            if self.client.is_ready():
-                logger.info(f"Successfully connected to Weaviate at {url}")
-            else:
-                raise ConnectionError("Weaviate server is not ready")
-                
-        except Exception as e:
-            logger.error(f"Error connecting to Weaviate: {e}")
-            raise
+        Returns:
+            Iterator of (document, vector) pairs; the vector is None when
+            Weaviate vectorizes the objects itself
+        """
+        documents = iter(documents)
+        if not self.client_side_vectors:
+            for doc in documents:
+                yield doc, None
+            return
+            
+        embedder = self.get_embedder()
+        while True:
+            group = list(islice(documents, self.embed_batch_size))
+            if not group:
+                return
+            vectors = embedder.embed([doc["text"] for doc in group])
+            yield from zip(group, vectors)
             
     def setup_schema(self) -> None:
         """
         Create the schema for document storage if it doesn't exist.
         """
-        if not self.client:
-            self.connect()
+        if self.index_state.schema_exists:
+            return
             
+        self.connect()
+        
         try:
             # Check if schema already exists
             schema = self.client.schema.get()
@@ -84,6 +408,7 @@ class WeaviateVectorStore:
             
             if self.index_name in class_names:
                 logger.info(f"Schema {self.index_name} already exists")
+                self.index_state.schema_exists = True
                 return
                 
             # Define schema
@@ -123,16 +448,20 @@ class WeaviateVectorStore:
                         "description": "Chunk number",
                     },
                 ],
-                "moduleConfig": {
+            }
+            
+            if self.embedding_model == "text2vec-transformers":
+                class_obj["moduleConfig"] = {
                     "text2vec-transformers": {
                         "poolingStrategy": "masked_mean",
                         "vectorizeClassName": False
                     }
                 }
-            }
-            
+                
+                
             # Create the schema
             self.client.schema.create_class(class_obj)
+            self.index_state.schema_exists = True
             logger.info(f"Created schema {self.index_name}")
             
         except Exception as e:
@@ -141,35 +470,122 @@ class WeaviateVectorStore:
             
     def add_documents(
         self, 
-        documents: List[Dict[str, Any]], 
+        documents: Iterable[Dict[str, Any]], 
         batch_size: int = 50
     ) -> List[str]:
         """
         Add documents to the vector store.
         
+        Documents may be a generator; they are consumed lazily and flushed
+        batch by batch, so only the batches in flight are held in memory.
+        Objects that still fail after retries are logged and left out of the
+        returned IDs; use add_documents_with_report for the details.
+        
         Args:
-            documents: List of documents with text and metadata
-            batch_size: Size of batches for insertion
-            
+            documents: List or iterable of documents with text and metadata
+            batch_size: Size of batches for insertion (the initial size when
+                dynamic batching is enabled)
+                
         Returns:
-            List of document IDs
+            List of IDs of the stored documents
         """
-        if not self.client:
-            self.connect()
+        report = self.add_documents_with_report(documents, batch_size=batch_size)
+        
+        for failure in report["failed"]:
+            logger.error(
+                f"Failed to add document {failure['id']} after {failure['attempts']} attempts: {failure['error']}"
+            )
             
+        return report["document_ids"]
+        
+    def add_documents_with_report(
+        self,
+        documents: Iterable[Dict[str, Any]],
+        batch_size: int = 50
+    ) -> Dict[str, Any]:
+        """
+        Add documents to the vector store and report per-object failures.
+        
+        Batches are sent by batch_workers concurrent workers. With dynamic
+        batching the client resizes batches so each request takes about
+        batch_creation_time seconds, and adding objects blocks while all
+        workers are busy, which bounds memory when documents is a generator.
+        Objects rejected by Weaviate are collected from the batch callback
+        and re-sent up to max_retries times with exponential backoff. With
+        client-side vectors, chunks are embedded in groups of
+        embed_batch_size and each object carries its vector.
+        
+        Args:
+            documents: List or iterable of documents with text and metadata
+            batch_size: Size of batches for insertion (the initial size when
+                dynamic batching is enabled)
+                
+        Returns:
+            Report with "document_ids" of stored documents and "failed", a
+            list of {"id", "error", "attempts"} for objects that were lost
+        """
+        self.connect()
+        
         # Ensure schema exists
         self.setup_schema()
         
+        # Stores for the same server share one client, whose batch object
+        # holds the settings and callback of a single ingestion at a time
+        with self.pooled_client.batch_lock:
+            return self._send_batches(documents, batch_size)
+            
+    def _send_batches(
+        self,
+        documents: Iterable[Dict[str, Any]],
+        batch_size: int
+    ) -> Dict[str, Any]:
+        """
+        Send documents through the client's batch object and retry failures.
+        
+        Args:
+            documents: List or iterable of documents with text and metadata
+            batch_size: Size of batches for insertion
+            
+        Returns:
+            Report as returned by add_documents_with_report
+        """
+        failures: Dict[str, Dict[str, Any]] = {}
+        failures_lock = threading.Lock()
+        
+        def collect_failures(results: Optional[List[Dict[str, Any]]]) -> None:
+            # Called from the batch worker threads once per batch request
+            for result in results or []:
+                errors = result.get("result", {}).get("errors")
+                if not errors:
+                    continue
+                message = "; ".join(error.get("message", "") for error in errors.get("error", []))
+                with failures_lock:
+                    failures[result["id"]] = {"object": result, "error": message}
+                    
+        self.client.batch.configure(
+            batch_size=batch_size,
+            dynamic=self.dynamic_batching,
+            creation_time=self.batch_creation_time,
+            num_workers=self.batch_workers,
+            timeout_retries=3,
+            connection_error_retries=3,
+            callback=collect_failures
+        )
+        
         document_ids = []
+        keyword_docs = []
+        keyword_index = self.get_keyword_index() if self.search_mode == "hybrid" else None
+        start_time = time.perf_counter()
         with self.client.batch as batch:
-            batch.batch_size = batch_size
-            
-            for doc in documents:
-                # Generate a UUID based on content for deduplication using MD5 hash
-                # This ensures we get a valid UUID that's consistently derived from the content
-                content_hash = hashlib.md5(doc["text"].encode('utf-8')).hexdigest()
-                doc_id = str(uuid.uuid5(uuid.NAMESPACE_DNS, content_hash))
+            for doc, vector in self._with_vectors(documents):
+                doc_id = make_document_id(doc["text"])
                 
+                if keyword_index is not None:
+                    keyword_docs.append({"id": doc_id, "text": doc["text"], "metadata": doc["metadata"]})
+                    if len(keyword_docs) >= 500:
+                        keyword_index.add(keyword_docs)
+                        keyword_docs = []
+                        
                 # Prepare properties
                 properties = {
                     "content": doc["text"],
@@ -184,105 +600,443 @@ class WeaviateVectorStore:
                 batch.add_data_object(
                     data_object=properties,
                     class_name=self.index_name,
-                    uuid=doc_id
+                    uuid=doc_id,
+                    vector=vector
                 )
                 document_ids.append(doc_id)
                 
-        logger.info(f"Added {len(documents)} documents to Weaviate")
-        return document_ids
+        if keyword_index is not None:
+            keyword_index.add(keyword_docs)
+            
+        attempts = 1
+        while failures and attempts <= self.max_retries:
+            time.sleep(self.retry_backoff * 2 ** (attempts - 1))
+            with failures_lock:
+                retrying = list(failures.values())
+                failures.clear()
+            logger.warning(f"Retrying {len(retrying)} failed objects (attempt {attempts + 1})")
+            
+            with self.client.batch as batch:
+                for failure in retrying:
+                    obj = failure["object"]
+                    batch.add_data_object(
+                        data_object=obj.get("properties", {}),
+                        class_name=obj.get("class", self.index_name),
+                        uuid=obj["id"],
+                        vector=obj.get("vector")
+                    )
+            attempts += 1
+            
+        failed = [
+            {"id": doc_id, "error": failure["error"], "attempts": attempts}
+            for doc_id, failure in failures.items()
+        ]
+        if failed:
+            failed_ids = set(failures)
+            document_ids = [doc_id for doc_id in document_ids if doc_id not in failed_ids]
+            if keyword_index is not None:
+                keyword_index.delete(list(failed_ids))
+                
+        if document_ids:
+            self.index_state.mark_populated()
+            
+        elapsed = time.perf_counter() - start_time
+        logger.info(
+            f"Added {len(document_ids)} documents to Weaviate in {elapsed:.2f}s "
+            f"({len(failed)} failed)"
+        )
+        return {"document_ids": document_ids, "failed": failed}
+        
+    def _prepare_search(self) -> bool:
+        """
+        Connect, make sure the schema exists and check the class has objects.
         
+        Each step is cached, so in steady state no request is sent.
+        
+        Returns:
+            True if there is anything to search
+        """
+        try:
+            self.connect()
+        except Exception as e:
+            logger.error(f"Failed to connect to Weaviate: {e}")
+            return False
+            
+        # Ensure schema exists before searching
+        try:
+            self.setup_schema()
+        except Exception as e:
+            logger.error(f"Failed to ensure schema exists: {e}")
+            return False
+            
+        # Check if there are any objects in the class before searching,
+        # once until the next delete
+        if not self.index_state.has_objects:
+            class_count = self.client.query.aggregate(self.index_name).with_meta_count().do()
+            count = class_count.get('data', {}).get('Aggregate', {}).get(self.index_name, [{}])[0].get('meta', {}).get('count', 0)
+            
+            if count == 0:
+                logger.warning(f"No objects found in class {self.index_name}, search will return empty results")
+                return False
+            self.index_state.has_objects = True
+            
+        if self.search_mode == "hybrid":
+            self.supports_hybrid()
+        return True
+        
+    def _search_prepared(self) -> bool:
+        """
+        Check without any I/O whether _prepare_search has nothing left to do.
+        """
+        return (
+            self.pooled_client is not None and self.pooled_client.healthy
+            and self.index_state.schema_exists and self.index_state.has_objects
+            and (self.search_mode != "hybrid" or self.server_hybrid is not None)
+        )
+        
+    def _build_search_query(
+        self,
+        query: str,
+        limit: int,
+        filters: Optional[Dict[str, Any]],
+        vector: Optional[List[float]]
+    ):
+        """
+        Build the GraphQL Get query for a search.
+        
+        Args:
+            query: The search query
+            limit: Maximum number of results
+            filters: Optional filters for the search
+            vector: Query vector when vectors are computed in-process
+            
+        Returns:
+            GetBuilder ready to run with do() or render with build()
+        """
+        search_query = self.client.query.get(
+            class_name=self.index_name,
+            properties=["content", "source", "file_name", "page", "chunk", "total_pages"]
+        )
+        
+        hybrid = self.search_mode == "hybrid"
+        server_hybrid = hybrid and self.supports_hybrid()
+        
+        # Add hybrid or vector search
+        if server_hybrid:
+            search_query = search_query.with_hybrid(
+                query=query,
+                alpha=self.hybrid_alpha,
+                vector=vector,
+                properties=["content"],
+                fusion_type=HybridFusion.RELATIVE_SCORE
+            ).with_additional(["id", "score"])
+        elif vector is not None:
+            search_query = search_query.with_near_vector({"vector": vector}).with_additional(["id", "distance"])
+        else:
+            search_query = search_query.with_near_text({"concepts": [query]}).with_additional(["id", "distance"])
+            
+        # Add limit, with extra candidates for local fusion
+        search_query = search_query.with_limit(limit * 4 if hybrid and not server_hybrid else limit)
+        
+        # Add filters if provided
+        if filters:
+            where_filter = {}
+            for key, value in filters.items():
+                if isinstance(value, list):
+                    where_filter[key] = {
+                        "operator": "ContainsAny",
+                        "valueText": value
+                    }
+                else:
+                    where_filter[key] = {
+                        "operator": "Equal",
+                        "valueText": value
+                    }
+            search_query = search_query.with_where(where_filter)
+            
+        return search_query
+        
+    def _parse_search_results(
+        self,
+        results: Dict[str, Any],
+        query: str,
+        limit: int,
+        filters: Optional[Dict[str, Any]],
+        key: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Turn a GraphQL response into documents, fusing with the local BM25
+        index when hybrid search falls back to it.
+        
+        Args:
+            results: GraphQL response of the search query
+            query: The search query
+            limit: Maximum number of results
+            filters: Optional filters for the search
+            key: Key of the results under "Get"; the alias of the query in
+                a multi-query request, otherwise the class name
+                
+        Returns:
+            List of relevant documents
+        """
+        hybrid = self.search_mode == "hybrid"
+        server_hybrid = hybrid and self.supports_hybrid()
+        key = key or self.index_name
+        
+        documents = []
+        if 'data' in results and 'Get' in results['data'] and results['data']['Get'].get(key):
+            for item in results['data']['Get'][key]:
+                additional = item.get("_additional") or {}
+                if server_hybrid:
+                    score = float(additional.get("score") or 0.0)
+                    additional = {"id": additional.get("id"), "distance": 1.0 - score}
+                    
+                documents.append({
+                    "id": additional.get("id"),
+                    "text": item.get("content", ""),
+                    "metadata": {
+                        "source": item.get("source", ""),
+                        "file_name": item.get("file_name", ""),
+                        "page": item.get("page", 0),
+                        "chunk": item.get("chunk", 0),
+                        "total_pages": item.get("total_pages", 0),
+                    },
+                    "_distance": additional.get("distance", 1.0)
+                })
+        elif results.get("errors"):
+            logger.error(f"Weaviate search returned errors: {results['errors']}")
+            
+        if hybrid and not server_hybrid:
+            from src.langgraph.document_processing.keyword_index import fuse_results
+            
+            keyword_results = self.get_keyword_index().search(query, limit=limit * 4, filters=filters)
+            documents = fuse_results(documents, keyword_results, self.hybrid_alpha, limit)
+            for document in documents:
+                document["_distance"] = 1.0 - document["_score"]
+                
+        return documents
+        
+    def _search_failed(self, error: Exception) -> None:
+        """
+        Log a failed search and forget cached state that may be stale.
+        
+        Args:
+            error: Exception raised by the search
+        """
+        logger.error(f"Error searching in Weaviate: {error}")
+        # The class may have been dropped; check again on the next search
+        self.index_state.invalidate(schema=True)
+        if isinstance(error, (RequestsConnectionError, aiohttp.ClientConnectionError)):
+            get_client_pool().mark_unhealthy(self.pooled_client)
+            
     def search(
         self, 
         query: str, 
         limit: int = 5,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        vector: Optional[Sequence[float]] = None
     ) -> List[Dict[str, Any]]:
         """
         Search for relevant documents based on a query.
         
+        In hybrid mode this is a single hybrid query when the server
+        supports it; otherwise a single vector query for extra candidates
+        is fused with the local BM25 index.
+        
         Args:
             query: The search query
             limit: Maximum number of results
             filters: Optional filters for the search
-            
+            vector: Query embedding from get_query_embedder(), e.g. one
+                already computed for the query cache; embedded here if None;
+                ignored when the server embeds queries
+                
         Returns:
             List of relevant documents or empty list on error
         """
-        if not self.client:
-            try:
-                self.connect()
-            except Exception as e:
-                logger.error(f"Failed to connect to Weaviate: {e}")
+        try:
+            if not self._prepare_search():
                 return []
+                
+            if not self.client_side_vectors:
+                vector = None
+            elif vector is None:
+                vector = self.get_query_embedder().embed_query(query)
+            if vector is not None:
+                vector = [float(value) for value in vector]
+            results = self._build_search_query(query, limit, filters, vector).do()
+            return self._parse_search_results(results, query, limit, filters)
+            
+        except Exception as e:
+            self._search_failed(e)
+            return []  # Return empty list instead of raising exception
+            
+    async def asearch(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        vector: Optional[Sequence[float]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search for relevant documents without blocking the event loop.
         
-        # Ensure schema exists before searching
+        The query is the same as search() but is sent with the pool's
+        aiohttp session, and client-side query vectors come from the
+        micro-batcher's future. The cached connection and schema checks
+        only run (in a worker thread) until they have been confirmed.
+        
+        Args:
+            query: The search query
+            limit: Maximum number of results
+            filters: Optional filters for the search
+            vector: Query embedding from get_query_embedder(), e.g. one
+                already computed for the query cache; embedded here if None;
+                ignored when the server embeds queries
+                
+        Returns:
+            List of relevant documents or empty list on error
+        """
         try:
-            self.setup_schema()
+            if not self._search_prepared() and not await asyncio.to_thread(self._prepare_search):
+                return []
+                
+            if not self.client_side_vectors:
+                vector = None
+            elif vector is None:
+                vector = await asyncio.wrap_future(self.get_query_embedder().submit(query))
+            if vector is not None:
+                vector = [float(value) for value in vector]
+            search_query = self._build_search_query(query, limit, filters, vector)
+            
+            session = get_client_pool().get_async_session(self.pooled_client)
+            async with session.post(f"{self.pooled_client.url}/v1/graphql", json={"query": search_query.build()}) as response:
+                response.raise_for_status()
+                results = await response.json()
+            return self._parse_search_results(results, query, limit, filters)
+            
         except Exception as e:
-            logger.error(f"Failed to ensure schema exists: {e}")
+            self._search_failed(e)
+            return []
+            
+    def search_many(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        queries_per_request: int = 32
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Run several searches with one GraphQL request.
+        
+        Each query becomes an aliased Get block of a single multi_get
+        request, so N queries cost one round-trip instead of N (one per
+        queries_per_request). With client-side vectors all queries are
+        embedded in one batch.
+        
+        Args:
+            queries: The search queries
+            limit: Maximum number of results per query
+            filters: Optional filters applied to every query
+            queries_per_request: Maximum number of queries packed into one
+                request
+                
+        Returns:
+            One list of relevant documents per query, in input order; a
+            failed request yields empty lists for its queries
+        """
+        if not queries:
             return []
             
         try:
-            # Check if there are any objects in the class before searching
-            class_count = self.client.query.aggregate(self.index_name).with_meta_count().do()
-            count = class_count.get('data', {}).get('Aggregate', {}).get(self.index_name, [{}])[0].get('meta', {}).get('count', 0)
+            if not self._prepare_search():
+                return [[] for _ in queries]
+            if self.client_side_vectors:
+                vectors = self.get_embedder().embed(queries, use_cache=False).tolist()
+            else:
+                vectors = [None] * len(queries)
+        except Exception as e:
+            self._search_failed(e)
+            return [[] for _ in queries]
             
-            if count == 0:
-                logger.warning(f"No objects found in class {self.index_name}, search will return empty results")
-                return []
+        indexed = list(enumerate(zip(queries, vectors)))
+        documents = []
+        for start in range(0, len(indexed), queries_per_request):
+            group = indexed[start:start + queries_per_request]
+            try:
+                builders = [
+                    self._build_search_query(query, limit, filters, vector).with_alias(f"q{i}")
+                    for i, (query, vector) in group
+                ]
+                results = self.client.query.multi_get(builders).do()
+                documents.extend(
+                    self._parse_search_results(results, query, limit, filters, key=f"q{i}")
+                    for i, (query, _) in group
+                )
+            except Exception as e:
+                self._search_failed(e)
+                documents.extend([] for _ in group)
+                
+        return documents
+        
+    def fetch_chunks(self, keys: List[Tuple[str, int]]) -> List[Dict[str, Any]]:
+        """
+        Fetch chunks by source and chunk number with one request.
+        
+        Args:
+            keys: (source, chunk) pairs of the chunks to fetch
             
-            # Start building the query
-            search_query = self.client.query.get(
-                class_name=self.index_name,
-                properties=["content", "source", "file_name", "page", "chunk", "total_pages"]
+        Returns:
+            List of the chunks found, with text and metadata
+        """
+        if not keys:
+            return []
+            
+        self.connect()
+        
+        try:
+            where_filter = {
+                "operator": "Or",
+                "operands": [
+                    {
+                        "operator": "And",
+                        "operands": [
+                            {"path": ["source"], "operator": "Equal", "valueText": source},
+                            {"path": ["chunk"], "operator": "Equal", "valueInt": int(chunk)}
+                        ]
+                    }
+                    for source, chunk in keys
+                ]
+            }
+            results = (
+                self.client.query.get(
+                    class_name=self.index_name,
+                    properties=["content", "source", "file_name", "page", "chunk", "total_pages"]
+                )
+                .with_where(where_filter)
+                .with_additional(["id"])
+                .with_limit(len(keys))
+                .do()
             )
             
-            # Add vector search
-            search_query = search_query.with_near_text({"concepts": [query]})
-            
-            # Add limit
-            search_query = search_query.with_limit(limit)
-            
-            # Add filters if provided
-            if filters:
-                where_filter = {}
-                for key, value in filters.items():
-                    if isinstance(value, list):
-                        where_filter[key] = {
-                            "operator": "ContainsAny",
-                            "valueText": value
-                        }
-                    else:
-                        where_filter[key] = {
-                            "operator": "Equal",
-                            "valueText": value
-                        }
-                search_query = search_query.with_where(where_filter)
-            
-            # Execute the query
-            results = search_query.do()
-            
-            # Process results
-            documents = []
-            if 'data' in results and 'Get' in results['data'] and self.index_name in results['data']['Get']:
-                for item in results['data']['Get'][self.index_name]:
-                    documents.append({
-                        "text": item.get("content", ""),
-                        "metadata": {
-                            "source": item.get("source", ""),
-                            "file_name": item.get("file_name", ""),
-                            "page": item.get("page", 0),
-                            "chunk": item.get("chunk", 0),
-                            "total_pages": item.get("total_pages", 0),
-                        },
-                        "_distance": item.get("_additional", {}).get("distance", 1.0)
-                    })
-                    
-            return documents
+            return [
+                {
+                    "id": (item.get("_additional") or {}).get("id"),
+                    "text": item.get("content", ""),
+                    "metadata": {
+                        "source": item.get("source", ""),
+                        "file_name": item.get("file_name", ""),
+                        "page": item.get("page", 0),
+                        "chunk": item.get("chunk", 0),
+                        "total_pages": item.get("total_pages", 0),
+                    }
+                }
+                for item in ((results.get("data") or {}).get("Get") or {}).get(self.index_name) or []
+            ]
             
         except Exception as e:
-            logger.error(f"Error searching in Weaviate: {e}")
-            return []  # Return empty list instead of raising exception
+            logger.error(f"Error fetching chunks: {e}")
+            raise
             
     def delete_by_filter(
         self, 
@@ -297,9 +1051,8 @@ class WeaviateVectorStore:
         Returns:
             Number of deleted documents
         """
-        if not self.client:
-            self.connect()
-            
+        self.connect()
+        
         try:
             where_filter = {}
             for key, value in filters.items():
@@ -319,8 +1072,57 @@ class WeaviateVectorStore:
                 where=where_filter
             )
             
+            if self.search_mode == "hybrid":
+                self.get_keyword_index().delete_by_filter(filters)
+            self.index_state.mark_deleted()
+            
             return result.get("results", {}).get("successful", 0)
             
         except Exception as e:
             logger.error(f"Error deleting documents: {e}")
             raise
+            
+    def delete_by_ids(
+        self,
+        document_ids: List[str],
+        batch_size: int = 100
+    ) -> int:
+        """
+        Delete documents by their IDs.
+        
+        Args:
+            document_ids: IDs of the documents to delete
+            batch_size: Number of IDs matched per delete request
+            
+        Returns:
+            Number of deleted documents
+        """
+        self.connect()
+        
+        deleted = 0
+        try:
+            for start in range(0, len(document_ids), batch_size):
+                batch_ids = document_ids[start:start + batch_size]
+                where_filter = {
+                    "operator": "Or",
+                    "operands": [
+                        {"path": ["id"], "operator": "Equal", "valueText": doc_id}
+                        for doc_id in batch_ids
+                    ]
+                }
+                result = self.client.batch.delete_objects(
+                    class_name=self.index_name,
+                    where=where_filter
+                )
+                deleted += result.get("results", {}).get("successful", 0)
+                
+            if self.search_mode == "hybrid":
+                self.get_keyword_index().delete(document_ids)
+            self.index_state.mark_deleted()
+            
+            logger.info(f"Deleted {deleted} documents from Weaviate")
+            return deleted
+            
+        except Exception as e:
+            logger.error(f"Error deleting documents by ID: {e}")
+            raise
@@ -0,0 +1,521 @@
+"""
+Checkpointer module for persisting tutoring conversations in SQLite.
+"""
+import os
+import time
+import zlib
+import sqlite3
+import asyncio
+import logging
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+
+logger = logging.getLogger(__name__)
+
+# Serialized values smaller than this are stored uncompressed
+COMPRESS_MIN_BYTES = 256
+
+class SQLiteCheckpointer(BaseCheckpointSaver):
+    """
+    A durable checkpointer that stores graph checkpoints in SQLite.
+    
+    Checkpoints and pending writes are serialized with the graph's
+    serializer (msgpack) and zlib-compressed when larger than
+    COMPRESS_MIN_BYTES; message histories compress to a fraction of their
+    size. Each checkpoint stores the full channel values, so reading the
+    latest state of a thread is a single row. A background thread prunes
+    every thread down to its last keep_last checkpoints and deletes threads
+    idle for longer than max_age seconds.
+    
+    One connection is shared by all sessions and serialized with a lock;
+    the async methods run the same queries in a worker thread.
+    """
+    
+    def __init__(
+        self,
+        db_path: str = os.getenv("CHECKPOINT_DB_PATH", "data/checkpoints.db"),
+        keep_last: int = int(os.getenv("CHECKPOINT_KEEP_LAST", "3")),
+        max_age: float = float(os.getenv("CHECKPOINT_MAX_AGE_DAYS", "30")) * 86400,
+        prune_interval: float = float(os.getenv("CHECKPOINT_PRUNE_INTERVAL", "600")),
+        compression_level: int = int(os.getenv("CHECKPOINT_COMPRESSION_LEVEL", "6")),
+        serde: Optional[Any] = None
+    ):
+        """
+        Initialize the checkpointer.
+        
+        Args:
+            db_path: Path to the SQLite database file
+            keep_last: Checkpoints kept per thread when pruning
+            max_age: Seconds after its last checkpoint a thread is deleted
+            prune_interval: Seconds between background prunes (0 disables
+                the background thread; prune_old_checkpoints can still be
+                called directly)
+            compression_level: zlib level of the stored values (0 disables
+                compression)
+            serde: Serializer for checkpoints (the graph's default if not given)
+        """
+        super().__init__(serde=serde)
+        self.db_path = db_path
+        self.keep_last = keep_last
+        self.max_age = max_age
+        self.prune_interval = prune_interval
+        self.compression_level = compression_level
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                checkpoint_id TEXT NOT NULL,
+                parent_checkpoint_id TEXT,
+                type TEXT NOT NULL,
+                checkpoint BLOB NOT NULL,
+                metadata_type TEXT NOT NULL,
+                metadata BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+            );
+            CREATE TABLE IF NOT EXISTS writes (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                checkpoint_id TEXT NOT NULL,
+                task_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                channel TEXT NOT NULL,
+                type TEXT NOT NULL,
+                value BLOB NOT NULL,
+                task_path TEXT NOT NULL DEFAULT '',
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+            );
+            CREATE INDEX IF NOT EXISTS checkpoints_by_age ON checkpoints (created_at);
+            """
+        )
+        
+        self._stop = threading.Event()
+        self._pruner = None
+        if prune_interval > 0:
+            self._pruner = threading.Thread(target=self._prune_periodically, name="checkpoint-pruner", daemon=True)
+            self._pruner.start()
+            
+    def _dumps(self, value: Any) -> Tuple[str, bytes]:
+        """
+        Serialize a value, compressing it if it is large enough to benefit.
+        """
+        type_, data = self.serde.dumps_typed(value)
+        if self.compression_level > 0 and len(data) >= COMPRESS_MIN_BYTES:
+            return f"zlib:{type_}", zlib.compress(data, self.compression_level)
+        return type_, data
+        
+    def _loads(self, type_: str, data: bytes) -> Any:
+        if type_.startswith("zlib:"):
+            return self.serde.loads_typed((type_[5:], zlib.decompress(data)))
+        return self.serde.loads_typed((type_, data))
+        
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """
+        Get a checkpoint of a thread.
+        
+        Args:
+            config: Config with the thread_id and, optionally, checkpoint_ns
+                and checkpoint_id (the latest checkpoint if not given)
+                
+        Returns:
+            The checkpoint tuple, or None if the thread has no such checkpoint
+        """
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        query = (
+            "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+            "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+        )
+        params: List[Any] = [thread_id, checkpoint_ns]
+        checkpoint_id = get_checkpoint_id(config)
+        if checkpoint_id:
+            query += " AND checkpoint_id = ?"
+            params.append(checkpoint_id)
+        query += " ORDER BY checkpoint_id DESC LIMIT 1"
+        
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+            if row is None:
+                return None
+            writes = self._read_writes(thread_id, checkpoint_ns, row[0])
+        return self._make_tuple(thread_id, checkpoint_ns, row, writes)
+        
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[CheckpointTuple]:
+        """
+        List checkpoints, newest first.
+        
+        Args:
+            config: Config with the thread_id and, optionally, checkpoint_ns
+                and checkpoint_id to list (all threads if None)
+            filter: Metadata values the checkpoints must have
+            before: Only list checkpoints older than this one
+            limit: Maximum number of checkpoints listed
+            
+        Yields:
+            Matching checkpoint tuples
+        """
+        query = (
+            "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata, "
+            "thread_id, checkpoint_ns FROM checkpoints"
+        )
+        conditions = []
+        params: List[Any] = []
+        if config:
+            conditions.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if config["configurable"].get("checkpoint_ns") is not None:
+                conditions.append("checkpoint_ns = ?")
+                params.append(config["configurable"]["checkpoint_ns"])
+            if get_checkpoint_id(config):
+                conditions.append("checkpoint_id = ?")
+                params.append(get_checkpoint_id(config))
+        if before and get_checkpoint_id(before):
+            conditions.append("checkpoint_id < ?")
+            params.append(get_checkpoint_id(before))
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY checkpoint_id DESC"
+        
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+            
+        for row in rows:
+            if limit is not None and limit <= 0:
+                break
+            metadata = self._loads(row[4], row[5])
+            if filter and not all(metadata.get(key) == value for key, value in filter.items()):
+                continue
+            if limit is not None:
+                limit -= 1
+                
+            thread_id, checkpoint_ns = row[6], row[7]
+            with self._lock:
+                writes = self._read_writes(thread_id, checkpoint_ns, row[0])
+            yield self._make_tuple(thread_id, checkpoint_ns, row[:6], writes, metadata)
+            
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        """
+        Save a checkpoint of a thread.
+        
+        Args:
+            config: Config of the parent checkpoint
+            checkpoint: The checkpoint, with every channel's value
+            metadata: Metadata of the checkpoint
+            new_versions: Channel versions changed by this checkpoint
+            
+        Returns:
+            Config pointing at the saved checkpoint
+        """
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        type_, data = self._dumps(checkpoint)
+        metadata_type, metadata_data = self._dumps(get_checkpoint_metadata(config, metadata))
+        
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints "
+                    "(thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+                    "metadata_type, metadata, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                        type_, data, metadata_type, metadata_data, time.time()
+                    )
+                )
+                self._conn.commit()
+            except Exception as e:
+                logger.error(f"Error saving checkpoint for thread {thread_id}: {e}")
+                raise
+                
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+        
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        """
+        Save the pending writes of a task.
+        
+        Args:
+            config: Config of the checkpoint the writes belong to
+            writes: (channel, value) pairs written by the task
+            task_id: ID of the task
+            task_path: Path of the task
+        """
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        special, regular = [], []
+        for idx, (channel, value) in enumerate(writes):
+            type_, data = self._dumps(value)
+            row = (thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, idx), channel, type_, data, task_path)
+            (special if channel in WRITES_IDX_MAP else regular).append(row)
+            
+        columns = "(thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value, task_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+        with self._lock:
+            try:
+                # Special writes (errors, interrupts) replace earlier ones; regular writes are kept
+                self._conn.executemany(f"INSERT OR REPLACE INTO writes {columns}", special)
+                self._conn.executemany(f"INSERT OR IGNORE INTO writes {columns}", regular)
+                self._conn.commit()
+            except Exception as e:
+                logger.error(f"Error saving writes for thread {thread_id}: {e}")
+                raise
+                
+    def delete_thread(self, thread_id: str) -> None:
+        """
+        Delete every checkpoint and write of a thread.
+        
+        Args:
+            thread_id: ID of the thread
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+            self._conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+            self._conn.commit()
+            
+    def prune(self, thread_ids: Sequence[str], *, strategy: str = "keep_latest") -> None:
+        """
+        Prune the checkpoints of some threads.
+        
+        Args:
+            thread_ids: IDs of the threads
+            strategy: "keep_latest" keeps the latest checkpoint of each
+                namespace; "delete" deletes the threads
+        """
+        for thread_id in thread_ids:
+            if strategy == "delete":
+                self.delete_thread(thread_id)
+            else:
+                with self._lock:
+                    self._delete_older_than_rank(1, thread_id)
+                    self._conn.commit()
+                    
+    def prune_old_checkpoints(self) -> Tuple[int, int]:
+        """
+        Delete threads idle for longer than max_age and all but the last
+        keep_last checkpoints of the others.
+        
+        Returns:
+            Tuple of (threads deleted, checkpoints deleted)
+        """
+        cutoff = time.time() - self.max_age
+        with self._lock:
+            try:
+                idle = [
+                    row[0] for row in self._conn.execute(
+                        "SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(created_at) < ?", (cutoff,)
+                    )
+                ]
+                deleted = 0
+                for thread_id in idle:
+                    deleted += self._conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,)).rowcount
+                    self._conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+                deleted += self._delete_older_than_rank(self.keep_last)
+                self._conn.commit()
+            except Exception as e:
+                logger.error(f"Error pruning checkpoints: {e}")
+                raise
+                
+        if idle or deleted:
+            logger.info(f"Pruned {len(idle)} idle threads and {deleted} old checkpoints")
+        return len(idle), deleted
+        
+    def _delete_older_than_rank(self, keep: int, thread_id: Optional[str] = None) -> int:
+        """
+        Delete all but the newest keep checkpoints of each thread and
+        namespace, and their writes. Caller holds the lock.
+        """
+        where = "WHERE thread_id = ?" if thread_id else ""
+        params: List[Any] = [thread_id] if thread_id else []
+        deleted = self._conn.execute(
+            "DELETE FROM checkpoints WHERE rowid IN ("
+            "SELECT rowid FROM (SELECT rowid, ROW_NUMBER() OVER ("
+            "PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC) AS rank "
+            f"FROM checkpoints {where}) WHERE rank > ?)",
+            params + [keep]
+        ).rowcount
+        if deleted:
+            self._conn.execute(
+                "DELETE FROM writes WHERE NOT EXISTS (SELECT 1 FROM checkpoints c WHERE "
+                "c.thread_id = writes.thread_id AND c.checkpoint_ns = writes.checkpoint_ns "
+                "AND c.checkpoint_id = writes.checkpoint_id)"
+            )
+        return deleted
+        
+    def _prune_periodically(self) -> None:
+        while not self._stop.wait(self.prune_interval):
+            try:
+                self.prune_old_checkpoints()
+            except Exception as e:
+                logger.warning(f"Background checkpoint pruning failed: {e}")
+                
+    def _read_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> List[Tuple]:
+        """
+        Read the pending writes of a checkpoint. Caller holds the lock.
+        """
+        rows = self._conn.execute(
+            "SELECT task_id, channel, type, value, task_path, idx FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            (thread_id, checkpoint_ns, checkpoint_id)
+        ).fetchall()
+        return sorted(rows, key=lambda row: writes_sort_key(row[4], row[0], row[5]))
+        
+    def _make_tuple(
+        self,
+        thread_id: str,
+        checkpoint_ns: str,
+        row: Tuple,
+        writes: List[Tuple],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, type_, data, metadata_type, metadata_data = row
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint=self._loads(type_, data),
+            metadata=metadata if metadata is not None else self._loads(metadata_type, metadata_data),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+            pending_writes=[
+                (task_id, channel, self._loads(value_type, value))
+                for task_id, channel, value_type, value, _, _ in writes
+            ],
+        )
+        
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """
+        Async version of get_tuple; runs the query in a worker thread.
+        """
+        return await asyncio.to_thread(self.get_tuple, config)
+        
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[CheckpointTuple]:
+        """
+        Async version of list; runs the query in a worker thread.
+        """
+        checkpoints = await asyncio.to_thread(
+            lambda: [*self.list(config, filter=filter, before=before, limit=limit)]
+        )
+        for checkpoint in checkpoints:
+            yield checkpoint
+            
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        """
+        Async version of put; runs the write in a worker thread.
+        """
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+        
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        """
+        Async version of put_writes; runs the write in a worker thread.
+        """
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+        
+    async def adelete_thread(self, thread_id: str) -> None:
+        """
+        Async version of delete_thread; runs the delete in a worker thread.
+        """
+        await asyncio.to_thread(self.delete_thread, thread_id)
+        
+    def close(self) -> None:
+        """
+        Stop the background pruner and close the database connection.
+        """
+        self._stop.set()
+        if self._pruner:
+            self._pruner.join()
+        with self._lock:
+            self._conn.close()
+
+_checkpointer: Optional[SQLiteCheckpointer] = None
+_checkpointer_lock = threading.Lock()
+
+def get_checkpointer() -> SQLiteCheckpointer:
+    """
+    Get the process-wide checkpointer, shared by all sessions, creating it on first use.
+    
+    Returns:
+        Shared SQLiteCheckpointer
+    """
+    global _checkpointer
+    with _checkpointer_lock:
+        if _checkpointer is None:
+            _checkpointer = SQLiteCheckpointer()
+        return _checkpointer
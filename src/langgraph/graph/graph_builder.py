@@ -5,19 +5,29 @@ import traceback
 from pathlib import Path
 from langgraph.graph import START, END, StateGraph
 from langgraph.prebuilt import tools_condition, ToolNode
+from langchain_core.runnables import RunnableLambda
 
 from src.langgraph.state.state import State
 from src.langgraph.tools.tools import get_tools, create_tool_node
 from src.langgraph.nodes.doubts_node import ChatbotWithToolNode
+from src.langgraph.nodes.history_node import HistoryNode
 from src.langgraph.nodes.retriever.retriever_node import RetrieverNode
+from src.langgraph.document_processing.context_packer import get_token_budget
+from src.langgraph.graph.checkpointer import get_checkpointer
 from src.langgraph.tracing.langsmith import init_langsmith
 
 logger = logging.getLogger(__name__)
 
 class GraphBuilder:
-    def __init__(self, model, project_name="school-tutor-agent"):
+    def __init__(
+        self,
+        model,
+        project_name="school-tutor-agent",
+        persist_conversations: bool = os.getenv("CHECKPOINTER", "true").lower() == "true"
+    ):
         self.llm = model
         self.project_name = project_name
+        self.persist_conversations = persist_conversations
         
         # Initialize LangSmith for tracing
         self.langsmith_client = init_langsmith(project_name=project_name)
@@ -42,20 +52,30 @@ class GraphBuilder:
         ## Define the LLM
         llm=self.llm
         
+        ## Define the history node, which keeps the conversation to its recent turns
+        history_node = HistoryNode(model=llm)
+        
         ## Define the retriever node
-        retriever_node = RetrieverNode()
-
+        retriever_node = RetrieverNode(token_budget=get_token_budget(getattr(llm, "model_name", None)))
+        
         ## Define the chatbot node
         obj_chatbot_with_node = ChatbotWithToolNode(llm)
         chatbot_with_tool_node=obj_chatbot_with_node.create_chatbot(tools)
         
-        ## Add nodes
-        self.graph_builder.add_node("retriever", retriever_node)
+        ## Add nodes; the history, retriever and chatbot nodes have async
+        ## variants that are used when the graph runs with ainvoke or astream
+        self.graph_builder.add_node(
+            "history", RunnableLambda(history_node, afunc=history_node.ainvoke, name="history")
+        )
+        self.graph_builder.add_node(
+            "retriever", RunnableLambda(retriever_node, afunc=retriever_node.ainvoke, name="retriever")
+        )
         self.graph_builder.add_node("chatbot", chatbot_with_tool_node)
         self.graph_builder.add_node("tools", tool_node)
         
-        # Define graph flow with retrieval
-        self.graph_builder.add_edge(START, "retriever")
+        # Define graph flow with history trimming and retrieval
+        self.graph_builder.add_edge(START, "history")
+        self.graph_builder.add_edge("history", "retriever")
         self.graph_builder.add_edge("retriever", "chatbot")
         self.graph_builder.add_conditional_edges("chatbot", tools_condition)
         self.graph_builder.add_edge("tools", "chatbot")
@@ -68,7 +88,9 @@ class GraphBuilder:
             usecase: The selected use case ("Revise Topics", etc.)
             
         Returns:
-            Compiled graph
+            Compiled graph; with persist_conversations it must be run with a
+            thread_id in config["configurable"], under which each
+            conversation is checkpointed
         """
         if usecase == "Revise Topics":
             self.chatbot_with_tools_build_graph()
@@ -76,18 +98,21 @@ class GraphBuilder:
         # Generate and save graph visualization (best effort)
         self.save_graph_image(usecase)
         
+        # Conversations are checkpointed per thread_id, so the tutor remembers earlier turns
+        checkpointer = get_checkpointer() if self.persist_conversations else None
+        
         # Compile with tracing if LangSmith is available
         if os.getenv("LANGSMITH_API_KEY"):
             # Enable tracing
             logger.info("Compiling graph with LangSmith tracing enabled")
             return self.graph_builder.compile(
                 name=f"Tutor-{usecase.replace(' ', '-')}",
-                checkpointer=None  # You can add a checkpointer here if needed
+                checkpointer=checkpointer
             )
         else:
             # Compile without tracing
             logger.warning("Compiling graph without LangSmith tracing")
-            return self.graph_builder.compile()
+            return self.graph_builder.compile(checkpointer=checkpointer)
             
     def save_graph_image(self, usecase: str):
         """
@@ -0,0 +1,348 @@
+"""
+Answer cache module for reusing tutor answers across students.
+"""
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from src.langgraph.document_processing.query_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+class AnswerCache:
+    """
+    A persistent cache of LLM answers keyed on model, context and question.
+    
+    The key is the model name, a hash of the system message the retriever
+    built (so the same retrieved context) and the normalized question.
+    Entries live in SQLite with a per-entry expiry and are fronted by an
+    in-memory LRU of the most recently used answers. With a similarity
+    threshold, a question that misses the exact key is embedded and
+    compared with the cached questions that had the same model and
+    context, so paraphrases of a question about the same passage share an
+    answer.
+    """
+    
+    def __init__(
+        self,
+        db_path: str = os.getenv("ANSWER_CACHE_PATH", "data/answer_cache.db"),
+        ttl: float = float(os.getenv("ANSWER_CACHE_TTL", "86400")),
+        memory_entries: int = int(os.getenv("ANSWER_CACHE_MEMORY_ENTRIES", "512")),
+        max_entries: int = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "100000")),
+        similarity_threshold: float = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0")),
+        embedder: Optional[Any] = None
+    ):
+        """
+        Initialize the answer cache.
+        
+        Args:
+            db_path: Path to the SQLite database file
+            ttl: Default seconds an answer stays valid
+            memory_entries: Answers kept in the in-memory LRU
+            max_entries: Answers kept in SQLite; the least recently used
+                are pruned beyond this
+            similarity_threshold: Minimum cosine similarity between
+                questions for a semantic hit (0 disables the semantic tier)
+            embedder: EmbeddingModel for the semantic tier (created lazily
+                if not given)
+        """
+        self.db_path = db_path
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.embedder = embedder
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._puts = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS answers (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                context_hash TEXT NOT NULL,
+                question TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                vector BLOB,
+                vector_model TEXT,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS answers_by_context ON answers (model, context_hash);
+            CREATE INDEX IF NOT EXISTS answers_by_use ON answers (last_used);
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(answers)")}
+        if "vector_model" not in columns:
+            # Vectors cached before the embedding model was recorded are never matched
+            self._conn.execute("ALTER TABLE answers ADD COLUMN vector_model TEXT")
+            self._conn.commit()
+            
+    @staticmethod
+    def make_key(model_name: str, system_message: str, question: str) -> Tuple[str, str]:
+        """
+        Compute the cache key of a question.
+        
+        Args:
+            model_name: Name of the chat model
+            system_message: System message with the retrieved context
+            question: The user's question
+            
+        Returns:
+            Tuple of (key, context hash)
+        """
+        context_hash = hashlib.sha256(system_message.encode("utf-8")).hexdigest()
+        key = hashlib.sha256(
+            f"{model_name}\0{context_hash}\0{normalize_query(question)}".encode("utf-8")
+        ).hexdigest()
+        return key, context_hash
+        
+    def get_embedder(self):
+        """
+        Get the embedding model of the semantic tier, the process-wide one
+        unless one was given.
+        
+        Returns:
+            EmbeddingModel used for questions
+        """
+        if self.embedder is None:
+            from src.langgraph.document_processing.embedding import get_embedding_model
+            self.embedder = get_embedding_model()
+        return self.embedder
+        
+    def _vector_model(self) -> str:
+        """
+        Name the embedding model of the semantic tier, stored with each
+        vector so vectors of another model (or dimension) are never compared.
+        """
+        embedder = self.get_embedder()
+        return getattr(embedder, "model_name", type(embedder).__name__)
+        
+    def get(self, model_name: str, system_message: str, question: str) -> Optional[str]:
+        """
+        Look up the answer to a question about a retrieved context.
+        
+        Args:
+            model_name: Name of the chat model
+            system_message: System message with the retrieved context
+            question: The user's question
+            
+        Returns:
+            Cached answer, or None on a miss
+        """
+        key, context_hash = self.make_key(model_name, system_message, question)
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None and cached[1] > now:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return cached[0]
+                
+            row = self._conn.execute(
+                "SELECT answer, expires_at FROM answers WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE answers SET last_used = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+                self._remember(key, row[0], row[1])
+                self.disk_hits += 1
+                return row[0]
+                
+        if self.similarity_threshold > 0:
+            answer = self._get_similar(model_name, context_hash, question, now)
+            if answer is not None:
+                return answer
+                
+        with self._lock:
+            self.misses += 1
+        return None
+        
+    def _get_similar(self, model_name: str, context_hash: str, question: str, now: float) -> Optional[str]:
+        """
+        Find the answer of the most similar cached question about the same context.
+        """
+        try:
+            vector_model = self._vector_model()
+        except Exception as e:
+            logger.warning(f"Error loading the answer cache embedder: {e}")
+            return None
+            
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, answer, expires_at, vector FROM answers "
+                "WHERE model = ? AND context_hash = ? AND expires_at > ? AND vector_model = ? "
+                "ORDER BY last_used DESC LIMIT 256",
+                (model_name, context_hash, now, vector_model)
+            ).fetchall()
+        if not rows:
+            return None
+            
+        try:
+            vector = self._embed(question)
+            # A vector of another size can only be a stale or damaged row; treat it as a miss
+            rows = [row for row in rows if len(row[3]) == vector.nbytes]
+            if not rows:
+                return None
+            vectors = np.stack([np.frombuffer(row[3], dtype=np.float32) for row in rows])
+            scores = vectors @ vector
+        except Exception as e:
+            logger.warning(f"Error comparing question with the answer cache: {e}")
+            return None
+            
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+            
+        key, answer, expires_at, _ = rows[best]
+        with self._lock:
+            self._conn.execute("UPDATE answers SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.semantic_hits += 1
+        return answer
+        
+    def put(
+        self,
+        model_name: str,
+        system_message: str,
+        question: str,
+        answer: str,
+        ttl: Optional[float] = None
+    ) -> None:
+        """
+        Cache the answer to a question about a retrieved context.
+        
+        Args:
+            model_name: Name of the chat model
+            system_message: System message with the retrieved context
+            question: The user's question
+            answer: The model's answer
+            ttl: Seconds the answer stays valid (defaults to the cache's ttl)
+        """
+        key, context_hash = self.make_key(model_name, system_message, question)
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        
+        vector, vector_model = None, None
+        if self.similarity_threshold > 0:
+            try:
+                vector = self._embed(question).tobytes()
+                vector_model = self._vector_model()
+            except Exception as e:
+                logger.warning(f"Error embedding question for the answer cache: {e}")
+                
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO answers "
+                    "(key, model, context_hash, question, answer, vector, vector_model, created_at, expires_at, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, model_name, context_hash, question, answer, vector, vector_model, now, expires_at, now)
+                )
+                self._puts += 1
+                if self._puts % 100 == 0:
+                    self._prune(now)
+                self._conn.commit()
+            except Exception as e:
+                logger.error(f"Error writing answer cache: {e}")
+                raise
+            self._remember(key, answer, expires_at)
+            
+    def _embed(self, question: str) -> np.ndarray:
+        vector = np.asarray(self.get_embedder().embed([question], use_cache=False)[0], dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+        
+    def _remember(self, key: str, answer: str, expires_at: float) -> None:
+        """
+        Add an answer to the in-memory LRU. Caller holds the lock.
+        """
+        self._memory[key] = (answer, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            
+    def _prune(self, now: float) -> None:
+        """
+        Delete expired answers and the least recently used beyond
+        max_entries. Caller holds the lock.
+        """
+        expired = self._conn.execute("DELETE FROM answers WHERE expires_at <= ?", (now,)).rowcount
+        excess = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM answers WHERE key IN (SELECT key FROM answers ORDER BY last_used LIMIT ?)", (excess,)
+            )
+        if expired or excess > 0:
+            logger.info(f"Pruned {expired} expired and {max(excess, 0)} least recently used answers")
+            
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the cache's counters.
+        
+        Returns:
+            Dictionary with hits per tier, misses and hit rate
+        """
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits + self.semantic_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
+            
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+_cache: Optional[AnswerCache] = None
+_cache_lock = threading.Lock()
+
+def get_answer_cache() -> AnswerCache:
+    """
+    Get the process-wide answer cache, creating it on first use.
+    
+    Returns:
+        Shared AnswerCache
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AnswerCache()
+        return _cache
+
+def answer_cache_stats() -> Optional[Dict[str, Any]]:
+    """
+    Get the counters of the process-wide answer cache.
+    
+    Returns:
+        Dictionary in the format of AnswerCache.stats, or None if the cache
+        was not created
+    """
+    with _cache_lock:
+        cache = _cache
+    return cache.stats() if cache else None
@@ -1,6 +1,11 @@
+import os
+import asyncio
 import logging
+from typing import Optional, Tuple
 from src.langgraph.state.state import State
+from src.langgraph.llm.answer_cache import AnswerCache, get_answer_cache
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+from langchain_core.runnables import RunnableLambda, RunnableConfig
 
 logger = logging.getLogger(__name__)
 
@@ -8,40 +13,159 @@ class ChatbotWithToolNode:
     """
     Chatbot logic enhanced with tool integration and RAG context.
     """
-    def __init__(self, model):
+    def __init__(
+        self,
+        model,
+        cache_answers: bool = os.getenv("ANSWER_CACHE", "true").lower() == "true",
+        answer_cache: Optional[AnswerCache] = None
+    ):
+        """
+        Initialize the chatbot node.
+        
+        Args:
+            model: Chat model that answers the question
+            cache_answers: Whether to reuse answers to the same question
+                about the same retrieved context, shared by all sessions
+            answer_cache: AnswerCache used when cache_answers is set
+                (the process-wide cache if not given)
+        """
         self.llm = model
-
+        self.model_name = getattr(model, "model_name", None) or getattr(model, "model", None) or type(model).__name__
+        self.answer_cache = (answer_cache or get_answer_cache()) if cache_answers else None
+        
+    def cache_key(self, state: State) -> Optional[Tuple[str, str, str]]:
+        """
+        Get what an answer to the state is cached under, if it can be cached.
+        
+        Answers are only cached for the first question of a conversation,
+        asked right after retrieval (not after a tool call) with a retrieved
+        context. Later questions are sent with the earlier turns or their
+        summary, which the key does not cover, so they bypass the cache.
+        
+        Args:
+            state: Current graph state
+            
+        Returns:
+            Tuple of (model name, system message, question), or None to
+            bypass the cache
+        """
+        system_msg = state.get("system_message")
+        messages = state["messages"]
+        if not self.answer_cache or not system_msg or not messages or not isinstance(messages[-1], HumanMessage):
+            return None
+            
+        question = messages[-1].content
+        if not isinstance(question, str):
+            return None
+        if state.get("summary") or any(isinstance(msg, (HumanMessage, AIMessage)) for msg in messages[:-1]):
+            logger.info("Question follows earlier turns, bypassing the answer cache")
+            return None
+        return self.model_name, system_msg, question
+        
     def create_chatbot(self, tools):
         """
-        Returns a chatbot node function that incorporates retrieved context.
+        Returns a chatbot node that incorporates retrieved context.
+        The node runs the LLM with invoke when the graph is invoked and with
+        ainvoke when the graph runs with ainvoke or astream. The run config is
+        passed on to the LLM, so astream(stream_mode="messages") yields the
+        answer token by token. A cached answer is returned as a whole
+        AIMessage without calling the LLM.
         """
         llm_with_tools = self.llm.bind_tools(tools)
 
-        def chatbot_node(state: State):
+        def prompt_messages(state: State):
+            """
+            Put the system_message from state, if any, before the conversation,
+            followed by the summary of turns trimmed from the conversation.
+            """
+            # Check if we have a system message with context
+            system_msg = state.get("system_message")
+            if state.get("summary"):
+                system_msg = (system_msg or "You are a helpful AI tutor.") + (
+                    "\n\nSummary of the earlier conversation:\n" + state["summary"]
+                )
+            if system_msg:
+                # Create a new messages list with system message first
+                messages_with_context = [SystemMessage(content=system_msg)]
+                
+                # Add all non-system messages from the original messages
+                for msg in state["messages"]:
+                    if not isinstance(msg, SystemMessage):
+                        messages_with_context.append(msg)
+                        
+                logger.info("Added context from retriever to LLM prompt")
+                return messages_with_context
+            else:
+                logger.warning("No system_message found in state, proceeding without context")
+                return state["messages"]
+                
+        def cached_answer(key):
+            """
+            Look up a cached answer, treating cache errors as misses.
+            """
+            try:
+                answer = self.answer_cache.get(*key)
+            except Exception as e:
+                logger.warning(f"Error reading answer cache: {e}")
+                return None
+            if answer is None:
+                return None
+            logger.info("Answered from the answer cache")
+            return {"messages": [AIMessage(content=answer, response_metadata={"answer_cache": "hit"})]}
+            
+        def cache_answer(key, response):
+            """
+            Cache a final answer; tool calls depend on the tools' results and are not cached.
+            """
+            if getattr(response, "tool_calls", None) or not isinstance(response.content, str) or not response.content:
+                return
+            try:
+                self.answer_cache.put(*key, response.content)
+            except Exception as e:
+                logger.warning(f"Error writing answer cache: {e}")
+                
+        def chatbot_node(state: State, config: RunnableConfig):
             """
             Chatbot logic for processing the input state and returning a response.
             Uses system_message from state if available to provide context to the LLM.
             """
+            key = self.cache_key(state)
+            if key:
+                cached = cached_answer(key)
+                if cached:
+                    return cached
+                    
             try:
-                # Check if we have a system message with context
-                system_msg = state.get("system_message")
-                if system_msg:
-                    # Create a new messages list with system message first
-                    messages_with_context = [SystemMessage(content=system_msg)]
+                response = llm_with_tools.invoke(prompt_messages(state), config)
+            except Exception as e:
+                logger.error(f"Error in chatbot node: {e}")
+                # Fallback to original behavior on error
+                return {"messages": [llm_with_tools.invoke(state["messages"], config)]}
+                
+            if key:
+                cache_answer(key, response)
+            return {"messages": [response]}
+            
+        async def achatbot_node(state: State, config: RunnableConfig):
+            """
+            Async chatbot logic; awaits the LLM instead of blocking a thread.
+            """
+            key = self.cache_key(state)
+            if key:
+                # SQLite reads and question embeddings block
+                cached = await asyncio.to_thread(cached_answer, key)
+                if cached:
+                    return cached
                     
-                    # Add all non-system messages from the original messages
-                    for msg in state["messages"]:
-                        if not isinstance(msg, SystemMessage):
-                            messages_with_context.append(msg)
-                            
-                    logger.info("Added context from retriever to LLM prompt")
-                    return {"messages": [llm_with_tools.invoke(messages_with_context)]}
-                else:
-                    logger.warning("No system_message found in state, proceeding without context")
-                    return {"messages": [llm_with_tools.invoke(state["messages"])]}
+            try:
+                response = await llm_with_tools.ainvoke(prompt_messages(state), config)
             except Exception as e:
                 logger.error(f"Error in chatbot node: {e}")
                 # Fallback to original behavior on error
-                return {"messages": [llm_with_tools.invoke(state["messages"])]}
-
-        return chatbot_node
+                return {"messages": [await llm_with_tools.ainvoke(state["messages"], config)]}
+                
+            if key:
+                await asyncio.to_thread(cache_answer, key, response)
+            return {"messages": [response]}
+            
+        return RunnableLambda(chatbot_node, afunc=achatbot_node, name="chatbot")
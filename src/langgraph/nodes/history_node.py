@@ -0,0 +1,125 @@
+"""
+History node for LangGraph to keep the conversation sent to the LLM bounded.
+"""
+import os
+import logging
+from typing import Dict, Any, List, Optional
+from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, RemoveMessage
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = (
+    "Summarize this conversation between a student and their tutor in a few sentences. "
+    "Keep the topics covered and any facts, definitions or examples the student may refer back to."
+)
+
+class HistoryNode:
+    """
+    A node that trims the conversation to its most recent turns.
+    
+    A turn starts at a user message, so an AI message asking for a tool is
+    never separated from the tool's result. Once the conversation has more
+    than max_turns turns, all but the last window_turns are removed from the
+    state (and so from the checkpoint). Trimming in batches means that,
+    with summarize set, the removed turns are folded into a running summary
+    with one LLM call every max_turns - window_turns turns rather than on
+    every turn.
+    """
+    
+    def __init__(
+        self,
+        model: Optional[Any] = None,
+        window_turns: int = int(os.getenv("HISTORY_WINDOW_TURNS", "4")),
+        max_turns: int = int(os.getenv("HISTORY_MAX_TURNS", "8")),
+        summarize: bool = os.getenv("HISTORY_SUMMARY", "false").lower() == "true"
+    ):
+        """
+        Initialize the history node.
+        
+        Args:
+            model: Chat model that writes the summary
+            window_turns: Turns kept after trimming
+            max_turns: Turns at which the conversation is trimmed
+            summarize: Whether to summarize the removed turns instead of
+                dropping them
+        """
+        self.model = model
+        self.window_turns = max(1, window_turns)
+        self.max_turns = max(self.window_turns, max_turns)
+        self.summarize = summarize and model is not None
+        
+    def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Trim the conversation if it has grown past max_turns.
+        
+        Args:
+            state: The current state with messages
+            
+        Returns:
+            Update removing the old messages and, with summarize, the new
+            summary; empty if the conversation is short enough
+        """
+        removed = self._removed_messages(state)
+        if not removed:
+            return {}
+            
+        update = {"messages": [RemoveMessage(id=message.id) for message in removed]}
+        if self.summarize:
+            try:
+                response = self.model.invoke(self._summary_prompt(state.get("summary"), removed))
+                update["summary"] = response.content
+            except Exception as e:
+                # The window alone still bounds the prompt
+                logger.warning(f"Error summarizing conversation history: {e}")
+        return update
+        
+    async def ainvoke(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async version of __call__; awaits the summary instead of blocking a thread.
+        
+        Args:
+            state: The current state with messages
+            
+        Returns:
+            Update removing the old messages and, with summarize, the new
+            summary; empty if the conversation is short enough
+        """
+        removed = self._removed_messages(state)
+        if not removed:
+            return {}
+            
+        update = {"messages": [RemoveMessage(id=message.id) for message in removed]}
+        if self.summarize:
+            try:
+                response = await self.model.ainvoke(self._summary_prompt(state.get("summary"), removed))
+                update["summary"] = response.content
+            except Exception as e:
+                # The window alone still bounds the prompt
+                logger.warning(f"Error summarizing conversation history: {e}")
+        return update
+        
+    def _removed_messages(self, state: Dict[str, Any]) -> List[Any]:
+        """
+        Get the messages before the last window_turns turns, if the
+        conversation has more than max_turns.
+        """
+        messages = state.get("messages", [])
+        turn_starts = [i for i, message in enumerate(messages) if isinstance(message, HumanMessage)]
+        if len(turn_starts) <= self.max_turns:
+            return []
+            
+        removed = messages[:turn_starts[-self.window_turns]]
+        logger.info(f"Trimming {len(turn_starts) - self.window_turns} turns ({len(removed)} messages) from the conversation")
+        return removed
+        
+    @staticmethod
+    def _summary_prompt(summary: Optional[str], removed: List[Any]) -> List[Any]:
+        """
+        Build the prompt that folds the removed turns into the running summary.
+        """
+        lines = [f"Summary so far: {summary}"] if summary else []
+        for message in removed:
+            if isinstance(message, (HumanMessage, AIMessage)) and isinstance(message.content, str) and message.content:
+                speaker = "Student" if isinstance(message, HumanMessage) else "Tutor"
+                lines.append(f"{speaker}: {message.content}")
+        return [SystemMessage(content=SUMMARY_PROMPT), HumanMessage(content="\n\n".join(lines))]
@@ -1,26 +1,34 @@
 """
 Retriever node for LangGraph to retrieve relevant documents from the vector store.
 """
-import logging
 import os
+import time
+import asyncio
+import logging
 from typing import Dict, Any, List, Optional, Callable
 from langchain_core.messages import HumanMessage
 
 from src.langgraph.document_processing.document_processor import DocumentProcessor
-from src.langgraph.document_processing.vector_store import WeaviateVectorStore
+from src.langgraph.document_processing.context_packer import ContextPacker, estimate_tokens, get_token_budget
+from src.langgraph.document_processing.context_compressor import ContextCompressor
+from src.langgraph.document_processing.query_cache import QueryCache, get_query_cache
+from src.langgraph.document_processing.vector_store import VectorStore, get_vector_store
+from src.langgraph.tracing.metrics import record_latency
 
 logger = logging.getLogger(__name__)
 
 class CustomRetriever:
     """
-    A custom retriever for the Weaviate vector store.
+    A custom retriever for the configured vector store.
     This doesn't inherit from BaseRetriever to avoid Pydantic issues.
     """
     
     def __init__(
         self,
         document_processor: DocumentProcessor,
-        limit: int = 5
+        limit: int = 5,
+        cache: Optional[QueryCache] = None,
+        query_embedder: Optional[Any] = None
     ):
         """
         Initialize the retriever.
@@ -28,10 +36,16 @@ class CustomRetriever:
         Args:
             document_processor: Document processor with vector store
             limit: Maximum number of results to retrieve
+            cache: QueryCache consulted before searching
+            query_embedder: MicroBatchEmbedder whose query embeddings feed
+                the cache's approximate level (exact matches only if None)
+                and are reused by the search on a cache miss
         """
         self.document_processor = document_processor
         self.limit = limit
-    
+        self.cache = cache
+        self.query_embedder = query_embedder
+        
     def get_relevant_documents(self, query: str) -> List[Dict[str, Any]]:
         """
         Get documents relevant to a query.
@@ -47,23 +61,101 @@ class CustomRetriever:
             return []
             
         try:
-            # Use the document processor to search, which now has better error handling
+            start = time.perf_counter()
+            version, vector = None, None
+            if self.cache is not None:
+                version = self.document_processor.vector_store.index_state.version
+                docs = self.cache.get(query, self.limit, version)
+                if docs is None and self.query_embedder is not None:
+                    # Only embed the question when it is not cached verbatim
+                    try:
+                        vector = self.query_embedder.embed_query(query)
+                        docs = self.cache.get_similar(query, vector, self.limit, version)
+                    except Exception as e:
+                        logger.warning(f"Error embedding query for the cache: {e}")
+                if docs is not None:
+                    self._observe(start, hit=True)
+                    return docs
+                    
+            # Use the document processor to search, which now has better error handling;
+            # a query embedded for the cache is not embedded again
             docs = self.document_processor.search_documents(
                 query=query,
-                limit=self.limit
+                limit=self.limit,
+                vector=vector
             )
             
             if not docs:
                 logger.info(f"No documents found for query: {query[:50]}...")
+            elif self.cache is not None:
+                self.cache.put(query, self.limit, version, docs, vector)
+            if self.cache is not None:
+                self._observe(start, hit=False)
                 
             return docs
             
         except Exception as e:
             logger.error(f"Error in retriever: {e}")
             return []
+            
+    async def aget_relevant_documents(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Get documents relevant to a query without blocking the event loop.
         
-
-
+        Args:
+            query: The query to search for
+            
+        Returns:
+            List of relevant documents or empty list if none found or error occurs
+        """
+        if not query:
+            logger.warning("Empty query provided to retriever")
+            return []
+            
+        try:
+            start = time.perf_counter()
+            version, vector = None, None
+            if self.cache is not None:
+                version = self.document_processor.vector_store.index_state.version
+                docs = self.cache.get(query, self.limit, version)
+                if docs is None and self.query_embedder is not None:
+                    # Only embed the question when it is not cached verbatim
+                    try:
+                        vector = await asyncio.wrap_future(self.query_embedder.submit(query))
+                        docs = self.cache.get_similar(query, vector, self.limit, version)
+                    except Exception as e:
+                        logger.warning(f"Error embedding query for the cache: {e}")
+                if docs is not None:
+                    self._observe(start, hit=True)
+                    return docs
+                    
+            # A query embedded for the cache is not embedded again
+            docs = await self.document_processor.asearch_documents(
+                query=query,
+                limit=self.limit,
+                vector=vector
+            )
+            
+            if not docs:
+                logger.info(f"No documents found for query: {query[:50]}...")
+            elif self.cache is not None:
+                self.cache.put(query, self.limit, version, docs, vector)
+            if self.cache is not None:
+                self._observe(start, hit=False)
+                
+            return docs
+            
+        except Exception as e:
+            logger.error(f"Error in retriever: {e}")
+            return []
+            
+    def _observe(self, start: float, hit: bool) -> None:
+        """
+        Record the retrieval latency in the cache and the latency metrics.
+        """
+        elapsed = time.perf_counter() - start
+        self.cache.observe(elapsed, hit)
+        record_latency("retrieval_cache_hit" if hit else "retrieval_search", elapsed)
 
 class RetrieverNode:
     """
@@ -72,8 +164,13 @@ class RetrieverNode:
     
     def __init__(
         self,
-        vector_store: Optional[WeaviateVectorStore] = None,
-        limit: int = 5
+        vector_store: Optional[VectorStore] = None,
+        limit: int = 5,
+        token_budget: Optional[int] = None,
+        packer: Optional[ContextPacker] = None,
+        compress: bool = os.getenv("CONTEXT_COMPRESSION", "false").lower() == "true",
+        compressor: Optional[ContextCompressor] = None,
+        cache_queries: bool = os.getenv("QUERY_CACHE", "true").lower() == "true"
     ):
         """
         Initialize the retriever node.
@@ -81,27 +178,50 @@ class RetrieverNode:
         Args:
             vector_store: Vector store to retrieve from
             limit: Maximum number of results to retrieve
+            token_budget: Maximum context tokens in the system message
+                (defaults to CONTEXT_TOKEN_BUDGET)
+            packer: ContextPacker that fits the retrieved chunks into the
+                token budget (created from token_budget if not given)
+            compress: Whether to keep only the sentences of the packed
+                passages most relevant to the question
+            compressor: ContextCompressor used when compress is set
+                (created with the vector store's embedder if not given)
+            cache_queries: Whether to reuse the results of repeated and
+                similar questions, shared by all sessions on the collection
         """
-        self.vector_store = vector_store or WeaviateVectorStore(
-            host=os.getenv("WEAVIATE_HOST", "localhost"),
-            port=os.getenv("WEAVIATE_PORT", "8080")
-        )
+        self.vector_store = vector_store or get_vector_store()
         
         # Try to initialize connection and schema
         try:
             self.vector_store.connect()
             self.vector_store.setup_schema()
-            logger.info("Successfully connected to Weaviate and set up schema")
+            logger.info("Successfully connected to the vector store and set up schema")
         except Exception as e:
-            logger.warning(f"Initial Weaviate connection failed: {e}. Will retry during first query.")
-        
+            logger.warning(f"Initial vector store connection failed: {e}. Will retry during first query.")
+            
         self.document_processor = DocumentProcessor(vector_store=self.vector_store)
         self.limit = limit
+        
+        cache, query_embedder = None, None
+        if cache_queries:
+            cache = get_query_cache(self.vector_store.index_state)
+            # Only match similar questions when queries are embedded in-process anyway
+            if getattr(self.vector_store, "client_side_vectors", True) and cache.similarity_threshold > 0:
+                query_embedder = self.vector_store.get_query_embedder()
         self.retriever = CustomRetriever(
             document_processor=self.document_processor,
-            limit=limit
+            limit=limit,
+            cache=cache,
+            query_embedder=query_embedder
         )
-        
+        self.packer = packer or ContextPacker(
+            vector_store=self.vector_store,
+            token_budget=token_budget or get_token_budget()
+        )
+        self.compressor = None
+        if compress:
+            self.compressor = compressor or ContextCompressor(embedder=self.vector_store.get_embedder())
+            
     def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Retrieve relevant documents based on the last user message.
@@ -112,76 +232,127 @@ class RetrieverNode:
         Returns:
             Updated state with retrieved context
         """
-        messages = state.get("messages", [])
-        
-        # Get the most recent user message
-        user_message = None
-        for message in reversed(messages):
-            if isinstance(message, HumanMessage):
-                user_message = message.content
-                break
-                
+        user_message = self._latest_user_message(state)
         if not user_message:
-            logger.warning("No user message found in state")
-            state["context"] = []
-            state["system_message"] = "You are a helpful AI tutor. No PDF content has been loaded yet."
-            return state
+            return self._no_user_message(state)
             
         try:
             # Use the retriever to get relevant documents
             retrieved_docs = self.retriever.get_relevant_documents(user_message)
+            passages = self.packer.pack(retrieved_docs)
+            if self.compressor:
+                passages = self.compressor.compress(user_message, passages)
+            return self._add_context(state, user_message, passages)
+        except Exception as e:
+            return self._retrieval_failed(state, e)
             
-            # Format retrieved documents for context
-            formatted_context = []
-            for i, doc in enumerate(retrieved_docs):
-                formatted_doc = {
-                    "content": doc["text"],
-                    "metadata": doc["metadata"],
-                    "relevance_score": 1.0 - doc.get("_distance", 0.0)  # Convert distance to similarity
-                }
-                formatted_context.append(formatted_doc)
-                
-            # Add retrieved context to state
-            state["context"] = formatted_context
-            
-            # Add source information if we have context
-            if formatted_context:
-                sources = [
-                    {
-                        "title": doc["metadata"].get("file_name", "Unknown"),
-                        "page": doc["metadata"].get("page", "Unknown")
-                    }
-                    for doc in formatted_context
-                ]
-                state["sources"] = sources
-                
-                # Create a system message with the context for the LLM
-                context_text = "\n\n".join([doc["content"] for doc in formatted_context])
-                state["system_message"] = (
-                    "You are a helpful AI tutor. Answer the user's question based only on the "
-                    "following context. If you can't answer the question based on the context, "
-                    "say that you don't know.\n\nContext:\n" + context_text
-                )
-                
-                logger.info(f"Retrieved {len(formatted_context)} documents for query: {user_message[:50]}...")
-            else:
-                # No documents found, set appropriate system message
-                state["sources"] = []
-                state["system_message"] = (
-                    "You are a helpful AI tutor. No relevant content was found in the uploaded PDFs "
-                    "for this question. Please inform the user that they might need to upload PDF "
-                    "documents with relevant content or rephrase their question."
-                )
-                logger.warning(f"No documents found for query: {user_message[:50]}...")
-            
-            return state
+    async def ainvoke(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Retrieve relevant documents based on the last user message without
+        blocking the event loop; used when the graph runs with ainvoke or
+        astream.
+        
+        Args:
+            state: The current state with messages
             
+        Returns:
+            Updated state with retrieved context
+        """
+        user_message = self._latest_user_message(state)
+        if not user_message:
+            return self._no_user_message(state)
+            
+        try:
+            retrieved_docs = await self.retriever.aget_relevant_documents(user_message)
+            passages = await self.packer.apack(retrieved_docs)
+            if self.compressor:
+                # Embedding the sentences is CPU-bound
+                passages = await asyncio.to_thread(self.compressor.compress, user_message, passages)
+            return self._add_context(state, user_message, passages)
         except Exception as e:
-            logger.error(f"Error retrieving documents: {e}")
-            # Return empty context with an error message
-            state["context"] = []
+            return self._retrieval_failed(state, e)
+            
+    @staticmethod
+    def _latest_user_message(state: Dict[str, Any]) -> Optional[str]:
+        """
+        Get the content of the most recent user message.
+        """
+        for message in reversed(state.get("messages", [])):
+            if isinstance(message, HumanMessage):
+                return message.content
+        return None
+        
+    @staticmethod
+    def _no_user_message(state: Dict[str, Any]) -> Dict[str, Any]:
+        logger.warning("No user message found in state")
+        state["context"] = []
+        state["sources"] = []
+        state["system_message"] = "You are a helpful AI tutor. No PDF content has been loaded yet."
+        return state
+        
+    @staticmethod
+    def _retrieval_failed(state: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        logger.error(f"Error retrieving documents: {error}")
+        # Return empty context with an error message
+        state["context"] = []
+        state["sources"] = []
+        state["system_message"] = (
+            "You are a helpful AI tutor. There was an error retrieving document context. "
+            "Please inform the user that there might be an issue with the PDF processing system."
+        )
+        return state
+        
+    def _add_context(
+        self,
+        state: Dict[str, Any],
+        user_message: str,
+        passages: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Add packed passages, their sources and the system message to the state.
+        
+        Args:
+            state: The current state with messages
+            user_message: The question the documents were retrieved for
+            passages: Passages built by the context packer
+            
+        Returns:
+            Updated state with retrieved context
+        """
+        # Add retrieved context to state
+        state["context"] = passages
+        
+        # Add source information if we have context
+        if passages:
+            sources = [
+                {
+                    "title": doc["metadata"].get("file_name", "Unknown"),
+                    "page": doc["metadata"].get("page", "Unknown")
+                }
+                for doc in passages
+            ]
+            state["sources"] = sources
+            
+            # Create a system message with the context for the LLM
+            context_text = "\n\n".join([doc["content"] for doc in passages])
             state["system_message"] = (
-                "You are a helpful AI tutor. There was an error retrieving document context. "
-                "Please inform the user that there might be an issue with the PDF processing system."
+                "You are a helpful AI tutor. Answer the user's question based only on the "
+                "following context. If you can't answer the question based on the context, "
+                "say that you don't know.\n\nContext:\n" + context_text
             )
-            return state
+            
+            logger.info(
+                f"Packed {len(passages)} passages ({estimate_tokens(context_text)} tokens) "
+                f"for query: {user_message[:50]}..."
+            )
+        else:
+            # No documents found, set appropriate system message
+            state["sources"] = []
+            state["system_message"] = (
+                "You are a helpful AI tutor. No relevant content was found in the uploaded PDFs "
+                "for this question. Please inform the user that they might need to upload PDF "
+                "documents with relevant content or rephrase their question."
+            )
+            logger.warning(f"No documents found for query: {user_message[:50]}...")
+            
+        return state
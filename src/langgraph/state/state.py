@@ -13,4 +13,5 @@ class State(TypedDict, total=False):
     messages: Annotated[List, add_messages]
     context: List[Dict[str, Any]]  # Retrieved document context
     system_message: str  # System message with context for the LLM
-    sources: List[Dict[str, Union[str, int]]]  # Source information for retrieved documents
\ No newline at end of file
+    sources: List[Dict[str, Union[str, int]]]  # Source information for retrieved documents
+    summary: str  # Summary of the turns trimmed from messages
\ No newline at end of file
@@ -0,0 +1,148 @@
+"""
+Latency metrics for the tutor's chat pipeline.
+"""
+import time
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, Optional
+
+import numpy as np
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+class LatencyMetric:
+    """
+    A rolling window of latency samples, summarized as percentiles.
+    """
+    
+    def __init__(self, name: str, window: int = 1000):
+        """
+        Initialize the metric.
+        
+        Args:
+            name: Name of the metric
+            window: Number of most recent samples kept
+        """
+        self.name = name
+        self.count = 0
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        
+    def observe(self, seconds: float) -> None:
+        """
+        Record one sample.
+        
+        Args:
+            seconds: Measured latency in seconds
+        """
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+            
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize the recent samples.
+        
+        Returns:
+            Dictionary with the sample count and the last, p50, p95 and p99
+            latencies in milliseconds
+        """
+        with self._lock:
+            samples = list(self._samples)
+            count = self.count
+        if not samples:
+            return {"count": 0}
+            
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1000
+        return {
+            "count": count,
+            "last_ms": round(samples[-1] * 1000, 1),
+            "p50_ms": round(float(p50), 1),
+            "p95_ms": round(float(p95), 1),
+            "p99_ms": round(float(p99), 1),
+        }
+
+_metrics: Dict[str, LatencyMetric] = {}
+_metrics_lock = threading.Lock()
+
+def get_metric(name: str) -> LatencyMetric:
+    """
+    Get a process-wide latency metric, creating it on first use.
+    
+    Args:
+        name: Name of the metric, e.g. "time_to_first_token"
+        
+    Returns:
+        LatencyMetric shared by all sessions
+    """
+    with _metrics_lock:
+        if name not in _metrics:
+            _metrics[name] = LatencyMetric(name)
+        return _metrics[name]
+
+def record_latency(name: str, seconds: float) -> None:
+    """
+    Record a latency sample and log it.
+    
+    Args:
+        name: Name of the metric
+        seconds: Measured latency in seconds
+    """
+    get_metric(name).observe(seconds)
+    logger.info(f"{name}: {seconds * 1000:.1f} ms")
+
+def metrics_summary() -> Dict[str, Dict[str, Any]]:
+    """
+    Summarize every recorded metric.
+    
+    Returns:
+        Dictionary of metric name to its summary
+    """
+    with _metrics_lock:
+        metrics = list(_metrics.values())
+    return {metric.name: metric.summary() for metric in metrics}
+
+class Stopwatch:
+    """
+    Measures the stages of one request against a common start time.
+    """
+    
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.marks: Dict[str, float] = {}
+        
+    def mark(self, name: str) -> Optional[float]:
+        """
+        Record the first time a stage is reached as a latency sample.
+        
+        Args:
+            name: Name of the metric; later marks with the same name are
+                ignored
+                
+        Returns:
+            Seconds since the start, or None if the stage was already marked
+        """
+        if name in self.marks:
+            return None
+        elapsed = time.perf_counter() - self.start
+        self.marks[name] = elapsed
+        record_latency(name, elapsed)
+        return elapsed
+
+def display_latency_metrics() -> None:
+    """
+    Display the latency metrics in the Streamlit sidebar.
+    """
+    summary = metrics_summary()
+    if not summary:
+        st.sidebar.info("No questions answered yet")
+        return
+        
+    for name, values in summary.items():
+        if values["count"]:
+            st.sidebar.markdown(
+                f"**{name.replace('_', ' ').capitalize()}**: p50 {values['p50_ms']:.0f} ms, "
+                f"p95 {values['p95_ms']:.0f} ms (last {values['last_ms']:.0f} ms, n={values['count']})"
+            )
@@ -1,6 +1,10 @@
 import streamlit as st
 import json
-from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
+import uuid
+from langchain_core.messages import HumanMessage, AIMessage, AIMessageChunk, ToolMessage
+
+from src.langgraph.utils.async_runner import run_async, iterate_async
+from src.langgraph.tracing.metrics import Stopwatch
 
 class DisplayResultStreamlit:
     def __init__(self,objective, graph,user_message):
@@ -17,7 +21,7 @@ class DisplayResultStreamlit:
         if objective:
             # Prepare state and invoke the graph
             initial_state = {"messages": [user_message]}
-            res = graph.invoke(initial_state)
+            res = run_async(graph.ainvoke(initial_state, thread_config()))
             for message in res['messages']:
                 if type(message) == HumanMessage:
                     with st.chat_message("user"):
@@ -31,6 +35,93 @@ class DisplayResultStreamlit:
                     with st.chat_message("assistant"):
                         st.write(message.content)
 
+def thread_config():
+    """
+    Get the graph config of this session's conversation.
+    
+    The thread ID is created on the session's first turn; the graph's
+    checkpointer keeps the conversation under it, so only the new message
+    is sent with each turn.
+    
+    Returns:
+        Config with the session's thread_id
+    """
+    if "thread_id" not in st.session_state:
+        st.session_state.thread_id = uuid.uuid4().hex
+    return {"configurable": {"thread_id": st.session_state.thread_id}}
+
+def stream_graph_response(graph, initial_state, config=None):
+    """
+    Run the graph and render its answer while it is generated.
+    
+    Sources are shown as soon as the retriever node finishes and tool
+    results as soon as the tools node does; the chatbot's tokens are then
+    written incrementally with st.write_stream. Time to sources, time to
+    first token and total answer time are recorded as latency metrics.
+    
+    Args:
+        graph: Compiled graph
+        initial_state: Input state with the user's message
+        config: Run config, with the thread_id of the conversation
+        
+    Returns:
+        The full answer text
+    """
+    stopwatch = Stopwatch()
+    final_messages = []
+    
+    with st.chat_message("assistant"):
+        sources_placeholder = st.empty()
+        tools_container = st.container()
+        
+        def tokens():
+            # "updates" yields each node's output when it finishes and
+            # "messages" yields LLM tokens while the chatbot node runs
+            stream = graph.astream(initial_state, config, stream_mode=["updates", "messages"])
+            for mode, payload in iterate_async(stream):
+                if mode == "updates":
+                    for node, update in payload.items():
+                        update = update or {}
+                        if node == "retriever":
+                            stopwatch.mark("time_to_sources")
+                            sources = update.get("sources") or []
+                            if sources:
+                                sources_placeholder.caption(
+                                    "Sources: " + ", ".join(f"{source['title']} (p. {source['page']})" for source in sources)
+                                )
+                        elif node == "tools":
+                            with tools_container:
+                                for message in update.get("messages", []):
+                                    st.write("Tool Call:")
+                                    st.write(message.content)
+                        elif node == "chatbot":
+                            final_messages.extend(update.get("messages", []))
+                elif mode == "messages":
+                    chunk, metadata = payload
+                    if (
+                        metadata.get("langgraph_node") == "chatbot"
+                        and isinstance(chunk, AIMessageChunk)
+                        and isinstance(chunk.content, str)
+                        and chunk.content
+                    ):
+                        stopwatch.mark("time_to_first_token")
+                        yield chunk.content
+                        
+        answer = st.write_stream(tokens())
+        
+        # Models that don't stream hand over the whole answer at the end
+        if not answer:
+            answer = "\n\n".join(
+                message.content for message in final_messages
+                if isinstance(message, AIMessage) and message.content
+            )
+            if answer:
+                stopwatch.mark("time_to_first_token")
+                st.write(answer)
+                
+    stopwatch.mark("answer_total")
+    return answer if isinstance(answer, str) else "".join(str(part) for part in answer)
+
 def render_chat_ui(objective):
     """Render the main chat interface."""
     # st.subheader("Chat with your AI Tutor")
@@ -151,35 +242,26 @@ def render_chat_ui(objective):
             # Create HumanMessage for the graph
             user_message = HumanMessage(content=prompt)
             
-            # Set up initial state and invoke the graph
+            # Set up initial state and stream the graph
             try:
                 initial_state = {"messages": [user_message]}
-                # The compiled graph has the invoke method, not the GraphBuilder object
-                res = st.session_state.graph_builder.invoke(initial_state)
+                # The compiled graph has the astream method, not the GraphBuilder object.
+                # It runs on the shared event loop, so retrieval and LLM calls of all
+                # sessions are awaited there instead of each blocking on its own I/O.
+                # Earlier turns come from the checkpoint of this session's thread.
+                answer = stream_graph_response(st.session_state.graph_builder, initial_state, thread_config())
                 
-                # Process the response messages
-                for message in res.get('messages', []):
-                    if isinstance(message, HumanMessage):
-                        # Skip displaying the user message again
-                        continue
-                    elif isinstance(message, ToolMessage):
-                        with st.chat_message("tool"):
-                            st.write("Tool Call:")
-                            st.write(message.content)
-                    elif isinstance(message, AIMessage) and message.content:
-                        with st.chat_message("assistant"):
-                            st.write(message.content)
-                            
-                        # Add assistant response to chat history
-                        st.session_state.messages.append({
-                            "role": "assistant", 
-                            "content": message.content
-                        })
+                if answer:
+                    # Add assistant response to chat history
+                    st.session_state.messages.append({
+                        "role": "assistant", 
+                        "content": answer
+                    })
             except Exception as e:
                 st.error(f"Error processing your request: {str(e)}")
                 # Add error message to chat history
                 error_message = f"I encountered an error: {str(e)}"
-                if "invoke" in str(e):
+                if "invoke" in str(e) or "astream" in str(e):
                     error_message += "\nThe graph may not be properly compiled. Please reload the application."
                     # Reset the graph builder so it can be rebuilt on next run
                     st.session_state.graph_builder = None
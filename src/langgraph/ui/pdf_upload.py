@@ -2,10 +2,49 @@
 PDF Upload UI component for the Streamlit application.
 """
 import os
+import uuid
 import streamlit as st
 
+from src.langgraph.document_processing.corpus_manifest import CorpusManifest
 from src.langgraph.document_processing.document_processor import DocumentProcessor
-from src.langgraph.document_processing.vector_store import WeaviateVectorStore
+from src.langgraph.document_processing.vector_store import get_vector_store
+
+@st.cache_resource
+def get_document_processor() -> DocumentProcessor:
+    """
+    Create the document processor, its vector store and the corpus manifest
+    once per server process rather than on every rerun.
+    
+    Returns:
+        DocumentProcessor shared by all sessions
+    """
+    return DocumentProcessor(vector_store=get_vector_store(), manifest=CorpusManifest())
+
+def get_uploader_id() -> str:
+    """
+    Identify the uploader across reruns and page reloads, so their uploads can
+    be reference counted and removed again.
+    
+    Signed-in users (Streamlit authentication) are identified by their email.
+    Anonymous users get a random ID kept in the page URL (?uploader=...), so a
+    reload or a bookmarked link keeps the same uploads; the files of uploaders
+    not seen for UPLOADER_MAX_IDLE_DAYS can be removed from the maintenance panel.
+    
+    Returns:
+        Identifier of the uploader
+    """
+    if "uploader_id" not in st.session_state:
+        user = getattr(st, "user", None)
+        if user is not None and user.get("is_logged_in") and user.get("email"):
+            uploader = f"user:{user.get('email')}"
+        else:
+            uploader = st.query_params.get("uploader") or uuid.uuid4().hex
+            st.query_params["uploader"] = uploader
+            
+        st.session_state.uploader_id = uploader
+        get_document_processor().manifest.touch(uploader)
+        
+    return st.session_state.uploader_id
 
 def render_pdf_upload_ui():
     """
@@ -13,12 +52,10 @@ def render_pdf_upload_ui():
     """
     st.subheader("Upload Study Materials")
     
-    # Create document processor
-    vector_store = WeaviateVectorStore(
-        host=os.getenv("WEAVIATE_HOST", "localhost"),
-        port=os.getenv("WEAVIATE_PORT", "8080")
-    )
-    doc_processor = DocumentProcessor(vector_store=vector_store)
+    doc_processor = get_document_processor()
+    vector_store = doc_processor.vector_store
+    
+    uploader_id = get_uploader_id()
     
     # Upload multiple files
     uploaded_files = st.file_uploader(
@@ -33,6 +70,11 @@ def render_pdf_upload_ui():
         if "processed_docs" not in st.session_state:
             st.session_state.processed_docs = []
             
+        incremental = st.checkbox(
+            "Update earlier uploads with the same file name (re-index changed pages only)",
+            key="incremental_reingest"
+        )
+        
         # Process button
         if st.button("Process Documents", key="process_docs_btn"):
             progress_bar = st.progress(0)
@@ -44,36 +86,46 @@ def render_pdf_upload_ui():
                 # Ensure the schema exists
                 vector_store.setup_schema()
                 
-                for i, uploaded_file in enumerate(uploaded_files):
-                    try:
-                        # Update progress
-                        progress = (i + 0.5) / len(uploaded_files)
-                        progress_bar.progress(progress)
-                        status_text.text(f"Processing {uploaded_file.name}...")
-                        
-                        # Process file
-                        doc_ids = doc_processor.process_uploaded_pdf(
-                            uploaded_file,
-                            connect_vector_store=False  # Already connected above
-                        )
-                        
-                        # Add to processed documents
-                        st.session_state.processed_docs.append({
-                            "name": uploaded_file.name,
-                            "chunks": len(doc_ids)
-                        })
-                    except Exception as file_error:
-                        st.error(f"Error processing {uploaded_file.name}: {str(file_error)}")
-                        continue
+                def update_progress(completed, total):
+                    progress_bar.progress(completed / total)
+                    status_text.text(f"Processed {completed} of {total} documents...")
                     
-                    # Update progress again
-                    progress = (i + 1) / len(uploaded_files)
-                    progress_bar.progress(progress)
+                status_text.text(f"Processing {len(uploaded_files)} documents...")
                 
+                # Extract and chunk all files in parallel, then store them
+                report = doc_processor.process_many(
+                    uploaded_files,
+                    connect_vector_store=False,  # Already connected above
+                    progress_callback=update_progress,
+                    uploader=uploader_id,
+                    incremental=incremental
+                )
+                
+                # Add to processed documents
+                known_hashes = {doc.get("file_hash") for doc in st.session_state.processed_docs}
+                for result in report["results"]:
+                    if result["file_hash"] and result["file_hash"] in known_hashes:
+                        continue
+                    if incremental:
+                        # The new version replaces the earlier upload of the same file
+                        st.session_state.processed_docs = [
+                            doc for doc in st.session_state.processed_docs
+                            if doc["name"] != result["file_name"]
+                        ]
+                    st.session_state.processed_docs.append({
+                        "name": result["file_name"],
+                        "chunks": len(result["document_ids"]),
+                        "file_hash": result["file_hash"],
+                        "deduplicated": result["deduplicated"]
+                    })
+                    
+                for error in report["errors"]:
+                    st.error(f"Error processing {error['file_name']}: {error['error']}")
+                    
                 # Finalize
                 progress_bar.progress(1.0)
                 status_text.text("Processing complete!")
-                st.success(f"Successfully processed {len(uploaded_files)} documents")
+                st.success(f"Successfully processed {len(report['results'])} documents")
                 
             except Exception as e:
                 st.error(f"Error processing documents: {str(e)}")
@@ -82,17 +134,26 @@ def render_pdf_upload_ui():
     if "processed_docs" in st.session_state and st.session_state.processed_docs:
         st.subheader("Processed Documents")
         
-        for doc in st.session_state.processed_docs:
-            st.write(f"📄 {doc['name']} - {doc['chunks']} chunks")
+        for doc in list(st.session_state.processed_docs):
+            name_col, remove_col = st.columns([5, 1])
+            reused = " (already in library)" if doc.get("deduplicated") else ""
+            name_col.write(f"📄 {doc['name']} - {doc['chunks']} chunks{reused}")
             
+            if doc.get("file_hash") and remove_col.button("Remove", key=f"remove_doc_{doc['file_hash']}"):
+                try:
+                    deleted = doc_processor.remove_file(doc["file_hash"], uploader=uploader_id)
+                    st.session_state.processed_docs.remove(doc)
+                    st.success(f"Removed {doc['name']} ({deleted} unshared chunks deleted)")
+                except Exception as e:
+                    st.error(f"Error removing {doc['name']}: {str(e)}")
+                    
         if st.button("Clear All Documents", key="clear_docs_btn"):
-            # Clear from vector store
+            # Release this session's files; chunks other sessions share stay stored
             try:
                 vector_store.connect()
-                # Delete all documents (no filter means all)
-                vector_store.delete_by_filter({})
+                deleted = doc_processor.remove_uploader(uploader_id)
                 st.session_state.processed_docs = []
-                st.success("All documents cleared from the database")
+                st.success(f"All your documents were removed ({deleted} unshared chunks deleted)")
             except Exception as e:
                 st.error(f"Error clearing documents: {str(e)}")
     
@@ -101,10 +162,21 @@ def render_pdf_upload_ui():
         if st.button("Check Connection", key="check_connection_btn"):
             try:
                 vector_store.connect()
-                if vector_store.client.is_ready():
-                    st.success("Successfully connected to Weaviate")
+                if vector_store.is_ready():
+                    st.success(f"Successfully connected to the {type(vector_store).__name__}")
                 else:
-                    st.error("Weaviate is not ready")
+                    st.error("The vector store is not ready")
+            except Exception as e:
+                st.error(f"Error connecting to the vector store: {str(e)}")
+                st.info("Make sure Weaviate is running in Docker, or set VECTOR_STORE=numpy")
+                
+    with st.expander("Library Maintenance"):
+        max_idle_days = float(os.getenv("UPLOADER_MAX_IDLE_DAYS", "90"))
+        st.caption("Uploads stay in the shared library until every uploader has removed them.")
+        if st.button(f"Remove uploads of students not seen for {max_idle_days:g} days", key="remove_idle_btn"):
+            try:
+                vector_store.connect()
+                deleted = doc_processor.remove_idle_uploaders(max_idle_days * 86400)
+                st.success(f"Removed idle uploads ({deleted} unshared chunks deleted)")
             except Exception as e:
-                st.error(f"Error connecting to Weaviate: {str(e)}")
-                st.info("Make sure Weaviate is running in Docker")
+                st.error(f"Error removing idle uploads: {str(e)}")
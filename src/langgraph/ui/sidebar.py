@@ -1,5 +1,9 @@
 import streamlit as st
 
+from src.langgraph.tracing.metrics import display_latency_metrics
+from src.langgraph.document_processing.query_cache import query_cache_stats
+from src.langgraph.llm.answer_cache import answer_cache_stats
+
 def render_sidebar(config):
     """Render the sidebar navigation panel."""
     with st.sidebar:
@@ -56,7 +60,26 @@ def render_sidebar(config):
         if st.checkbox("Show Vector DB Settings", False):
             st.text_input("Weaviate Host", value=st.session_state.get("weaviate_host", "localhost"))
             st.text_input("Weaviate Port", value=st.session_state.get("weaviate_port", "8080"))
-        
+            
+        # Time to sources, time to first token and total answer time
+        if st.checkbox("Show Latency Metrics", False):
+            display_latency_metrics()
+            cache = query_cache_stats()
+            lookups = cache["exact_hits"] + cache["semantic_hits"] + cache["misses"]
+            if lookups:
+                st.markdown(
+                    f"**Retrieval cache**: {cache['hit_rate']:.0%} hit rate "
+                    f"({cache['exact_hits']} exact, {cache['semantic_hits']} similar of {lookups}), "
+                    f"{cache['saved_seconds']:.1f} s saved"
+                )
+            answers = answer_cache_stats()
+            if answers and answers["hit_rate"]:
+                st.markdown(
+                    f"**Answer cache**: {answers['hit_rate']:.0%} hit rate "
+                    f"({answers['memory_hits'] + answers['disk_hits']} exact, {answers['semantic_hits']} similar, "
+                    f"{answers['misses']} misses)"
+                )
+                
         return {
             "selected_groq_model": model,
             "objective": objective,
@@ -0,0 +1,3 @@
+"""
+Package initialization for the utils module.
+"""
@@ -0,0 +1,150 @@
+"""
+Async runner module for executing coroutines from synchronous code.
+"""
+import queue
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, AsyncIterable, Awaitable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+class AsyncRunner:
+    """
+    A single event loop on a background thread, shared by the process.
+    
+    Streamlit runs each session's script on its own thread without an event
+    loop. Submitting the graph's coroutines here instead of calling
+    asyncio.run() per request lets every session's retrieval and LLM I/O
+    share one loop, and with it long-lived async HTTP sessions.
+    """
+    
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="async-runner", daemon=True)
+        self._thread.start()
+        
+    def submit(self, coroutine: Awaitable[Any]) -> Future:
+        """
+        Schedule a coroutine on the loop.
+        
+        Args:
+            coroutine: Coroutine to run
+            
+        Returns:
+            Future resolving to the coroutine's result
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        
+    def run(self, coroutine: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine on the loop and wait for its result.
+        
+        Args:
+            coroutine: Coroutine to run
+            timeout: Optional seconds to wait
+            
+        Returns:
+            The coroutine's result
+        """
+        if self._in_loop():
+            raise RuntimeError("AsyncRunner.run() called from its own event loop; await the coroutine instead")
+        return self.submit(coroutine).result(timeout=timeout)
+        
+    def iterate(self, iterable: AsyncIterable[Any]) -> Iterator[Any]:
+        """
+        Consume an async iterable on the loop as a blocking iterator.
+        
+        Items are handed over through a queue as soon as they are produced,
+        so a synchronous consumer such as st.write_stream sees them
+        incrementally. Closing the iterator early cancels the producer.
+        
+        Args:
+            iterable: Async iterable to consume, e.g. graph.astream(...)
+            
+        Returns:
+            Iterator over the produced items
+        """
+        if self._in_loop():
+            raise RuntimeError("AsyncRunner.iterate() called from its own event loop; use async for instead")
+            
+        items = queue.Queue()
+        done = object()
+        
+        async def pump() -> None:
+            try:
+                async for item in iterable:
+                    items.put((item, None))
+            except BaseException as e:
+                items.put((done, e))
+                raise
+            items.put((done, None))
+            
+        future = self.submit(pump())
+        try:
+            while True:
+                item, error = items.get()
+                if item is done:
+                    if error is not None:
+                        raise error
+                    return
+                yield item
+        finally:
+            future.cancel()
+            
+    def _in_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+            
+    def close(self) -> None:
+        """
+        Stop the loop and wait for its thread to exit.
+        """
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+_runner: Optional[AsyncRunner] = None
+_runner_lock = threading.Lock()
+
+def get_async_runner() -> AsyncRunner:
+    """
+    Get the process-wide async runner, starting it on first use.
+    
+    Returns:
+        Shared AsyncRunner
+    """
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = AsyncRunner()
+            logger.info("Started the shared async event loop")
+        return _runner
+
+def run_async(coroutine: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+    """
+    Run a coroutine on the shared event loop from synchronous code.
+    
+    Args:
+        coroutine: Coroutine to run
+        timeout: Optional seconds to wait
+        
+    Returns:
+        The coroutine's result
+    """
+    return get_async_runner().run(coroutine, timeout=timeout)
+
+def iterate_async(iterable: AsyncIterable[Any]) -> Iterator[Any]:
+    """
+    Iterate an async iterable on the shared event loop from synchronous code.
+    
+    Args:
+        iterable: Async iterable to consume
+        
+    Returns:
+        Iterator over the produced items
+    """
+    return get_async_runner().iterate(iterable)
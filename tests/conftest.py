@@ -0,0 +1,25 @@
+"""
+Fixtures shared by the unit tests.
+"""
+import hashlib
+
+import numpy as np
+import pytest
+
+class HashingEmbedder:
+    """
+    Deterministic bag-of-words embedder, so tests need no model download.
+    """
+    
+    dimension = 64
+    
+    def embed(self, texts, use_cache=True):
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[i, int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dimension] += 1.0
+        return vectors
+
+@pytest.fixture
+def embedder():
+    return HashingEmbedder()
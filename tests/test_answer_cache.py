@@ -0,0 +1,55 @@
+"""
+Unit tests for the SQLite answer cache.
+"""
+import sqlite3
+
+import pytest
+
+from src.langgraph.llm.answer_cache import AnswerCache
+
+CONTEXT = "Context: plants make food by photosynthesis."
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "answers.db")
+
+@pytest.fixture
+def cache(db_path, embedder):
+    embedder.model_name = "hashing-64"
+    return AnswerCache(db_path=db_path, similarity_threshold=0.5, embedder=embedder)
+
+def test_exact_and_similar_hits(cache):
+    cache.put("llama3-8b", CONTEXT, "How does photosynthesis work", "Plants making food from light.")
+    
+    assert cache.get("llama3-8b", CONTEXT, "how does   PHOTOSYNTHESIS work") == "Plants making food from light."
+    assert cache.get("gemma2", CONTEXT, "How does photosynthesis work") is None
+    assert cache.get("llama3-8b", CONTEXT, "how does photosynthesis work exactly") == "Plants making food from light."
+    assert cache.semantic_hits == 1
+
+def test_vectors_of_another_embedding_model_are_a_miss(cache, db_path, embedder):
+    cache.put("llama3-8b", CONTEXT, "How does photosynthesis work", "Plants making food from light.")
+    
+    class WiderEmbedder(type(embedder)):
+        model_name = "hashing-128"
+        dimension = 128
+        
+    reopened = AnswerCache(db_path=db_path, similarity_threshold=0.5, embedder=WiderEmbedder())
+    assert reopened.get("llama3-8b", CONTEXT, "how does photosynthesis work exactly") is None
+    
+    # A damaged row of the same model is skipped rather than failing the lookup
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE answers SET vector_model = 'hashing-128'")
+    assert reopened.get("llama3-8b", CONTEXT, "how does photosynthesis work exactly") is None
+
+def test_existing_databases_gain_the_model_column(db_path, embedder):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE answers (key TEXT PRIMARY KEY, model TEXT NOT NULL, context_hash TEXT NOT NULL, "
+            "question TEXT NOT NULL, answer TEXT NOT NULL, vector BLOB, created_at REAL NOT NULL, "
+            "expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        
+    embedder.model_name = "hashing-64"
+    cache = AnswerCache(db_path=db_path, similarity_threshold=0.5, embedder=embedder)
+    cache.put("llama3-8b", CONTEXT, "How does photosynthesis work", "Plants making food from light.")
+    assert cache.get("llama3-8b", CONTEXT, "how does photosynthesis work exactly") == "Plants making food from light."
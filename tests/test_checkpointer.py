@@ -0,0 +1,87 @@
+"""
+Unit tests for the SQLite checkpointer.
+"""
+import time
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+
+from src.langgraph.graph.checkpointer import SQLiteCheckpointer
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "checkpoints.db")
+
+@pytest.fixture
+def checkpointer(db_path):
+    return SQLiteCheckpointer(db_path=db_path, prune_interval=0)
+
+def save(checkpointer, thread_id, parent_config=None, text="hello", step=0):
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {"messages": [text]}
+    config = parent_config or {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    return checkpointer.put(config, checkpoint, {"source": "loop", "step": step}, {})
+
+def thread(thread_id):
+    return {"configurable": {"thread_id": thread_id}}
+
+def test_put_and_get(checkpointer):
+    first = save(checkpointer, "student-1", text="short")
+    second = save(checkpointer, "student-1", first, text="long " * 200, step=1)
+    
+    latest = checkpointer.get_tuple(thread("student-1"))
+    assert latest.config["configurable"]["checkpoint_id"] == second["configurable"]["checkpoint_id"]
+    assert latest.checkpoint["channel_values"]["messages"] == ["long " * 200]
+    assert latest.metadata["step"] == 1
+    assert latest.parent_config["configurable"]["checkpoint_id"] == first["configurable"]["checkpoint_id"]
+    
+    earlier = checkpointer.get_tuple(first)
+    assert earlier.checkpoint["channel_values"]["messages"] == ["short"]
+    assert checkpointer.get_tuple(thread("student-2")) is None
+
+def test_persists_across_instances(checkpointer, db_path):
+    config = save(checkpointer, "student-1", text="photosynthesis")
+    
+    reopened = SQLiteCheckpointer(db_path=db_path, prune_interval=0)
+    assert reopened.get_tuple(config).checkpoint["channel_values"]["messages"] == ["photosynthesis"]
+
+def test_put_writes(checkpointer):
+    config = save(checkpointer, "student-1")
+    checkpointer.put_writes(config, [("messages", "pending answer")], task_id="task-1")
+    
+    writes = checkpointer.get_tuple(config).pending_writes
+    assert writes == [("task-1", "messages", "pending answer")]
+
+def test_list(checkpointer):
+    configs = []
+    for step in range(3):
+        configs.append(save(checkpointer, "student-1", configs[-1] if configs else None, step=step))
+    save(checkpointer, "student-2")
+    
+    ids = [c.config["configurable"]["checkpoint_id"] for c in checkpointer.list(thread("student-1"))]
+    assert ids == [config["configurable"]["checkpoint_id"] for config in reversed(configs)]
+    assert len(list(checkpointer.list(None))) == 4
+    assert len(list(checkpointer.list(thread("student-1"), limit=2))) == 2
+    assert [c.metadata["step"] for c in checkpointer.list(thread("student-1"), filter={"step": 1})] == [1]
+    assert len(list(checkpointer.list(thread("student-1"), before=configs[1]))) == 1
+
+def test_prune_keeps_latest_and_drops_idle_threads(db_path):
+    checkpointer = SQLiteCheckpointer(db_path=db_path, keep_last=2, max_age=3600, prune_interval=0)
+    config = None
+    for step in range(5):
+        config = save(checkpointer, "student-1", config, step=step)
+    save(checkpointer, "student-2")
+    with checkpointer._lock:
+        checkpointer._conn.execute(
+            "UPDATE checkpoints SET created_at = ? WHERE thread_id = 'student-2'", (time.time() - 7200,)
+        )
+        checkpointer._conn.commit()
+        
+    assert checkpointer.prune_old_checkpoints() == (1, 4)
+    assert [c.metadata["step"] for c in checkpointer.list(thread("student-1"))] == [4, 3]
+    assert checkpointer.get_tuple(thread("student-2")) is None
+    
+    checkpointer.prune(["student-1"])
+    assert [c.metadata["step"] for c in checkpointer.list(thread("student-1"))] == [4]
+    checkpointer.delete_thread("student-1")
+    assert checkpointer.get_tuple(thread("student-1")) is None
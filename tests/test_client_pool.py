@@ -0,0 +1,63 @@
+"""
+Unit tests for the async sessions of the Weaviate client pool.
+"""
+import asyncio
+import threading
+
+import pytest
+
+from src.langgraph.document_processing.client_pool import PooledClient, WeaviateClientPool
+
+@pytest.fixture
+def pool():
+    pool = WeaviateClientPool(health_check_interval=0)
+    yield pool
+    pool.close()
+
+@pytest.fixture
+def pooled(pool):
+    # Registered without connecting; only its async sessions are used
+    pooled = pool._clients[("localhost", "8080", "")] = PooledClient("http://localhost:8080", None)
+    return pooled
+
+@pytest.fixture
+def background_loop():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield loop
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+def run_on(loop, coroutine):
+    return asyncio.run_coroutine_threadsafe(coroutine, loop).result(timeout=5)
+
+def test_each_event_loop_gets_its_own_session(background_loop, pool, pooled):
+    async def get_session():
+        return pool.get_async_session(pooled)
+        
+    async def get_and_close_session():
+        session = pool.get_async_session(pooled)
+        assert pool.get_async_session(pooled) is session
+        await session.close()
+        return session
+        
+    background = run_on(background_loop, get_session())
+    other = asyncio.run(get_and_close_session())
+    
+    # Another loop's session does not replace, or close, the background loop's one
+    assert other is not background
+    assert not background.closed
+    assert run_on(background_loop, get_session()) is background
+    assert list(pooled.async_sessions) == [background_loop]
+
+def test_close_closes_sessions_on_their_loop(background_loop, pool, pooled):
+    async def get_session():
+        return pool.get_async_session(pooled)
+        
+    session = run_on(background_loop, get_session())
+    pool.close()
+    
+    assert session.closed
+    assert not pooled.async_sessions
@@ -0,0 +1,80 @@
+"""
+Unit tests for the reference-counted corpus manifest.
+"""
+import time
+
+import pytest
+
+from src.langgraph.document_processing.corpus_manifest import CorpusManifest
+
+@pytest.fixture
+def manifest(tmp_path):
+    return CorpusManifest(db_path=str(tmp_path / "manifest.db"))
+
+def test_register_and_lookup(manifest):
+    manifest.register("hash-a", "biology.pdf", ["c1", "c2"], "alice", [
+        {"page": 1, "page_hash": "p1", "first_chunk": 0, "chunk_ids": ["c1", "c2"]}
+    ])
+    
+    record = manifest.lookup("hash-a")
+    assert record["file_name"] == "biology.pdf"
+    assert record["chunk_ids"] == ["c1", "c2"]
+    assert record["uploaders"] == ["alice"]
+    assert manifest.get_pages("hash-a") == {1: {"page_hash": "p1", "first_chunk": 0, "chunk_ids": ["c1", "c2"]}}
+    assert manifest.lookup("hash-b") is None
+    assert manifest.stored_chunks(["c1", "c9"]) == {"c1"}
+
+def test_release_deletes_only_unreferenced_chunks(manifest):
+    manifest.register("hash-a", "biology.pdf", ["c1", "c2"], "alice")
+    manifest.register("hash-b", "biology-v2.pdf", ["c2", "c3"], "alice")
+    manifest.attach("hash-a", "bob")
+    
+    # Bob still holds file a, and file b holds c2
+    assert manifest.release("hash-a", "alice") == []
+    assert sorted(manifest.release("hash-b", "alice")) == ["c3"]
+    assert manifest.lookup("hash-b") is None
+    assert sorted(manifest.release("hash-a", "bob")) == ["c1", "c2"]
+    assert manifest.lookup("hash-a") is None
+    assert manifest.stored_chunks(["c1", "c2", "c3"]) == set()
+
+def test_uploader_holds_one_reference(manifest):
+    manifest.register("hash-a", "biology.pdf", ["c1"], "alice")
+    manifest.attach("hash-a", "alice")
+    
+    assert manifest.release("hash-a", "alice") == ["c1"]
+    assert manifest.release("hash-a", "alice") == []
+
+def test_uploader_files(manifest):
+    manifest.register("hash-a", "biology.pdf", ["c1"], "alice")
+    manifest.register("hash-b", "chemistry.pdf", ["c2"], "bob")
+    manifest.attach("hash-b", "alice")
+    
+    assert sorted(manifest.uploader_files("alice")) == ["hash-a", "hash-b"]
+    assert manifest.uploader_files("bob") == ["hash-b"]
+
+def test_register_rolls_back_as_a_whole(manifest, monkeypatch):
+    def fail(file_hash, uploader):
+        raise KeyError(file_hash)
+        
+    monkeypatch.setattr(manifest, "_attach", fail)
+    with pytest.raises(KeyError):
+        manifest.register("hash-a", "biology.pdf", ["c1"], "alice", [
+            {"page": 1, "page_hash": "p1", "first_chunk": 0, "chunk_ids": ["c1"]}
+        ])
+        
+    assert manifest.lookup("hash-a") is None
+    assert manifest.get_pages("hash-a") == {}
+
+def test_idle_uploaders(manifest, monkeypatch):
+    manifest.register("hash-a", "biology.pdf", ["c1"], "alice")
+    manifest.register("hash-b", "chemistry.pdf", ["c2"], "bob")
+    with manifest._lock, manifest._conn:
+        # An uploader from before activity was tracked
+        manifest._conn.execute("INSERT INTO file_uploaders (file_hash, uploader) VALUES ('hash-b', 'legacy')")
+        
+    assert sorted(manifest.idle_uploaders(3600)) == ["legacy"]
+    
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 7200)
+    manifest.touch("bob")
+    assert sorted(manifest.idle_uploaders(3600)) == ["alice", "legacy"]
@@ -0,0 +1,60 @@
+"""
+Unit tests for incremental re-ingestion in DocumentProcessor.
+"""
+import pytest
+
+pytest.importorskip("langchain")
+pytest.importorskip("langchain_community")
+pytest.importorskip("pypdf")
+pytest.importorskip("streamlit")
+
+from src.langgraph.document_processing.corpus_manifest import CorpusManifest
+from src.langgraph.document_processing.document_processor import DocumentProcessor
+from src.langgraph.document_processing.local_vector_store import NumpyVectorStore
+from src.langgraph.document_processing.text_chunker import OffsetTextChunker
+
+@pytest.fixture
+def processor(tmp_path, embedder):
+    return DocumentProcessor(
+        vector_store=NumpyVectorStore(index_name="TestDocuments", data_dir=str(tmp_path), embedder=embedder),
+        chunker=OffsetTextChunker(chunk_size=100, chunk_overlap=10),
+        manifest=CorpusManifest(db_path=str(tmp_path / "manifest.db"))
+    )
+
+def pages(*texts):
+    return [
+        {"text": text, "metadata": {"page": page, "source": "biology.pdf", "file_name": "biology.pdf"}}
+        for page, text in enumerate(texts, start=1)
+    ]
+
+def words(prefix, count):
+    return " ".join(f"{prefix}{i}" for i in range(count))
+
+def stored_ids(processor):
+    processor.vector_store.connect()
+    return set(processor.vector_store._rows)
+
+def test_changed_pages_get_unique_chunk_numbers(processor):
+    processor._reingest("hash-1", "biology.pdf", lambda: pages(words("a", 10), words("b", 30)), True, "alice")
+    ids = processor._reingest("hash-2", "biology.pdf", lambda: pages(words("a", 60), words("b", 30)), True, "alice")
+    
+    records = processor.manifest.get_pages("hash-2").values()
+    numbers = [
+        number for record in records
+        for number in range(record["first_chunk"], record["first_chunk"] + len(record["chunk_ids"]))
+    ]
+    assert len(numbers) == len(set(numbers))
+    assert processor.manifest.lookup("hash-1") is None
+    assert stored_ids(processor) == set(ids)
+
+def test_reupload_of_a_version_another_uploader_ingested(processor):
+    first = lambda: pages(words("a", 10), words("b", 30))
+    second = lambda: pages(words("c", 10), words("b", 30))
+    processor._reingest("hash-1", "biology.pdf", first, True, "bob")
+    ids = processor._reingest("hash-2", "biology.pdf", second, True, "alice")
+    
+    # Bob's update to the version Alice already ingested reuses its chunks and drops his old version
+    assert processor._reingest("hash-2", "biology.pdf", second, True, "bob") == ids
+    assert processor.manifest.lookup("hash-1") is None
+    assert sorted(processor.manifest.lookup("hash-2")["uploaders"]) == ["alice", "bob"]
+    assert stored_ids(processor) == set(ids)
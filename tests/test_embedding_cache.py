@@ -0,0 +1,107 @@
+"""
+Unit tests for the persistent embedding cache.
+"""
+import os
+
+import numpy as np
+import pytest
+
+from src.langgraph.document_processing import embedding_cache
+from src.langgraph.document_processing.embedding import EmbeddingModel, create_embedding_model
+from src.langgraph.document_processing.embedding_cache import EmbeddingCache, get_embedding_cache
+
+DIMENSION = 8
+
+@pytest.fixture
+def open_cache(tmp_path):
+    """
+    Open a cache instance on the test directory; every call opens another.
+    """
+    def open_cache(max_bytes=1024 * 1024):
+        return EmbeddingCache("test/model", cache_dir=str(tmp_path), max_bytes=max_bytes)
+        
+    return open_cache
+
+@pytest.fixture
+def cache(open_cache):
+    return open_cache()
+
+def vectors_for(texts):
+    return np.stack([np.full(DIMENSION, len(text), dtype=np.float32) for text in texts])
+
+def test_round_trip(cache, open_cache):
+    embeddings, missing = cache.get_many(["a", "bb"])
+    assert embeddings is None
+    assert list(missing) == [0, 1]
+    
+    cache.put_many(["a", "bb"], vectors_for(["a", "bb"]))
+    embeddings, missing = cache.get_many(["bb", "ccc", "a"])
+    assert list(missing) == [1]
+    assert np.array_equal(embeddings[[0, 2]], vectors_for(["bb", "a"]))
+    
+    reopened = open_cache()
+    embeddings, missing = reopened.get_many(["a", "bb"])
+    assert not len(missing)
+    assert np.array_equal(embeddings, vectors_for(["a", "bb"]))
+
+def test_eviction_keeps_recently_used(open_cache):
+    # Room for 8 vectors of 8 float16 values; eviction keeps 80% of that
+    cache = open_cache(max_bytes=8 * DIMENSION * 2)
+    old = [f"old {i}" for i in range(4)]
+    new = [f"new {i}" for i in range(4)]
+    cache.put_many(old, vectors_for(old))
+    cache.put_many(new, vectors_for(new))
+    cache.get_many(new)
+    cache.put_many(["x" * 10], vectors_for(["x" * 10]))
+    
+    assert cache.stats()["evictions"] == 3
+    embeddings, missing = cache.get_many(new + ["x" * 10])
+    assert not len(missing)
+    assert np.array_equal(embeddings, vectors_for(new + ["x" * 10]))
+    
+    # Only the current generation of the vector file is left behind
+    assert sorted(name for name in os.listdir(cache.directory) if name.startswith("vectors")) == ["vectors.1.f16"]
+    reopened = open_cache()
+    embeddings, missing = reopened.get_many(new)
+    assert not len(missing)
+    assert np.array_equal(embeddings, vectors_for(new))
+
+def test_instances_on_one_directory_see_each_other(open_cache):
+    first = open_cache(max_bytes=6 * DIMENSION * 2)
+    second = open_cache(max_bytes=6 * DIMENSION * 2)
+    first.put_many(["a", "bb"], vectors_for(["a", "bb"]))
+    second.put_many(["ccc", "dddd"], vectors_for(["ccc", "dddd"]))
+    
+    embeddings, missing = first.get_many(["a", "bb", "ccc", "dddd"])
+    assert not len(missing)
+    assert np.array_equal(embeddings, vectors_for(["a", "bb", "ccc", "dddd"]))
+    
+    # An eviction by one instance leaves the other's rows pointing at the right vectors
+    second.put_many(["eeeee", "ffffff", "ggggggg"], vectors_for(["eeeee", "ffffff", "ggggggg"]))
+    texts = ["a", "bb", "ccc", "dddd", "eeeee", "ffffff", "ggggggg"]
+    embeddings, missing = first.get_many(texts)
+    hits = [i for i in range(len(texts)) if i not in set(missing)]
+    assert hits
+    assert np.array_equal(embeddings[hits], vectors_for([texts[i] for i in hits]))
+
+def test_shared_per_directory(tmp_path):
+    assert get_embedding_cache("test/model", cache_dir=str(tmp_path)) is get_embedding_cache(
+        "test/model", cache_dir=str(tmp_path)
+    )
+
+def test_backends_get_their_own_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("EMBEDDING_CACHE", "true")
+    monkeypatch.setattr(
+        embedding_cache, "get_embedding_cache", lambda name: get_embedding_cache(name, cache_dir=str(tmp_path))
+    )
+    torch_model = create_embedding_model(model_name="test/model", backend="torch")
+    int8_model = create_embedding_model(model_name="test/model", backend="onnx-int8")
+    
+    assert torch_model.cache is not int8_model.cache
+    assert torch_model.cache is get_embedding_cache("test/model", cache_dir=str(tmp_path))
+
+def test_embed_empty_input(cache):
+    model = EmbeddingModel(cache=cache)
+    embeddings = model.embed([])
+    assert len(embeddings) == 0
+    assert model.generate_embeddings([]) == []
@@ -0,0 +1,130 @@
+"""
+Unit tests for the in-process NumPy vector store.
+"""
+import numpy as np
+import pytest
+
+from src.langgraph.document_processing.local_vector_store import NumpyVectorStore
+
+@pytest.fixture
+def open_store(tmp_path, embedder):
+    """
+    Open a store instance on the test directory; every call opens another.
+    """
+    def open_store(**kwargs):
+        return NumpyVectorStore(index_name="TestDocuments", data_dir=str(tmp_path), embedder=embedder, **kwargs)
+        
+    return open_store
+
+@pytest.fixture
+def store(open_store):
+    return open_store()
+
+@pytest.fixture
+def vector(embedder):
+    return np.ones(embedder.dimension, dtype=np.float32) / 8
+
+def chunk(text, source="book.pdf", page=1, number=0):
+    return {"text": text, "metadata": {"source": source, "file_name": source, "page": page, "chunk": number}}
+
+def texts(results):
+    return sorted(result["text"] for result in results)
+
+def test_add_and_search(store):
+    ids = store.add_documents([
+        chunk("plants make food by photosynthesis", number=0),
+        chunk("osmosis moves water across a membrane", number=1),
+    ])
+    
+    assert len(ids) == 2
+    results = store.search("osmosis water", limit=1)
+    assert results[0]["text"] == "osmosis moves water across a membrane"
+    assert results[0]["metadata"]["chunk"] == 1
+    assert results[0]["id"] == ids[1]
+
+def test_results_hold_copies_of_the_metadata(store, vector):
+    store.add_documents([chunk("chlorophyll absorbs light", number=3)])
+    store.search_by_vector(vector)[0]["metadata"]["page"] = 99
+    store.fetch_chunks([("book.pdf", 3)])[0]["metadata"]["page"] = 99
+    
+    assert store.search_by_vector(vector)[0]["metadata"]["page"] == 1
+
+def test_add_is_idempotent(store):
+    first = store.add_documents([chunk("enzymes speed up reactions")])
+    second = store.add_documents([chunk("enzymes speed up reactions")])
+    
+    assert first == second
+    assert store._count == 1
+
+def test_filters_and_delete(store, vector):
+    store.add_documents([
+        chunk("the nucleus holds the cell's DNA", source="a.pdf"),
+        chunk("mitosis divides the nucleus", source="b.pdf"),
+    ])
+    
+    assert texts(store.search_by_vector(vector, filters={"source": "b.pdf"})) == ["mitosis divides the nucleus"]
+    assert store.delete_by_filter({"source": "a.pdf"}) == 1
+    assert texts(store.search_by_vector(vector)) == ["mitosis divides the nucleus"]
+
+def test_persists_across_instances(store, open_store):
+    ids = store.add_documents([chunk("chlorophyll absorbs light", number=3)])
+    
+    reopened = open_store()
+    reopened.connect()
+    assert list(reopened._rows) == ids
+    assert reopened.fetch_chunks([("book.pdf", 3)])[0]["text"] == "chlorophyll absorbs light"
+
+def test_instances_on_one_directory_see_each_other(open_store, vector):
+    reader = open_store()
+    writer = open_store()
+    reader.add_documents([chunk("a")])
+    assert texts(reader.search_by_vector(vector, limit=10)) == ["a"]
+    
+    # A write through another instance is visible to the reader's next search
+    writer.add_documents([chunk("b")])
+    assert texts(reader.search_by_vector(vector, limit=10)) == ["a", "b"]
+    
+    # Interleaved writers number their rows without overwriting each other
+    reader.add_documents([chunk("c")])
+    writer.add_documents([chunk("d")])
+    assert texts(writer.search_by_vector(vector, limit=10)) == ["a", "b", "c", "d"]
+    
+    fresh = open_store()
+    fresh.connect()
+    assert sorted(record["text"] for record in fresh._records if record) == ["a", "b", "c", "d"]
+
+def test_hnsw_falls_back_to_exact_scan(open_store, vector):
+    store = open_store(index_type="hnsw")
+    store.add_documents([chunk(f"cell topic {i}", source=f"{i}.pdf") for i in range(20)])
+    
+    def fail(*args, **kwargs):
+        raise RuntimeError("Cannot return the results in a contiguous 2D array")
+    store._hnsw.search = fail
+    
+    results = store.search_by_vector(vector, limit=3, filters={"source": "7.pdf"})
+    assert texts(results) == ["cell topic 7"]
+
+def test_hnsw_search_skips_rows_deleted_meanwhile(open_store, vector):
+    store = open_store(index_type="hnsw")
+    ids = store.add_documents([chunk(f"cell topic {i}", source=f"{i}.pdf") for i in range(20)])
+    search = store._hnsw.search
+    
+    def delete_then_search(*args, **kwargs):
+        # A delete landing between the snapshot and the graph query
+        store.delete_by_ids(ids[:10])
+        return search(*args, **kwargs)
+    store._hnsw.search = delete_then_search
+    
+    results = store.search_by_vector(vector, limit=20)
+    assert len(results) == 10
+    assert {result["id"] for result in results} == set(ids[10:])
+
+def test_search_reuses_a_given_query_vector(store, embedder):
+    store.add_documents([chunk("osmosis moves water across a membrane")])
+    
+    def fail():
+        raise AssertionError("the query was embedded again")
+    store.get_query_embedder = fail
+    
+    results = store.search("osmosis", vector=embedder.embed(["osmosis"])[0])
+    assert texts(results) == ["osmosis moves water across a membrane"]
@@ -0,0 +1,37 @@
+"""
+Unit tests for the query micro-batcher.
+"""
+import gc
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.langgraph.document_processing import micro_batcher
+from src.langgraph.document_processing.micro_batcher import MicroBatchEmbedder, get_micro_batcher
+
+def test_concurrent_queries_are_batched(embedder):
+    batcher = MicroBatchEmbedder(embedder, max_batch_size=8, max_wait_ms=50)
+    texts = [f"question {i} about cells" for i in range(16)]
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        vectors = list(pool.map(batcher.embed_query, texts))
+    batcher.close()
+    
+    assert np.array_equal(np.stack(vectors), embedder.embed(texts))
+    assert batcher.stats()["texts"] == 16
+    assert batcher.stats()["batches"] < 16
+
+def test_registry_entry_goes_away_with_the_model(embedder):
+    model = type(embedder)()
+    gc.collect()
+    registered = len(micro_batcher._batchers)
+    batcher = get_micro_batcher(model)
+    assert get_micro_batcher(model) is batcher
+    thread = batcher._thread
+    
+    del model
+    gc.collect()
+    thread.join(timeout=5)
+    
+    assert not thread.is_alive()
+    assert batcher.embedder is None
+    assert len(micro_batcher._batchers) == registered
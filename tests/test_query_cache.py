@@ -0,0 +1,82 @@
+"""
+Unit tests for the in-memory query cache.
+"""
+import gc
+
+import numpy as np
+import pytest
+
+from src.langgraph.document_processing import query_cache
+from src.langgraph.document_processing.query_cache import QueryCache, get_query_cache
+from src.langgraph.document_processing.vector_store import IndexState
+
+DOCUMENTS = [{"text": "plants make food by photosynthesis", "metadata": {"page": 1}}]
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(query_cache.time, "monotonic", lambda: now[0])
+    return now
+
+@pytest.fixture
+def cache():
+    return QueryCache(max_entries=2, ttl=10, similarity_threshold=0.9)
+
+def test_exact_hit_normalizes_the_query(cache):
+    cache.put("What is photosynthesis?", 5, 0, DOCUMENTS)
+    
+    assert cache.get("what is   PHOTOSYNTHESIS", 5, 0) == DOCUMENTS
+    assert cache.get("what is photosynthesis", 3, 0) is None
+
+def test_version_change_invalidates(cache):
+    state = IndexState()
+    cache.put("osmosis", 5, state.version, DOCUMENTS)
+    assert cache.get("osmosis", 5, state.version) == DOCUMENTS
+    
+    state.mark_populated()
+    assert cache.get("osmosis", 5, state.version) is None
+    
+    # Results of a search that started before the write are not cached
+    cache.put("osmosis", 5, state.version - 1, DOCUMENTS)
+    assert cache.get("osmosis", 5, state.version) is None
+
+def test_entries_expire_after_ttl(clock, cache):
+    cache.put("mitosis", 5, 0, DOCUMENTS, vector=np.ones(4, dtype=np.float32))
+    
+    clock[0] += 9
+    assert cache.get("mitosis", 5, 0) == DOCUMENTS
+    clock[0] += 2
+    assert cache.get("mitosis", 5, 0) is None
+    assert cache.get_similar("cell division", np.ones(4, dtype=np.float32), 5, 0) is None
+
+def test_similar_queries_share_an_entry(cache):
+    cache.put("what is photosynthesis", 5, 0, DOCUMENTS, vector=np.array([1.0, 0.1, 0.0], dtype=np.float32))
+    
+    assert cache.get_similar("explain photosynthesis", np.array([1.0, 0.0, 0.0], dtype=np.float32), 5, 0) == DOCUMENTS
+    assert cache.get_similar("define osmosis", np.array([0.0, 1.0, 0.0], dtype=np.float32), 5, 0) is None
+    # The paraphrase is now an exact hit
+    assert cache.get("explain photosynthesis", 5, 0) == DOCUMENTS
+
+def test_least_recently_used_is_evicted(cache):
+    cache.put("a", 5, 0, DOCUMENTS)
+    cache.put("b", 5, 0, DOCUMENTS)
+    cache.get("a", 5, 0)
+    cache.put("c", 5, 0, DOCUMENTS)
+    
+    assert cache.get("b", 5, 0) is None
+    assert cache.get("a", 5, 0) == DOCUMENTS
+
+def test_shared_per_collection():
+    state = IndexState()
+    assert get_query_cache(state) is get_query_cache(state)
+    assert get_query_cache(state) is not get_query_cache(IndexState())
+
+def test_cache_goes_away_with_the_collection():
+    gc.collect()
+    registered = len(query_cache._caches)
+    state = IndexState()
+    get_query_cache(state)
+    
+    del state
+    gc.collect()
+    assert len(query_cache._caches) == registered
@@ -0,0 +1,106 @@
+"""
+Unit tests comparing OffsetTextChunker with the LangChain-based TextChunker.
+"""
+import random
+
+import pytest
+
+pytest.importorskip("langchain")
+
+from src.langgraph.document_processing.text_chunker import TextChunker, OffsetTextChunker
+
+WORDS = ["cell", "plant", "energy", "water", "light", "membrane", "photosynthesis", "chlorophyll"]
+
+@pytest.fixture
+def documents():
+    """
+    Five pages of random paragraphs built from a small vocabulary.
+    """
+    rng = random.Random(1)
+    
+    def paragraph():
+        sentences = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 15))) for _ in range(rng.randint(2, 6))]
+        return ". ".join(sentences) + "."
+        
+    return [
+        {
+            "text": "\n\n".join(paragraph() for _ in range(rng.randint(3, 10))),
+            "metadata": {"page": page, "source": "biology.pdf"}
+        }
+        for page in range(1, 6)
+    ]
+
+@pytest.fixture
+def word_tokenizer():
+    """
+    One token per word, with character offsets like a fast tokenizer.
+    """
+    def tokenizer(text, add_special_tokens=False, return_offsets_mapping=True):
+        offsets, start = [], 0
+        for word in text.split():
+            start = text.index(word, start)
+            offsets.append((start, start + len(word)))
+            start += len(word)
+        return {"offset_mapping": offsets}
+        
+    return tokenizer
+
+def test_short_pages_match_exactly():
+    documents = [
+        {"text": "Plants make food by photosynthesis.", "metadata": {"page": 1, "source": "biology.pdf"}},
+        {"text": "   ", "metadata": {"page": 2, "source": "biology.pdf"}},
+        {"text": "Osmosis moves water across a membrane.", "metadata": {"page": 3, "source": "biology.pdf"}},
+    ]
+    expected = TextChunker(300, 50).chunk_text(documents)
+    actual = OffsetTextChunker(300, 50).chunk_text(documents)
+    
+    assert [chunk["text"] for chunk in actual] == [chunk["text"] for chunk in expected]
+    assert [(chunk["metadata"]["page"], chunk["metadata"]["chunk"]) for chunk in actual] == [(1, 1), (3, 2)]
+
+@pytest.mark.parametrize("chunk_size,chunk_overlap", [(300, 50), (1000, 200)])
+def test_long_pages_follow_the_same_rules(documents, chunk_size, chunk_overlap):
+    expected = TextChunker(chunk_size, chunk_overlap).chunk_text(documents)
+    actual = OffsetTextChunker(chunk_size, chunk_overlap).chunk_text(documents)
+    
+    # Similar granularity, within a quarter of the LangChain chunk count
+    assert abs(len(actual) - len(expected)) <= 0.25 * len(expected)
+    assert [chunk["metadata"]["chunk"] for chunk in actual] == list(range(1, len(actual) + 1))
+    
+    pages = {doc["metadata"]["page"]: doc["text"] for doc in documents}
+    for chunk in actual:
+        page_text = pages[chunk["metadata"]["page"]]
+        assert 0 < len(chunk["text"]) <= chunk_size
+        assert chunk["text"] == chunk["text"].strip()
+        assert page_text[chunk["metadata"]["start_index"]:chunk["metadata"]["end_index"]] == chunk["text"]
+        assert chunk["metadata"]["source"] == "biology.pdf"
+        
+    # Every page is covered from its first to its last word
+    for page, page_text in pages.items():
+        spans = [
+            (chunk["metadata"]["start_index"], chunk["metadata"]["end_index"])
+            for chunk in actual if chunk["metadata"]["page"] == page
+        ]
+        assert spans[0][0] == 0 and spans[-1][1] == len(page_text.rstrip())
+        assert all(next_start <= end for (_, end), (next_start, _) in zip(spans, spans[1:]))
+
+def test_iter_chunks_matches_chunk_text(documents):
+    chunker = OffsetTextChunker(300, 50)
+    
+    assert [
+        (chunk["text"], dict(chunk["metadata"])) for chunk in chunker.iter_chunks(documents)
+    ] == [
+        (chunk["text"], dict(chunk["metadata"])) for chunk in chunker.chunk_text(documents)
+    ]
+
+def test_token_mode_measures_chunks_in_tokens(word_tokenizer):
+    # A paragraph break two words into each block is inside the overlap of a chunk starting there
+    text = "\n\n".join(
+        f"heading{i} title\n\n" + ". ".join(f"averyveryverylongwordnumber{i}_{j} x" for j in range(15))
+        for i in range(10)
+    )
+    spans = OffsetTextChunker(chunk_size=20, chunk_overlap=8, tokenizer=word_tokenizer).split_offsets(text)
+    
+    assert all(len(text[start:end].split()) <= 20 for start, end in spans)
+    # Each chunk holds more than the overlap, so the next one moves forward
+    assert all(len(text[start:end].split()) > 8 for start, end in spans[:-1])
+    assert all(next_start > start for (start, _), (next_start, _) in zip(spans, spans[1:]))